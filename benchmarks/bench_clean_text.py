@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+قياس زمن تنظيف نص الصفحة بعد OCR ومقارنته بالتنفيذ السابق
+
+يولّد صفحات تجريبية ثابتة (نص عربي مع ضجيج لاتيني ورموز وأرقام) ويقيس:
+- legacy: التسلسل السابق (re.sub لكل كلمة ضجيج + str.replace لكل تصحيح)
+- current: core.ocr_engine.clean_text (قواعد مجمّعة مسبقاً + تصحيحات في مرور واحد)
+كلاهما بقواعد الملف المرفق data/ocr_rules.json.
+ويتحقق من تطابق الناتج. الصفحات لا تحتوي المفاتيح المتداخلة التي تغير سلوكها
+عند الانتقال إلى أطول تطابق (انظر core.ocr_rules.corrections_pattern_source).
+
+التشغيل: python benchmarks/bench_clean_text.py [--repeat 5] [--pages 50]
+"""
+import re
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from core.ocr_engine import clean_text
+from core.ocr_rules import load_rules, DEFAULT_OCR_RULES_FILE
+
+# القواعد المرفقة مع البرنامج (وليس نسخة المستخدم) حتى تكون النتائج قابلة للمقارنة
+RULES = load_rules(DEFAULT_OCR_RULES_FILE, use_cache=False)
+OCR_CORRECTIONS = RULES.corrections
+NOISE_WORDS = RULES.noise_words
+
+# مفاتيح كان ترتيب التطبيق السابق يحجبها بمفتاح أقصر
+_SHADOWED_KEYS = {"تم الطباعه", "dla]"}
+
+
+def legacy_apply_corrections(text):
+    """نسخة من تطبيق التصحيحات قبل التحسين (للمقارنة فقط)"""
+    if not text:
+        return ""
+    for wrong, right in OCR_CORRECTIONS.items():
+        text = text.replace(wrong, right)
+    return text
+
+
+def legacy_clean_text(text):
+    """نسخة من تنظيف النص قبل التحسين (للمقارنة فقط)"""
+    if not text:
+        return ""
+    text = re.sub(r'\b[a-zA-Z]{1,2}\b', '', text)
+    text = re.sub(r'^[|I1l!ـ\-\s]+', '', text, flags=re.MULTILINE)
+    text = re.sub(r'[|I1l!ـ\-\s]+$', '', text, flags=re.MULTILINE)
+    for pattern in NOISE_WORDS:
+        text = re.sub(r'\b' + pattern + r'\b', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'[@#\$%\^&\*\(\)\{\}\[\]\|\\<>/_]', ' ', text)
+    text = legacy_apply_corrections(text)
+    text = re.sub(r'([١٢٣٥٦٧٨٩٠])E', r'\1٤', text)
+    text = re.sub(r'E([١٢٣٥٦٧٨٩٠])', r'٤\1', text)
+    text = re.sub(r'1EEV', r'١٤٤٧', text)
+    text = re.sub(r' +', ' ', text)
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    return text.strip()
+
+
+def make_page(seed=0, lines=45):
+    """صفحة تجريبية بحجم صفحة خطاب تقريباً (حوالي 3000 حرف)"""
+    rnd = random.Random(seed)
+    letters = "ابتثجحخدذرزسشصضطظعغفقكلمنهوي"
+    corrections = [k for k in OCR_CORRECTIONS if k not in _SHADOWED_KEYS]
+    extras = ["|", "1EEV", "١E٢", "@", "(", "ـــ", "ab", "Hello"]
+    out = []
+    for _ in range(lines):
+        words = []
+        for _ in range(rnd.randint(6, 14)):
+            roll = rnd.random()
+            if roll < 0.08:
+                words.append(rnd.choice(NOISE_WORDS))
+            elif roll < 0.14:
+                words.append(rnd.choice(corrections))
+            elif roll < 0.18:
+                words.append(rnd.choice(extras))
+            else:
+                words.append("".join(rnd.choice(letters) for _ in range(rnd.randint(2, 7))))
+        out.append(" ".join(words))
+        if rnd.random() < 0.1:
+            out.append("\n\n")
+    return "\n".join(out)
+
+
+def time_fn(fn, pages, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for page in pages:
+            fn(page)
+        timings.append(time.perf_counter() - start)
+    return min(timings) / len(pages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OCR text cleaning.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case (best time is reported)")
+    parser.add_argument("--pages", type=int, default=50, help="Generated pages per run")
+    args = parser.parse_args()
+
+    pages = [make_page(seed) for seed in range(args.pages)]
+    identical = all(legacy_clean_text(p) == clean_text(p, RULES) for p in pages)
+    legacy = time_fn(legacy_clean_text, pages, args.repeat)
+    current = time_fn(lambda page: clean_text(page, RULES), pages, args.repeat)
+
+    avg_chars = sum(len(p) for p in pages) // len(pages)
+    print(f"{'case':<28}{'legacy ms':>12}{'current ms':>12}{'speedup':>10}  identical")
+    print(f"{f'page ~{avg_chars} chars':<28}{legacy * 1000:>12.3f}{current * 1000:>12.3f}"
+          f"{legacy / current:>9.2f}x  {identical}")
+
+
+if __name__ == "__main__":
+    main()
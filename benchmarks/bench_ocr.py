@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""
+قياس سرعة OCR على مجموعة صفحات تجريبية ثابتة ومقارنة النتائج بين نسختين
+
+يولّد الصفحات (عربي، إنجليزي، مختلط، جداول، ضجيج، فارغة) بـ Pillow دون إنترنت
+(انظر benchmarks/corpus.py) ويجمعها في ملفات PDF، ثم يقيس:
+- stages: زمن كل مرحلة لكل صفحة على حدة، مجمعاً حسب نوع الصفحة:
+  render (pdftoppm) ← preprocess (preprocess_image) ← recognize (Tesseract) ← clean (clean_text).
+- end_to_end: تشغيل OCRJob كاملاً على corpus.pdf لكل عدد عمليات في --workers
+  (دون الذاكرة المؤقتة وسجل الاستئناف وطبقة النص) مع عدد الصفحات في الثانية
+  وملخص مدد المراحل الذي تعيده المهمة.
+المراحل التي تحتاج Poppler أو Tesseract غير المتوفرين تُتجاوز ويُسجل السبب في النتائج،
+ويُنظَّف عندها النص المرسوم نفسه بدلاً من ناتج التعرف.
+
+التشغيل:
+    python benchmarks/bench_ocr.py run [--output FILE] [--pages-per-kind 2] [--dpi 300] [--workers 1 4]
+    python benchmarks/bench_ocr.py run --baseline benchmarks/results/ocr-abc123.json
+    python benchmarks/bench_ocr.py compare OLD.json NEW.json [--threshold 0.1]
+"""
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from core.config import POPPLER_PATH
+from core.metrics import percentile
+from core.poppler import render_pages
+from core.ocr_engine import preprocess_image, recognize_image, clean_text
+from core.ocr_backends import resolve_engine
+from core.ocr_rules import load_rules, DEFAULT_OCR_RULES_FILE
+from core.utils import load_ocr_libraries
+from core.ocr_job import OCRJob
+
+from corpus import PAGE_KINDS, build_corpus, render_page, find_font
+from results import save_results, load_results, print_comparison, git_commit, poppler_version
+
+STAGES = ("render", "preprocess", "recognize", "clean")
+
+# القواعد المرفقة مع البرنامج (وليس نسخة المستخدم) حتى تكون النتائج قابلة للمقارنة
+RULES = load_rules(DEFAULT_OCR_RULES_FILE, use_cache=False)
+
+
+def tesseract_version():
+    try:
+        load_ocr_libraries()
+        import pytesseract
+        return str(pytesseract.get_tesseract_version())
+    except Exception:
+        return None
+
+
+def best_of(fn, repeat):
+    """أفضل زمن من repeat محاولات مع ناتج آخر محاولة"""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def stats_ms(values):
+    values = sorted(values)
+    return {
+        "pages": len(values),
+        "mean_ms": round(sum(values) / len(values) * 1000, 3),
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p90_ms": round(percentile(values, 90) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3),
+    }
+
+
+def run_stages(manifest, corpus_dir, args, engine, can_render, can_recognize, font_path):
+    """زمن كل مرحلة لكل صفحة: {النوع: {المرحلة: [الثواني]}}"""
+    durations = {}
+    for kind in manifest["kinds"]:
+        pdf = corpus_dir / manifest["files"][kind]
+        for seed in range(manifest["pages_per_kind"]):
+            samples = durations.setdefault(kind, {})
+            if can_render:
+                seconds, images = best_of(lambda: render_pages(
+                    pdf, dpi=args.dpi, first_page=seed + 1, last_page=seed + 1, grayscale=True,
+                    poppler_path=POPPLER_PATH), args.repeat)
+                samples.setdefault("render", []).append(seconds)
+                img = images[0]
+            else:
+                img, _ = render_page(kind, seed, args.dpi, font_path)
+
+            processed = img
+            if not args.no_preprocess:
+                seconds, processed = best_of(lambda: preprocess_image(img), args.repeat)
+                samples.setdefault("preprocess", []).append(seconds)
+
+            if can_recognize:
+                seconds, raw = best_of(lambda: recognize_image(processed, args.lang, engine), args.repeat)
+                samples.setdefault("recognize", []).append(seconds)
+            else:
+                raw = manifest["pages"][manifest["kinds"].index(kind) + seed * len(manifest["kinds"])]["text"]
+
+            seconds, _ = best_of(lambda: clean_text(raw, RULES), args.repeat)
+            samples.setdefault("clean", []).append(seconds)
+            print(f"  {kind} #{seed + 1}: " + ", ".join(
+                f"{stage} {samples[stage][-1] * 1000:.1f}ms" for stage in STAGES if stage in samples), file=sys.stderr)
+    return durations
+
+
+def run_end_to_end(pdf, args, workers):
+    """أفضل زمن لتشغيل OCRJob على الملف كاملاً من --repeat محاولات"""
+    best = None
+    for _ in range(args.repeat):
+        errors = []
+        job = OCRJob(on_error=errors.append)
+        start = time.perf_counter()
+        summary = job.run([str(pdf)], lang=args.lang, dpi=args.dpi, save_txt=False,
+                          preprocess=not args.no_preprocess, workers=workers, engine=args.engine,
+                          use_cache=False, use_text_layer=False, skip_blank=not args.no_skip_blank, resume=False)
+        seconds = time.perf_counter() - start
+        if summary is None or errors:
+            raise RuntimeError("; ".join(errors[:3]) or "OCR job did not finish")
+        if best is None or seconds < best[0]:
+            best = (seconds, summary)
+    seconds, summary = best
+    return {
+        "workers": workers,
+        "pages": summary["total_pages"],
+        "blank_pages": summary["blank_pages"],
+        "seconds": round(seconds, 3),
+        "pages_per_second": round(summary["total_pages"] / seconds, 3),
+        "timings": summary["timings"],
+    }
+
+
+def flatten(stages, end_to_end):
+    """المقاييس المسطحة التي تتم مقارنتها بين النتائج"""
+    metrics = {}
+    for kind, samples in stages.items():
+        for stage, stats in samples.items():
+            metrics[f"stages.{kind}.{stage}.mean_ms"] = stats["mean_ms"]
+            metrics[f"stages.{kind}.{stage}.p90_ms"] = stats["p90_ms"]
+    for run in end_to_end:
+        prefix = f"end_to_end.workers_{run['workers']}"
+        metrics[f"{prefix}.pages_per_second"] = run["pages_per_second"]
+        metrics[f"{prefix}.seconds"] = run["seconds"]
+        for stage, stats in run["timings"]["stages"].items():
+            metrics[f"{prefix}.{stage}.p50_ms"] = round(stats["p50"] * 1000, 3)
+    return metrics
+
+
+def cmd_run(args):
+    engine = resolve_engine(args.engine)
+    font_path = find_font(args.font)
+    tesseract = tesseract_version()
+    poppler = poppler_version()
+    skipped = {}
+    if not poppler:
+        skipped["render"] = "pdftoppm (Poppler) not found"
+    if not tesseract:
+        skipped["recognize"] = "tesseract not found"
+    if args.no_preprocess:
+        skipped["preprocess"] = "disabled with --no-preprocess"
+
+    with tempfile.TemporaryDirectory(prefix="warraq-bench-") as tmp:
+        corpus_dir = Path(args.corpus) if args.corpus else Path(tmp)
+        print(f"Generating corpus in {corpus_dir} ...", file=sys.stderr)
+        manifest = build_corpus(corpus_dir, args.pages_per_kind, args.dpi, args.kinds, font_path)
+
+        print("Timing stages ...", file=sys.stderr)
+        durations = run_stages(manifest, corpus_dir, args, engine, bool(poppler), bool(tesseract), font_path)
+        stages = {kind: {stage: stats_ms(values) for stage, values in samples.items()}
+                  for kind, samples in durations.items()}
+        combined = {}
+        for samples in durations.values():
+            for stage, values in samples.items():
+                combined.setdefault(stage, []).extend(values)
+        stages["all"] = {stage: stats_ms(values) for stage, values in combined.items()}
+
+        end_to_end = []
+        if poppler and tesseract:
+            for workers in args.workers:
+                print(f"End-to-end with {workers} worker(s) ...", file=sys.stderr)
+                end_to_end.append(run_end_to_end(corpus_dir / manifest["files"]["corpus"], args, workers))
+        else:
+            skipped["end_to_end"] = "requires both Poppler and Tesseract"
+
+    config = {
+        "pages_per_kind": args.pages_per_kind, "kinds": list(args.kinds), "dpi": args.dpi, "lang": args.lang,
+        "engine": engine, "preprocess": not args.no_preprocess, "skip_blank": not args.no_skip_blank,
+        "workers": args.workers, "repeat": args.repeat,
+    }
+    output = Path(args.output or Path(__file__).parent / "results" / f"ocr-{git_commit() or time.strftime('%Y%m%d-%H%M%S')}.json")
+    results = save_results(
+        output, "ocr", config, flatten(stages, end_to_end),
+        details={"stages": stages, "end_to_end": end_to_end, "skipped": skipped, "render": manifest["render"]},
+        tesseract=tesseract, poppler=poppler, font=manifest["render"]["font"],
+    )
+
+    print(f"{'stage (all pages)':<20}{'mean ms':>10}{'p50 ms':>10}{'p90 ms':>10}")
+    for stage, stats in stages["all"].items():
+        print(f"{stage:<20}{stats['mean_ms']:>10.1f}{stats['p50_ms']:>10.1f}{stats['p90_ms']:>10.1f}")
+    for run in end_to_end:
+        print(f"end-to-end workers={run['workers']}: {run['pages']} pages in {run['seconds']}s "
+              f"({run['pages_per_second']} pages/s)")
+    for stage, reason in skipped.items():
+        print(f"skipped {stage}: {reason}")
+    print(f"Results written to {output}")
+
+    if args.baseline:
+        return 1 if print_comparison(load_results(args.baseline), results, args.threshold) else 0
+    return 0
+
+
+def cmd_compare(args):
+    regressions = print_comparison(load_results(args.baseline), load_results(args.current), args.threshold)
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OCR throughput on a generated page corpus.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Generate the corpus, run the benchmark and write a JSON result")
+    run.add_argument("--output", help="Result file (default: benchmarks/results/ocr-<commit>.json)")
+    run.add_argument("--corpus", help="Directory to keep the generated PDFs in (default: a temporary directory)")
+    run.add_argument("--pages-per-kind", type=int, default=2, help="Pages generated for each page kind")
+    run.add_argument("--kinds", nargs="+", choices=PAGE_KINDS, default=list(PAGE_KINDS), help="Page kinds to include")
+    run.add_argument("--dpi", type=int, default=300)
+    run.add_argument("--lang", default="ara+eng")
+    run.add_argument("--engine", default="auto", choices=["auto", "tesserocr", "pytesseract"])
+    run.add_argument("--workers", type=int, nargs="+", default=[1], help="Worker counts for the end-to-end runs")
+    run.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best time is kept)")
+    run.add_argument("--no-preprocess", action="store_true")
+    run.add_argument("--no-skip-blank", action="store_true", help="Send blank pages to Tesseract as well")
+    run.add_argument("--font", help="TrueType font used to draw the pages")
+    run.add_argument("--baseline", help="Compare against this earlier result file")
+    run.add_argument("--threshold", type=float, default=0.10, help="Relative change reported as better/worse")
+    run.set_defaults(func=cmd_run)
+
+    compare = commands.add_parser("compare", help="Compare two result files")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=0.10)
+    compare.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
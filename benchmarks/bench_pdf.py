@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+قياس أدوات PDF (PDFProcessor) على ملفات كبيرة مولّدة محلياً ومقارنة النتائج بين نسختين
+
+يولّد ملف PDF بعدد صفحات ونسبة صفحات مصورة قابلة للتحكم (benchmarks/corpus.py)، وعدداً من
+الملفات الصغيرة للدمج، وصوراً لتحويلها إلى PDF، ثم يشغل كل عملية في عملية Python منفصلة
+ويسجل لكل منها: زمن التنفيذ، وأقصى ذاكرة مقيمة (peak RSS) للعملية وللبرامج الخارجية التي
+تشغلها مثل pdftoppm، وحجم الناتج على القرص.
+
+العمليات: merge_pdfs و split_pdf_to_pages و compress_pdf و encrypt_pdf و images_to_pdf و pdf_to_images
+(الأخيرة تحتاج Poppler وتُتجاوز إن لم يكن متوفراً).
+
+قياس الذاكرة: resource.getrusage على Linux و macOS، و psutil على Windows إن كان مثبتاً.
+
+التشغيل:
+    python benchmarks/bench_pdf.py run [--pages 1000] [--image-ratio 0.5] [--merge-files 200] [--output FILE]
+    python benchmarks/bench_pdf.py run --baseline benchmarks/results/pdf-abc123.json
+    python benchmarks/bench_pdf.py compare OLD.json NEW.json [--threshold 0.1]
+"""
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from corpus import build_document, render_page, find_font
+from results import save_results, load_results, print_comparison, git_commit, poppler_version
+
+OPERATIONS = ("merge_pdfs", "split_pdf_to_pages", "compress_pdf", "encrypt_pdf", "images_to_pdf", "pdf_to_images")
+
+
+def peak_rss(children=False):
+    """أقصى ذاكرة مقيمة بالبايت للعملية الحالية (أو لأكبر عملية فرعية انتهت)، أو None إن تعذر القياس"""
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss بالبايت على macOS وبالكيلوبايت على Linux
+        return peak if sys.platform == "darwin" else peak * 1024
+    if children:
+        return None
+    try:
+        import psutil
+    except ImportError:
+        return None
+    info = psutil.Process().memory_info()
+    return getattr(info, "peak_wset", info.rss)
+
+
+def disk_size(path):
+    path = Path(path)
+    if path.is_file():
+        return path.stat().st_size
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def operation_call(op, inputs, out_dir):
+    """الدالة المراد قياسها لكل عملية"""
+    from core.config import POPPLER_PATH
+    from core.pdf_processor import PDFProcessor
+
+    document = inputs["document"]
+    calls = {
+        "merge_pdfs": lambda: PDFProcessor.merge_pdfs(inputs["merge"], str(out_dir / "merged.pdf")),
+        "split_pdf_to_pages": lambda: PDFProcessor.split_pdf_to_pages(document, str(out_dir)),
+        "compress_pdf": lambda: PDFProcessor.compress_pdf(document, str(out_dir / "compressed.pdf")),
+        "encrypt_pdf": lambda: PDFProcessor.encrypt_pdf(document, "benchmark", str(out_dir / "encrypted.pdf")),
+        "images_to_pdf": lambda: PDFProcessor.images_to_pdf(inputs["images"], str(out_dir / "images.pdf")),
+        "pdf_to_images": lambda: PDFProcessor.pdf_to_images(document, str(out_dir), poppler_path=POPPLER_PATH),
+    }
+    return calls[op]
+
+
+def cmd_measure(args):
+    """تنفيذ عملية واحدة في هذه العملية وطباعة القياسات بصيغة JSON (يستدعيها أمر run)"""
+    inputs = json.loads(Path(args.inputs).read_text(encoding="utf-8"))
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    call = operation_call(args.op, inputs, out_dir)
+    rss_before = peak_rss()
+
+    start = time.perf_counter()
+    ok, message = call()
+    seconds = time.perf_counter() - start
+
+    print(json.dumps({
+        "ok": ok,
+        "message": message,
+        "seconds": seconds,
+        "peak_rss": peak_rss(),
+        "rss_before": rss_before,
+        "children_peak_rss": peak_rss(children=True),
+        "output_bytes": disk_size(out_dir),
+    }, ensure_ascii=False))
+    return 0
+
+
+def measure(op, inputs_file, work_dir, timeout):
+    out_dir = Path(tempfile.mkdtemp(prefix=f"{op}-", dir=work_dir))
+    try:
+        result = subprocess.run(
+            [sys.executable, __file__, "measure", op, "--inputs", str(inputs_file), "--out-dir", str(out_dir)],
+            capture_output=True, text=True, encoding="utf-8", timeout=timeout)
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else f"exit {result.returncode}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def generate_inputs(work_dir, args, font_path):
+    """توليد ملفات الإدخال وإرجاع قاموس مساراتها مع معلومات عنها"""
+    print(f"Generating {args.pages}-page document in {work_dir} ...", file=sys.stderr)
+    document = work_dir / "document.pdf"
+    document_bytes = build_document(document, args.pages, args.image_ratio, args.image_dpi, 0, font_path)
+
+    print(f"Generating {args.merge_files} files to merge ...", file=sys.stderr)
+    merge = []
+    for i in range(args.merge_files):
+        path = work_dir / "merge" / f"part_{i + 1:04d}.pdf"
+        build_document(path, args.merge_pages, args.image_ratio, args.image_dpi, i % 3, font_path)
+        merge.append(str(path))
+
+    print(f"Generating {args.images} images ...", file=sys.stderr)
+    images = []
+    kinds = ("arabic", "table", "noisy")
+    for i in range(args.images):
+        path = work_dir / "images" / f"scan_{i + 1:04d}.jpg"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if i < len(kinds):
+            render_page(kinds[i], 0, args.image_dpi, font_path)[0].save(path, "JPEG", quality=75)
+        else:
+            shutil.copyfile(images[i % len(kinds)], path)
+        images.append(str(path))
+
+    return {
+        "document": str(document),
+        "merge": merge,
+        "images": images,
+        "sizes": {
+            "document_bytes": document_bytes,
+            "merge_bytes": sum(Path(p).stat().st_size for p in merge),
+            "images_bytes": sum(Path(p).stat().st_size for p in images),
+        },
+    }
+
+
+def cmd_run(args):
+    font_path = find_font(args.font)
+    poppler = poppler_version()
+    operations = args.ops
+    skipped = {}
+    if "pdf_to_images" in operations and not poppler:
+        operations = [op for op in operations if op != "pdf_to_images"]
+        skipped["pdf_to_images"] = "pdftoppm (Poppler) not found"
+
+    with tempfile.TemporaryDirectory(prefix="warraq-bench-pdf-") as tmp:
+        work_dir = Path(args.workdir) if args.workdir else Path(tmp)
+        work_dir.mkdir(parents=True, exist_ok=True)
+        inputs = generate_inputs(work_dir, args, font_path)
+        inputs_file = work_dir / "inputs.json"
+        inputs_file.write_text(json.dumps(inputs), encoding="utf-8")
+
+        details = {}
+        for op in operations:
+            print(f"Running {op} ...", file=sys.stderr)
+            runs = []
+            try:
+                for _ in range(args.repeat):
+                    runs.append(measure(op, inputs_file, work_dir, args.timeout))
+            except (RuntimeError, subprocess.TimeoutExpired) as e:
+                skipped[op] = f"failed: {e}"
+                continue
+            failed = next((run for run in runs if not run["ok"]), None)
+            if failed:
+                skipped[op] = f"failed: {failed['message']}"
+                continue
+            details[op] = {
+                "seconds": round(min(run["seconds"] for run in runs), 3),
+                "peak_rss": max(run["peak_rss"] or 0 for run in runs) or None,
+                "rss_before": min(run["rss_before"] or 0 for run in runs) or None,
+                "children_peak_rss": max(run["children_peak_rss"] or 0 for run in runs) or None,
+                "output_bytes": runs[-1]["output_bytes"],
+            }
+
+    metrics = {}
+    for op, run in details.items():
+        metrics[f"{op}.seconds"] = run["seconds"]
+        metrics[f"{op}.output_mb"] = round(run["output_bytes"] / 2 ** 20, 3)
+        if run["peak_rss"]:
+            metrics[f"{op}.peak_rss_mb"] = round(run["peak_rss"] / 2 ** 20, 1)
+        if run["children_peak_rss"]:
+            metrics[f"{op}.children_peak_rss_mb"] = round(run["children_peak_rss"] / 2 ** 20, 1)
+
+    config = {
+        "pages": args.pages, "image_ratio": args.image_ratio, "image_dpi": args.image_dpi,
+        "merge_files": args.merge_files, "merge_pages": args.merge_pages, "images": args.images,
+        "operations": list(args.ops), "repeat": args.repeat,
+    }
+    output = Path(args.output or Path(__file__).parent / "results" / f"pdf-{git_commit() or time.strftime('%Y%m%d-%H%M%S')}.json")
+    results = save_results(output, "pdf", config, metrics,
+                           details={"operations": details, "inputs": inputs["sizes"], "skipped": skipped},
+                           poppler=poppler)
+
+    print(f"{'operation':<22}{'seconds':>10}{'peak RSS MB':>14}{'output MB':>12}")
+    for op, run in details.items():
+        rss = f"{run['peak_rss'] / 2 ** 20:.1f}" if run["peak_rss"] else "-"
+        print(f"{op:<22}{run['seconds']:>10.2f}{rss:>14}{run['output_bytes'] / 2 ** 20:>12.1f}")
+    for op, reason in skipped.items():
+        print(f"skipped {op}: {reason}")
+    print(f"Results written to {output}")
+
+    if args.baseline:
+        return 1 if print_comparison(load_results(args.baseline), results, args.threshold) else 0
+    return 0
+
+
+def cmd_compare(args):
+    regressions = print_comparison(load_results(args.baseline), load_results(args.current), args.threshold)
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDFProcessor operations on generated documents.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Generate the inputs, run every operation and write a JSON result")
+    run.add_argument("--output", help="Result file (default: benchmarks/results/pdf-<commit>.json)")
+    run.add_argument("--workdir", help="Directory to keep the generated inputs in (default: a temporary directory)")
+    run.add_argument("--pages", type=int, default=1000, help="Pages in the large document")
+    run.add_argument("--image-ratio", type=float, default=0.5, help="Fraction of pages carrying a scanned image")
+    run.add_argument("--image-dpi", type=int, default=150, help="Resolution of the scanned images")
+    run.add_argument("--merge-files", type=int, default=200, help="Number of files passed to merge_pdfs")
+    run.add_argument("--merge-pages", type=int, default=5, help="Pages in each file to merge")
+    run.add_argument("--images", type=int, default=50, help="Number of images passed to images_to_pdf")
+    run.add_argument("--ops", nargs="+", choices=OPERATIONS, default=list(OPERATIONS), help="Operations to run")
+    run.add_argument("--repeat", type=int, default=1, help="Runs per operation (best time, highest memory)")
+    run.add_argument("--timeout", type=float, default=1800, help="Seconds before an operation is abandoned")
+    run.add_argument("--font", help="TrueType font used to draw the scanned pages")
+    run.add_argument("--baseline", help="Compare against this earlier result file")
+    run.add_argument("--threshold", type=float, default=0.10, help="Relative change reported as better/worse")
+    run.set_defaults(func=cmd_run)
+
+    compare = commands.add_parser("compare", help="Compare two result files")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=0.10)
+    compare.set_defaults(func=cmd_compare)
+
+    measure_one = commands.add_parser("measure", help="Run a single operation in this process (used by 'run')")
+    measure_one.add_argument("op", choices=OPERATIONS)
+    measure_one.add_argument("--inputs", required=True, help="inputs.json written by 'run'")
+    measure_one.add_argument("--out-dir", required=True)
+    measure_one.set_defaults(func=cmd_measure)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
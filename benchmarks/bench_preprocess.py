@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+قياس زمن المعالجة المسبقة للصفحة قبل OCR ومقارنته بالتنفيذ السابق
+
+يولّد صفحة تجريبية ثابتة (A4 بدقة 300 DPI) ويقيس:
+- legacy: التسلسل السابق (point بدالة lambda + تحويلات بين النمطين L و 1 + MedianFilter)
+- current: core.ocr_engine.preprocess_image (جداول بحث + مرشح صندوقي)
+ويتحقق من تطابق الناتج بكسلاً ببكسل.
+
+التشغيل: python benchmarks/bench_preprocess.py [--repeat 5]
+"""
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFilter, ImageOps
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from core.ocr_engine import preprocess_image
+
+
+def legacy_preprocess_image(img):
+    """نسخة من المعالجة المسبقة قبل التحسين (للمقارنة فقط)"""
+    if img.width < 2500:
+        scale = 2500 / img.width
+        img = img.resize((2500, int(img.height * scale)), Image.Resampling.LANCZOS)
+    img = img.convert('L')
+    img = ImageOps.autocontrast(img)
+    img = img.point(lambda x: 255 if x > 140 else 0, mode='1')
+    img = img.convert('L')
+    return img.filter(ImageFilter.MedianFilter(size=3))
+
+
+def make_page(width, height, mode, seed=0):
+    """صفحة تجريبية: خلفية رمادية فاتحة مع أسطر نص وضجيج نقطي"""
+    rnd = random.Random(seed)
+    img = Image.new("RGB", (width, height), (232, 228, 222))
+    draw = ImageDraw.Draw(img)
+    for y in range(150, height - 150, 60):
+        x = 150
+        while x < width - 300:
+            w = rnd.randint(40, 220)
+            draw.rectangle([x, y, x + w, y + 28], fill=(rnd.randint(0, 80),) * 3)
+            x += w + rnd.randint(20, 40)
+    for _ in range(width * height // 500):
+        img.putpixel((rnd.randrange(width), rnd.randrange(height)), (rnd.randrange(256),) * 3)
+    return img if mode == "RGB" else img.convert(mode)
+
+
+def time_fn(fn, img, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(img)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OCR page preprocessing.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case (best time is reported)")
+    args = parser.parse_args()
+
+    cases = [
+        ("A4 300dpi RGB (upscaled)", make_page(2480, 3508, "RGB")),
+        ("A4 300dpi L (upscaled)", make_page(2480, 3508, "L")),
+        ("2500px L (no resize)", make_page(2500, 3536, "L")),
+    ]
+    print(f"{'case':<28}{'legacy ms':>12}{'current ms':>12}{'speedup':>10}  identical")
+    for name, img in cases:
+        identical = legacy_preprocess_image(img).tobytes() == preprocess_image(img).tobytes()
+        legacy = time_fn(legacy_preprocess_image, img, args.repeat)
+        current = time_fn(preprocess_image, img, args.repeat)
+        print(f"{name:<28}{legacy * 1000:>12.1f}{current * 1000:>12.1f}{legacy / current:>9.2f}x  {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+توليد صفحات تجريبية ثابتة لاختبارات الأداء (دون إنترنت ودون ملفات خارجية)
+
+كل صفحة تُرسم بـ Pillow من بذرة ثابتة، فنفس المعاملات تعطي نفس الصور ونفس ملفات PDF
+على كل جهاز يستخدم نفس الخط. أنواع الصفحات:
+- arabic / english / mixed: فقرات نص عربي أو إنجليزي أو مختلط.
+- table: جدول بخطوط وأرقام وكلمات قصيرة.
+- noisy: نص على خلفية رمادية مع نقاط ضجيج وميلان خفيف (محاكاة مسح ضوئي رديء).
+- blank: صفحة فارغة بها بقع قليلة (فواصل المسح).
+
+الخط: يُستخدم أول خط متوفر يدعم العربية من FONT_CANDIDATES (أو --font)، وإلا خط Pillow
+الافتراضي. بدون مكتبة raqm لا تُشكَّل الحروف العربية، وتُسجل هذه المعلومات في نتائج القياس.
+
+build_document يكتب ملفات PDF كبيرة (آلاف الصفحات) لقياس أدوات PDF: صفحات نص متجهي
+وصفحات صور ممسوحة بنسبة قابلة للتحكم، مباشرة على القرص.
+"""
+import io
+import os
+import json
+import random
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFont, ImageChops, features
+
+PAGE_KINDS = ("arabic", "english", "mixed", "table", "noisy", "blank")
+
+# حجم A4 بالبوصة
+PAGE_INCHES = (8.27, 11.69)
+
+FONT_CANDIDATES = (
+    "C:/Windows/Fonts/arial.ttf",
+    "C:/Windows/Fonts/tahoma.ttf",
+    "/usr/share/fonts/truetype/noto/NotoNaskhArabic-Regular.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+    "/System/Library/Fonts/Supplemental/Arial.ttf",
+    "/Library/Fonts/Arial Unicode.ttf",
+)
+
+ARABIC_WORDS = (
+    "بسم", "الله", "الرحمن", "الرحيم", "الحمد", "رب", "العالمين", "كتاب", "وزارة", "التعليم",
+    "المملكة", "العربية", "السعودية", "الجمهورية", "المصرية", "قرار", "رقم", "بتاريخ", "الموافق",
+    "المادة", "الأولى", "الثانية", "يعمل", "بهذا", "النظام", "من", "إلى", "على", "في", "عن",
+    "الطالب", "المدرسة", "الجامعة", "المدير", "العام", "الشؤون", "الإدارية", "والمالية",
+    "تقرير", "سنوي", "الميزانية", "المشروع", "اللجنة", "الاجتماع", "المحضر", "التوصيات",
+    "السلام", "عليكم", "ورحمة", "وبركاته", "وبعد", "نحيطكم", "علماً", "بأنه", "تم", "اعتماد",
+)
+
+ENGLISH_WORDS = (
+    "the", "annual", "report", "of", "ministry", "education", "budget", "project", "committee",
+    "meeting", "minutes", "decision", "article", "system", "university", "student", "department",
+    "finance", "administration", "office", "total", "amount", "date", "reference", "number",
+    "approved", "review", "schedule", "invoice", "contract", "section", "page", "summary",
+)
+
+
+def page_size(dpi):
+    return round(PAGE_INCHES[0] * dpi), round(PAGE_INCHES[1] * dpi)
+
+
+def find_font(font_path=None):
+    """مسار الخط المستخدم، أو None لخط Pillow الافتراضي"""
+    for candidate in (font_path, os.environ.get("WARRAQ_BENCH_FONT"), *FONT_CANDIDATES):
+        if candidate and Path(candidate).is_file():
+            return str(candidate)
+    return None
+
+
+def load_font(font_path, size):
+    if font_path:
+        return ImageFont.truetype(font_path, size)
+    return ImageFont.load_default(size)
+
+
+def environment_info(font_path):
+    """معلومات الرسم التي تؤثر على الصور الناتجة (تُحفظ مع النتائج)"""
+    return {"font": Path(font_path).name if font_path else "pillow-default", "raqm": features.check("raqm")}
+
+
+def _sentence(rnd, words, count):
+    return " ".join(rnd.choice(words) for _ in range(count))
+
+
+def _line_text(kind, rnd):
+    if kind == "english":
+        return _sentence(rnd, ENGLISH_WORDS, rnd.randint(6, 11))
+    if kind == "mixed" and rnd.random() < 0.4:
+        return f"{_sentence(rnd, ARABIC_WORDS, rnd.randint(3, 6))} {_sentence(rnd, ENGLISH_WORDS, rnd.randint(1, 3))} {rnd.randint(1, 9999)}"
+    return _sentence(rnd, ARABIC_WORDS, rnd.randint(6, 11))
+
+
+def _draw_line(draw, text, y, width, margin, font, rtl):
+    if rtl and features.check("raqm"):
+        draw.text((width - margin, y), text, font=font, fill=0, anchor="ra", direction="rtl")
+    elif rtl:
+        draw.text((width - margin, y), text, font=font, fill=0, anchor="ra")
+    else:
+        draw.text((margin, y), text, font=font, fill=0)
+
+
+def _draw_paragraphs(draw, kind, rnd, width, height, dpi, font):
+    margin = int(dpi * 0.8)
+    line_height = int(font.size * 1.8)
+    lines = []
+    y = margin
+    while y < height - margin - line_height:
+        if rnd.random() < 0.08:
+            # سطر فارغ بين الفقرات
+            y += line_height
+            continue
+        text = _line_text(kind, rnd)
+        _draw_line(draw, text, y, width, margin, font, rtl=kind != "english")
+        lines.append(text)
+        y += line_height
+    return "\n".join(lines)
+
+
+def _draw_table(draw, rnd, width, height, dpi, font):
+    margin = int(dpi * 0.8)
+    columns, rows = 5, 18
+    cell_w = (width - 2 * margin) // columns
+    cell_h = int(font.size * 2.4)
+    lines = []
+    for r in range(rows + 1):
+        y = margin + r * cell_h
+        draw.line([(margin, y), (width - margin, y)], fill=0, width=max(1, dpi // 100))
+    for c in range(columns + 1):
+        x = margin + c * cell_w
+        draw.line([(x, margin), (x, margin + rows * cell_h)], fill=0, width=max(1, dpi // 100))
+    for r in range(rows):
+        cells = []
+        for c in range(columns):
+            value = rnd.choice(ARABIC_WORDS) if c == columns - 1 else str(rnd.randint(1, 99999))
+            cells.append(value)
+            # الأعمدة تُقرأ من اليمين إلى اليسار
+            x = width - margin - c * cell_w - int(font.size * 0.5)
+            draw.text((x, margin + r * cell_h + int(font.size * 0.6)), value, font=font, fill=0, anchor="ra")
+        lines.append(" ".join(cells))
+    return "\n".join(lines)
+
+
+def _noise_layer(rnd, size, ratio):
+    """طبقة بقع سوداء عشوائية ثابتة البذرة (ratio نسبة البكسلات السوداء تقريباً)"""
+    cutoff = max(1, int(256 * ratio))
+    raw = Image.frombytes("L", size, rnd.randbytes(size[0] * size[1]))
+    return raw.point([0 if v < cutoff else 255 for v in range(256)])
+
+
+def render_page(kind, seed=0, dpi=300, font_path=None):
+    """رسم صفحة واحدة وإرجاع (الصورة بنمط L، النص المرسوم)"""
+    if kind not in PAGE_KINDS:
+        raise ValueError(f"Unknown page kind: {kind}")
+    rnd = random.Random(f"{kind}-{seed}-{dpi}")
+    width, height = page_size(dpi)
+    img = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(img)
+    # خط بحجم 12 نقطة تقريباً
+    font = load_font(font_path, max(8, dpi // 6))
+
+    if kind == "blank":
+        return ImageChops.darker(img, _noise_layer(rnd, img.size, 0.00005)), ""
+    if kind == "table":
+        text = _draw_table(draw, rnd, width, height, dpi, font)
+    else:
+        text = _draw_paragraphs(draw, "arabic" if kind == "noisy" else kind, rnd, width, height, dpi, font)
+
+    if kind == "noisy":
+        # خلفية رمادية وضجيج نقطي وميلان خفيف كصفحة ممسوحة
+        img = img.point([60 + v * 170 // 255 for v in range(256)])
+        img = ImageChops.darker(img, _noise_layer(rnd, img.size, 0.004))
+        img = img.rotate(rnd.uniform(-1.5, 1.5), resample=Image.Resampling.BICUBIC, expand=False, fillcolor=230)
+    return img, text
+
+
+def build_corpus(directory, pages_per_kind=2, dpi=300, kinds=PAGE_KINDS, font_path=None):
+    """توليد ملفات PDF للصفحات في directory وإرجاع بيان المجموعة
+
+    يُكتب ملف PDF لكل نوع (<النوع>.pdf) وملف corpus.pdf يضم كل الصفحات بالتناوب بين الأنواع،
+    وملف manifest.json بالإعدادات والنص المرسوم لكل صفحة.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest = {"dpi": dpi, "pages_per_kind": pages_per_kind, "kinds": list(kinds),
+                "render": environment_info(font_path), "files": {}, "pages": []}
+
+    by_kind = {kind: [render_page(kind, seed, dpi, font_path) for seed in range(pages_per_kind)] for kind in kinds}
+    for kind, pages in by_kind.items():
+        path = directory / f"{kind}.pdf"
+        _save_pdf(path, [img for img, _ in pages], dpi)
+        manifest["files"][kind] = path.name
+
+    interleaved = [(kind, seed) for seed in range(pages_per_kind) for kind in kinds]
+    _save_pdf(directory / "corpus.pdf", [by_kind[kind][seed][0] for kind, seed in interleaved], dpi)
+    manifest["files"]["corpus"] = "corpus.pdf"
+    manifest["pages"] = [{"kind": kind, "seed": seed, "text": by_kind[kind][seed][1]} for kind, seed in interleaved]
+
+    (directory / "manifest.json").write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    return manifest
+
+
+def _save_pdf(path, images, dpi):
+    images[0].save(path, "PDF", save_all=True, append_images=images[1:], resolution=dpi)
+
+
+def build_document(path, pages, image_ratio=0.5, image_dpi=150, seed=0, font_path=None):
+    """كتابة ملف PDF كبير من pages صفحة مباشرة على القرص وإرجاع حجمه بالبايت
+
+    الصفحات المختارة عشوائياً بنسبة image_ratio تحمل صورة ممسوحة (JPEG بدقة image_dpi)،
+    والباقي نص متجهي بخط Helvetica. لكل صفحة كائن صورة مستقل كما في ملفات الماسح الحقيقية،
+    لكن الصور تُرسم مرة واحدة فقط، فتوليد آلاف الصفحات لا يحتاج ذاكرة أو وقتاً كبيراً.
+    """
+    rnd = random.Random(f"document-{seed}-{pages}-{image_ratio}-{image_dpi}")
+    scans = []
+    for kind in ("arabic", "table", "noisy"):
+        img = render_page(kind, seed, image_dpi, font_path)[0]
+        buffer = io.BytesIO()
+        img.save(buffer, "JPEG", quality=75)
+        scans.append((img.size, buffer.getvalue()))
+    width, height = round(PAGE_INCHES[0] * 72, 2), round(PAGE_INCHES[1] * 72, 2)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f:
+        writer = _RawPdfWriter(f)
+        catalog, pages_ref, font = writer.reserve(), writer.reserve(), writer.reserve()
+        writer.write_object(font, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        kids = []
+        for page_no in range(1, pages + 1):
+            if rnd.random() < image_ratio:
+                (img_w, img_h), data = rnd.choice(scans)
+                image = writer.reserve()
+                writer.write_stream(image, data, f"/Type /XObject /Subtype /Image /Width {img_w} /Height {img_h} "
+                                                 f"/ColorSpace /DeviceGray /BitsPerComponent 8 /Filter /DCTDecode")
+                resources = f"<< /XObject << /Im1 {image} 0 R >> >>"
+                content = f"q {width} 0 0 {height} 0 0 cm /Im1 Do Q"
+            else:
+                lines = [_sentence(rnd, ENGLISH_WORDS, rnd.randint(6, 11)) for _ in range(45)]
+                resources = f"<< /Font << /F1 {font} 0 R >> >>"
+                content = f"BT /F1 11 Tf 15 TL 56 {height - 60} Td ({page_no}) Tj T* " + \
+                          " ".join(f"({line}) Tj T*" for line in lines) + " ET"
+            contents = writer.reserve()
+            writer.write_stream(contents, content.encode("ascii"))
+            page = writer.reserve()
+            writer.write_object(page, f"<< /Type /Page /Parent {pages_ref} 0 R /MediaBox [0 0 {width} {height}] "
+                                      f"/Resources {resources} /Contents {contents} 0 R >>".encode("ascii"))
+            kids.append(f"{page} 0 R")
+        writer.write_object(pages_ref, f"<< /Type /Pages /Count {pages} /Kids [{' '.join(kids)}] >>".encode("ascii"))
+        writer.write_object(catalog, f"<< /Type /Catalog /Pages {pages_ref} 0 R >>".encode("ascii"))
+        writer.close(catalog)
+    return path.stat().st_size
+
+
+class _RawPdfWriter:
+    """كاتب PDF بسيط يكتب الكائنات مباشرة على الملف ثم جدول xref في النهاية"""
+
+    def __init__(self, f):
+        self.f = f
+        self.offsets = {}
+        self.count = 0
+        f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def reserve(self):
+        self.count += 1
+        return self.count
+
+    def write_object(self, number, body):
+        self.offsets[number] = self.f.tell()
+        self.f.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+
+    def write_stream(self, number, data, entries=""):
+        self.offsets[number] = self.f.tell()
+        self.f.write(f"{number} 0 obj\n<< {entries} /Length {len(data)} >>\nstream\n".encode("ascii"))
+        self.f.write(data)
+        self.f.write(b"\nendstream\nendobj\n")
+
+    def close(self, root):
+        xref = self.f.tell()
+        self.f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (self.count + 1))
+        for number in range(1, self.count + 1):
+            self.f.write(b"%010d 00000 n \n" % self.offsets[number])
+        self.f.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (self.count + 1, root, xref))
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+حفظ نتائج اختبارات الأداء بصيغة JSON ومقارنتها بين نسختين من البرنامج
+
+كل ملف نتائج يحتوي معلومات البيئة (النسخة، رقم commit، المعالج، المكتبات) وقائمة مقاييس
+مسطحة {الاسم: القيمة}. أسماء المقاييس تنتهي بوحدتها، وتحدد better_direction أيهما أفضل:
+القيمة الأعلى (مثل pages_per_second) أو الأقل (الزمن والذاكرة والحجم).
+"""
+import os
+import sys
+import json
+import time
+import platform
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SCHEMA_VERSION = 1
+
+# لاحقات المقاييس التي تكون قيمتها الأعلى أفضل (والباقي الأقل أفضل)
+HIGHER_IS_BETTER = ("_per_second",)
+
+
+def git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10)
+        return result.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def poppler_version():
+    """نسخة pdftoppm المستخدمة، أو None إذا لم يكن Poppler متوفراً"""
+    from core.config import POPPLER_PATH
+    from core.poppler import poppler_command
+    try:
+        result = subprocess.run([poppler_command("pdftoppm", POPPLER_PATH), "-v"], capture_output=True,
+                                text=True, timeout=10)
+        return (result.stderr or result.stdout).splitlines()[0].strip()
+    except (OSError, IndexError, subprocess.SubprocessError):
+        return None
+
+
+def environment(**extra):
+    from core.config import VERSION
+    info = {
+        "warraq_version": VERSION,
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+    info.update(extra)
+    return info
+
+
+def save_results(path, suite, config, metrics, details=None, **env):
+    results = {
+        "schema": SCHEMA_VERSION,
+        "suite": suite,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": environment(**env),
+        "config": config,
+        "metrics": metrics,
+        "details": details or {},
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+    return results
+
+
+def load_results(path):
+    results = json.loads(Path(path).read_text(encoding="utf-8"))
+    if results.get("schema") != SCHEMA_VERSION:
+        raise ValueError(f"{path}: unsupported results schema {results.get('schema')}")
+    return results
+
+
+def better_direction(name):
+    return 1 if name.endswith(HIGHER_IS_BETTER) else -1
+
+
+def compare(baseline, current, threshold=0.10):
+    """مقارنة مقاييس نتيجتين وإرجاع الصفوف وعدد المقاييس التي ساءت بأكثر من threshold
+
+    كل صف: (الاسم، القيمة القديمة، الجديدة، نسبة التغير، الحكم) والحكم better أو worse أو "".
+    """
+    old, new = baseline["metrics"], current["metrics"]
+    rows = []
+    regressions = 0
+    for name in sorted(set(old) | set(new)):
+        before, after = old.get(name), new.get(name)
+        if before is None or after is None or not before:
+            rows.append((name, before, after, None, ""))
+            continue
+        change = (after - before) / abs(before)
+        verdict = ""
+        if abs(change) > threshold:
+            verdict = "better" if change * better_direction(name) > 0 else "worse"
+            regressions += verdict == "worse"
+        rows.append((name, before, after, change, verdict))
+    return rows, regressions
+
+
+def print_comparison(baseline, current, threshold=0.10, out=sys.stdout):
+    """طباعة جدول المقارنة وإرجاع عدد المقاييس التي ساءت"""
+    rows, regressions = compare(baseline, current, threshold)
+    old_env, new_env = baseline["environment"], current["environment"]
+    print(f"baseline: {old_env.get('commit') or '?'} ({baseline['created']})", file=out)
+    print(f"current:  {new_env.get('commit') or '?'} ({current['created']})", file=out)
+    for key in ("platform", "cpu_count", "tesseract", "poppler", "font"):
+        if old_env.get(key) != new_env.get(key):
+            print(f"warning: {key} differs: {old_env.get(key)} -> {new_env.get(key)}", file=out)
+
+    width = max([len(row[0]) for row in rows] + [6])
+    print(f"{'metric':<{width}}{'baseline':>14}{'current':>14}{'change':>10}", file=out)
+    for name, before, after, change, verdict in rows:
+        before_s = "-" if before is None else f"{before:.4g}"
+        after_s = "-" if after is None else f"{after:.4g}"
+        change_s = "" if change is None else f"{change * 100:+.1f}%"
+        print(f"{name:<{width}}{before_s:>14}{after_s:>14}{change_s:>10}  {verdict}", file=out)
+    print(f"{regressions} metric(s) worse by more than {threshold * 100:.0f}%", file=out)
+    return regressions
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+إلغاء المهام أثناء تشغيل العمليات الفرعية (tesseract و pdftoppm و pdftotext)
+
+تنتظر run_process العملية الفرعية على فترات قصيرة وتفحص حدث الإلغاء بين كل فترتين،
+فإذا ضُبط الحدث تُنهى العملية فوراً بدلاً من انتظار اكتمال الصفحة أو الملف.
+يعمل حدث الإلغاء من threading أو من multiprocessing (لعمليات مجمع OCR) بنفس الطريقة.
+"""
+import time
+import subprocess
+
+# أقصى مدة بين فحصين لحدث الإلغاء أثناء انتظار عملية فرعية (بالثواني)
+CANCEL_POLL_INTERVAL = 0.1
+
+
+class JobCancelled(Exception):
+    """أُلغيت المهمة أثناء تنفيذ هذه الخطوة"""
+
+    def __init__(self, message="تم إلغاء العملية"):
+        super().__init__(message)
+
+
+def check_cancelled(cancel_event):
+    """رفع JobCancelled إذا كان حدث الإلغاء مضبوطاً"""
+    if cancel_event is not None and cancel_event.is_set():
+        raise JobCancelled()
+
+
+def run_process(args, cancel_event=None, timeout=None, **popen_kwargs):
+    """تشغيل عملية فرعية وإرجاع (رمز الخروج، المخرجات، الأخطاء)
+
+    تُنهى العملية وترفع JobCancelled عند ضبط cancel_event، أو ترفع
+    subprocess.TimeoutExpired بعد timeout ثانية. popen_kwargs تُمرر إلى subprocess.Popen
+    (عادةً stdout و stderr = subprocess.PIPE).
+    """
+    check_cancelled(cancel_event)
+    deadline = time.monotonic() + timeout if timeout else None
+    proc = subprocess.Popen(args, **popen_kwargs)
+    try:
+        while True:
+            try:
+                stdout, stderr = proc.communicate(timeout=CANCEL_POLL_INTERVAL)
+                return proc.returncode, stdout, stderr
+            except subprocess.TimeoutExpired:
+                pass
+            check_cancelled(cancel_event)
+            if deadline is not None and time.monotonic() > deadline:
+                raise subprocess.TimeoutExpired(args, timeout)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.communicate()
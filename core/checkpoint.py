@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+سجل نقاط الاستئناف لمهام OCR (Checkpoint Journal)
+
+تُسجَّل كل صفحة مكتملة فور انتهائها في ملف JSONL خاص بالمهمة، ويُشتق اسم الملف من
+إعدادات المهمة وبصمات الملفات المدخلة. عند إعادة تشغيل نفس المهمة (بعد تعطل البرنامج
+أو الإيقاف) تُقرأ الصفحات المسجلة ويُستأنف العمل من الصفحات الناقصة فقط.
+
+تُحفظ السجلات في CHECKPOINT_DIR (~/.warraq/checkpoints أو مجلد WARRAQ_DATA_DIR/checkpoints).
+يُحذف السجل عند اكتمال المهمة، أما سجلات المهام المتروكة أو التي تغيرت ملفاتها أو إعداداتها
+(فلن يُعاد فتحها باسمها) فتُحذف عند فتح أي سجل إذا مضى على آخر كتابة فيها CHECKPOINT_MAX_AGE_DAYS يوماً.
+"""
+import json
+import time
+import hashlib
+import logging
+from pathlib import Path
+
+from core.config import CHECKPOINT_DIR, CHECKPOINT_MAX_AGE_DAYS
+
+# حجم الجزء المقروء من بداية الملف ونهايته لحساب البصمة
+_FINGERPRINT_CHUNK = 1024 * 1024
+
+
+def file_fingerprint(path):
+    """بصمة سريعة للملف: الحجم ووقت التعديل وSHA-256 لأول وآخر 1MB"""
+    path = Path(path)
+    stat = path.stat()
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        digest.update(f.read(_FINGERPRINT_CHUNK))
+        if stat.st_size > _FINGERPRINT_CHUNK:
+            f.seek(max(_FINGERPRINT_CHUNK, stat.st_size - _FINGERPRINT_CHUNK))
+            digest.update(f.read(_FINGERPRINT_CHUNK))
+    return {"name": path.name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest.hexdigest()}
+
+
+def remove_stale_journals(directory=CHECKPOINT_DIR, max_age_days=CHECKPOINT_MAX_AGE_DAYS):
+    """حذف السجلات التي لم يُكتب فيها منذ max_age_days يوماً، وإرجاع عددها"""
+    cutoff = time.time() - max_age_days * 86400
+    removed = 0
+    try:
+        journals = list(Path(directory).glob("*.jsonl"))
+    except OSError:
+        return 0
+    for path in journals:
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except OSError as e:
+            logging.warning(f"تعذر حذف سجل نقاط الاستئناف القديم {path}: {e}")
+    if removed:
+        logging.info(f"تم حذف {removed} من سجلات نقاط الاستئناف الأقدم من {max_age_days} يوماً")
+    return removed
+
+
+class CheckpointJournal:
+    """سجل الصفحات المكتملة لمهمة OCR واحدة"""
+
+    def __init__(self, settings, paths, directory=CHECKPOINT_DIR):
+        self.header = {
+            "settings": settings,
+            "files": [file_fingerprint(p) if Path(p).is_file() else None for p in paths],
+        }
+        identity = json.dumps(self.header, sort_keys=True, ensure_ascii=False)
+        self.job_id = hashlib.sha256(identity.encode("utf-8")).hexdigest()[:32]
+        self.path = Path(directory) / f"{self.job_id}.jsonl"
+        # الصفحات المكتملة: {رقم الملف: {رقم الصفحة: (النص، المصدر)}}
+        self.completed = {}
+        self._file = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            self._load()
+        self._file = open(self.path, "a", encoding="utf-8")
+        if not self.path.stat().st_size:
+            self._write(self.header)
+
+    @classmethod
+    def open(cls, settings, paths, directory=CHECKPOINT_DIR):
+        """فتح سجل المهمة أو إرجاع None إذا تعذر ذلك (تستمر المهمة دون استئناف)
+
+        تُحذف قبل ذلك السجلات القديمة في نفس المجلد (انظر remove_stale_journals).
+        """
+        remove_stale_journals(directory)
+        try:
+            return cls(settings, paths, directory)
+        except Exception as e:
+            logging.warning(f"تعذر فتح سجل نقاط الاستئناف: {e}")
+            return None
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # سطر أخير مبتور بسبب تعطل أثناء الكتابة
+                    continue
+                if "page" in record:
+                    pages = self.completed.setdefault(record["file"], {})
+                    pages[record["page"]] = (record["text"], record.get("source", "ocr"))
+
+    @property
+    def completed_count(self):
+        return sum(len(pages) for pages in self.completed.values())
+
+    def pages_for(self, file_index):
+        return self.completed.get(file_index, {})
+
+    def record(self, file_index, page_no, text, source):
+        """تسجيل صفحة مكتملة وكتابتها إلى القرص فوراً"""
+        self.completed.setdefault(file_index, {})[page_no] = (text, source)
+        self._write({"file": file_index, "page": page_no, "text": text, "source": source})
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def discard(self):
+        """حذف السجل بعد اكتمال المهمة بنجاح"""
+        self.close()
+        try:
+            self.path.unlink()
+        except OSError as e:
+            logging.warning(f"تعذر حذف سجل نقاط الاستئناف {self.path}: {e}")
@@ -0,0 +1,384 @@
+# -*- coding: utf-8 -*-
+"""
+واجهة سطر الأوامر لوراق (دون واجهة رسومية)
+
+تنفذ OCR وجميع عمليات PDFProcessor على ملفات أو أنماط (glob) أو مجلدات، ولا تستورد
+PySide6 إطلاقاً حتى تعمل على الخوادم ومهام cron بزمن بدء قصير. يتم استيراد وحدات
+المعالجة عند تنفيذ الأمر فقط.
+
+أمثلة:
+    python warraq.py ocr scans/ --workers 4 --json
+    python warraq.py compress-pdf "reports/**/*.pdf" --jobs 4 -o out/ --summary summary.json
+    python warraq.py merge a.pdf b.pdf -o merged.pdf
+    python warraq.py encrypt report.pdf --password-file secret.txt   (أو --password-env، وإلا تُطلب كلمة المرور)
+    python warraq.py watch //scanner/inbox --jobs 2 --workers 2
+    python warraq.py serve --port 8765
+    python warraq.py --profile all ocr slow.pdf
+
+رمز الخروج: 0 عند نجاح كل الملفات، 1 عند فشل أي ملف، 2 عند خطأ في المعاملات.
+"""
+import os
+import sys
+import glob
+import json
+import time
+import logging
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from core.config import (
+    VERSION, OCR_WORKERS, OCR_ENGINE, WATCH_POLL_INTERVAL, WATCH_SETTLE_SECONDS, WATCH_STATUS_FILE,
+    SERVER_HOST, SERVER_PORT, SERVER_QUEUE_SIZE, PROFILE_ENV_VAR
+)
+from core.utils import setup_logging
+
+PDF_EXTENSIONS = (".pdf",)
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tiff", ".tif")
+OCR_EXTENSIONS = PDF_EXTENSIONS + IMAGE_EXTENSIONS
+
+
+def expand_inputs(patterns, extensions, recursive=False):
+    """تحويل المدخلات (ملفات أو أنماط glob أو مجلدات) إلى قائمة ملفات مرتبة دون تكرار
+
+    تُرجع (الملفات، المدخلات التي لم تطابق أي ملف).
+    """
+    files, missing, seen = [], [], set()
+
+    def add(path):
+        key = os.path.normcase(os.path.abspath(path))
+        if key not in seen:
+            seen.add(key)
+            files.append(str(path))
+
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            candidates = path.rglob("*") if recursive else path.iterdir()
+            matched = sorted(p for p in candidates if p.is_file() and p.suffix.lower() in extensions)
+        elif glob.has_magic(pattern):
+            matched = sorted(Path(p) for p in glob.glob(pattern, recursive=True)
+                             if Path(p).is_file() and Path(p).suffix.lower() in extensions)
+        elif path.is_file():
+            matched = [path]
+        else:
+            matched = []
+
+        if not matched:
+            missing.append(pattern)
+        for p in matched:
+            add(p)
+    return files, missing
+
+
+def _output_path(path, output_dir, suffix, ext=None):
+    """مسار ملف ناتج بجانب الملف المدخل أو في output_dir: <الاسم><suffix><الامتداد>"""
+    path = Path(path)
+    directory = Path(output_dir) if output_dir else path.parent
+    return str(directory / f"{path.stem}{suffix}{ext or path.suffix}")
+
+
+def run_operation(name, args):
+    """تنفيذ عملية PDFProcessor واحدة (دالة على مستوى الوحدة لتعمل داخل مجمع العمليات)"""
+    from core.pdf_processor import PDFProcessor
+    try:
+        success, message = getattr(PDFProcessor, name)(*args)
+    except Exception as e:
+        logging.error(f"خطأ في العملية {name}: {e}")
+        success, message = False, str(e)
+    return success, message
+
+
+# عمليات ملف واحد ← ملف/مجلد ناتج: (اسم الدالة في PDFProcessor، الامتدادات، بناء المعاملات)
+def _split_args(path, opts):
+    return (path, opts.output_dir or str(Path(path).parent), opts.pages)
+
+
+def _split_pages_args(path, opts):
+    return (path, opts.output_dir or str(Path(path).parent))
+
+
+def _encrypt_args(path, opts):
+    return (path, opts.password, _output_path(path, opts.output_dir, "_protected"))
+
+
+def _decrypt_args(path, opts):
+    return (path, opts.password, _output_path(path, opts.output_dir, "_unlocked"))
+
+
+def _pdf_to_images_args(path, opts):
+    from core.config import POPPLER_PATH
+    return (path, opts.output_dir or str(Path(path).parent), str(POPPLER_PATH) if POPPLER_PATH else None)
+
+
+def _compress_pdf_args(path, opts):
+    return (path, _output_path(path, opts.output_dir, "_compressed"))
+
+
+def _compress_images_args(path, opts):
+    return ([path], opts.output_dir or str(Path(path).parent), opts.quality)
+
+
+PER_FILE_OPERATIONS = {
+    "split": ("split_pdf", PDF_EXTENSIONS, _split_args),
+    "split-pages": ("split_pdf_to_pages", PDF_EXTENSIONS, _split_pages_args),
+    "encrypt": ("encrypt_pdf", PDF_EXTENSIONS, _encrypt_args),
+    "decrypt": ("decrypt_pdf", PDF_EXTENSIONS, _decrypt_args),
+    "pdf-to-images": ("pdf_to_images", PDF_EXTENSIONS, _pdf_to_images_args),
+    "compress-pdf": ("compress_pdf", PDF_EXTENSIONS, _compress_pdf_args),
+    "compress-images": ("compress_images", IMAGE_EXTENSIONS, _compress_images_args),
+}
+
+# عمليات عدة ملفات ← ملف واحد
+COMBINE_OPERATIONS = {
+    "merge": ("merge_pdfs", PDF_EXTENSIONS),
+    "images-to-pdf": ("images_to_pdf", IMAGE_EXTENSIONS),
+}
+
+
+class Reporter:
+    """طباعة التقدم على stderr وتجميع الملخص الذي يُكتب بصيغة JSON"""
+
+    def __init__(self, command, quiet=False):
+        self.quiet = quiet
+        self.start_time = time.time()
+        self.summary = {"command": command, "version": VERSION, "ok": True, "results": [], "errors": []}
+
+    def info(self, message):
+        if not self.quiet:
+            print(message, file=sys.stderr, flush=True)
+
+    def error(self, message):
+        self.summary["errors"].append(message)
+        print(f"خطأ: {message}", file=sys.stderr, flush=True)
+
+    def result(self, input_path, success, message, **extra):
+        self.summary["results"].append({"input": input_path, "ok": success, "message": message, **extra})
+        if not success:
+            self.summary["ok"] = False
+        self.info(f"{'✓' if success else '✗'} {input_path}: {message}")
+
+    def finish(self, opts):
+        self.summary["elapsed"] = round(time.time() - self.start_time, 2)
+        text = json.dumps(self.summary, ensure_ascii=False, indent=2)
+        if opts.summary:
+            Path(opts.summary).write_text(text, encoding="utf-8")
+        if opts.json:
+            print(text)
+        return 0 if self.summary["ok"] and not self.summary["errors"] else 1
+
+
+def _collect(opts, extensions, reporter):
+    files, missing = expand_inputs(opts.inputs, extensions, opts.recursive)
+    for pattern in missing:
+        reporter.error(f"لا توجد ملفات مطابقة: {pattern}")
+    return files
+
+
+def cmd_ocr(opts, reporter):
+    from core.ocr_job import OCRJob
+
+    files = _collect(opts, OCR_EXTENSIONS, reporter)
+    if not files:
+        return
+
+    def on_progress(data):
+        reporter.info(f"[{data['elapsed']}s] صفحة {data['page']}/{data['total']} ({data['source']})")
+
+    job = OCRJob(on_progress=on_progress, on_error=reporter.error, on_log=reporter.info)
+    try:
+        result = job.run(files, per_file_output=not opts.combine, **_ocr_options(opts))
+    except KeyboardInterrupt:
+        job.stop()
+        reporter.error("تم إيقاف العملية.")
+        return
+
+    if result is None:
+        reporter.summary["ok"] = False
+        return
+    reporter.summary["ocr"] = result
+    for path in result["text_paths"]:
+        reporter.result(path, True, "تم حفظ النص")
+
+
+def cmd_watch(opts, reporter):
+    from core.watcher import FolderWatcher
+
+    watcher = FolderWatcher(
+        opts.inputs, done_dir=opts.done_dir, failed_dir=opts.failed_dir, jobs=opts.jobs,
+        ocr_options=_ocr_options(opts), poll_interval=opts.interval, settle_seconds=opts.settle,
+        status_file=opts.status_file, on_log=reporter.info
+    )
+    watcher.run()
+    reporter.summary["watch"] = watcher.status()
+
+
+def cmd_serve(opts, reporter):
+    from core.server import serve
+
+    reporter.summary["serve"] = serve(opts.host, opts.port, workers=opts.jobs, queue_size=opts.queue_size,
+                                      ocr_workers=opts.workers, on_log=reporter.info)
+
+
+def _ocr_options(opts):
+    """معاملات OCRJob.run من خيارات سطر الأوامر المشتركة بين ocr و watch"""
+    return {
+        "lang": opts.lang, "dpi": opts.dpi, "start_page": opts.first_page, "end_page": opts.last_page,
+        "preprocess": not opts.no_preprocess, "workers": opts.workers, "engine": opts.engine,
+        "use_cache": not opts.no_cache, "use_text_layer": not opts.no_text_layer,
+        "skip_blank": not opts.no_skip_blank, "resume": not opts.no_resume
+    }
+
+
+def cmd_per_file(opts, reporter):
+    name, extensions, build_args = PER_FILE_OPERATIONS[opts.command]
+    files = _collect(opts, extensions, reporter)
+    if opts.output_dir:
+        Path(opts.output_dir).mkdir(parents=True, exist_ok=True)
+
+    tasks = [(path, build_args(path, opts)) for path in files]
+    if opts.jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=opts.jobs) as executor:
+            futures = [(path, executor.submit(run_operation, name, args)) for path, args in tasks]
+            for path, future in futures:
+                reporter.result(path, *future.result())
+    else:
+        for path, args in tasks:
+            reporter.result(path, *run_operation(name, args))
+
+
+def cmd_combine(opts, reporter):
+    name, extensions = COMBINE_OPERATIONS[opts.command]
+    files = _collect(opts, extensions, reporter)
+    if not files:
+        return
+    success, message = run_operation(name, (files, opts.output))
+    reporter.result(opts.output, success, message, inputs=files)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="warraq", description="Warraq command line: OCR and PDF tools without the GUI.")
+    parser.add_argument("--version", action="version", version=f"Warraq {VERSION}")
+    parser.add_argument("--profile", choices=["all", "cpu", "memory"],
+                        help="Write cProfile/tracemalloc files for every job next to the log (see core.profiling)")
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("inputs", nargs="+", help="Files, glob patterns or directories")
+    common.add_argument("-r", "--recursive", action="store_true", help="Search directories recursively")
+    common.add_argument("--json", action="store_true", help="Print the JSON summary to stdout")
+    common.add_argument("--summary", metavar="FILE", help="Write the JSON summary to FILE")
+    common.add_argument("-q", "--quiet", action="store_true", help="Only print errors to stderr")
+
+    ocr_common = argparse.ArgumentParser(add_help=False)
+    ocr_common.add_argument("--lang", default="ara+eng", help="Tesseract languages (default: ara+eng)")
+    ocr_common.add_argument("--dpi", type=int, default=300)
+    ocr_common.add_argument("--first-page", type=int, default=1)
+    ocr_common.add_argument("--last-page", type=int, default=None)
+    ocr_common.add_argument("-w", "--workers", type=int, default=OCR_WORKERS, help="Parallel OCR processes per file")
+    ocr_common.add_argument("--engine", default=OCR_ENGINE, help="auto, tesserocr or pytesseract")
+    ocr_common.add_argument("--no-preprocess", action="store_true")
+    ocr_common.add_argument("--no-text-layer", action="store_true", help="OCR every page even if it has a text layer")
+    ocr_common.add_argument("--no-skip-blank", action="store_true")
+    ocr_common.add_argument("--no-cache", action="store_true")
+    ocr_common.add_argument("--no-resume", action="store_true")
+
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ocr = sub.add_parser("ocr", parents=[common, ocr_common], help="Extract text from PDFs and images")
+    ocr.add_argument("--combine", action="store_true", help="Write one combined text file instead of one per input")
+    ocr.set_defaults(handler=cmd_ocr)
+
+    watch = sub.add_parser("watch", parents=[ocr_common], help="Watch input folders and OCR new files continuously")
+    watch.add_argument("inputs", nargs="+", help="Input directories to watch")
+    watch.add_argument("--done-dir", help="Where finished files go (default: <input>/done)")
+    watch.add_argument("--failed-dir", help="Where failed files go (default: <input>/failed)")
+    watch.add_argument("-j", "--jobs", type=int, default=1, help="Files processed in parallel")
+    watch.add_argument("--interval", type=float, default=WATCH_POLL_INTERVAL, help="Seconds between folder scans")
+    watch.add_argument("--settle", type=float, default=WATCH_SETTLE_SECONDS,
+                       help="Seconds a file must stay unchanged before it is processed")
+    watch.add_argument("--status-file", default=str(WATCH_STATUS_FILE), help="JSON file with live counters")
+    watch.add_argument("--json", action="store_true", help="Print the final counters as JSON on exit")
+    watch.add_argument("--summary", metavar="FILE", help="Write the final counters to FILE")
+    watch.add_argument("-q", "--quiet", action="store_true", help="Only print errors to stderr")
+    watch.set_defaults(handler=cmd_watch)
+
+    serve = sub.add_parser("serve", help="Run the local HTTP job service (see core/server.py)")
+    serve.add_argument("--host", default=SERVER_HOST, help="Bind address (default: localhost only)")
+    serve.add_argument("--port", type=int, default=SERVER_PORT)
+    serve.add_argument("-j", "--jobs", type=int, default=1, help="Jobs executed in parallel")
+    serve.add_argument("-w", "--workers", type=int, default=OCR_WORKERS, help="OCR processes per job")
+    serve.add_argument("--queue-size", type=int, default=SERVER_QUEUE_SIZE,
+                       help="Queued jobs before new submissions get 503")
+    serve.add_argument("--json", action="store_true", help="Print the final counters as JSON on exit")
+    serve.add_argument("--summary", metavar="FILE", help="Write the final counters to FILE")
+    serve.add_argument("-q", "--quiet", action="store_true", help="Only print errors to stderr")
+    serve.set_defaults(handler=cmd_serve)
+
+    for command in PER_FILE_OPERATIONS:
+        op = sub.add_parser(command, parents=[common], help=f"PDFProcessor.{PER_FILE_OPERATIONS[command][0]}")
+        op.add_argument("-o", "--output-dir", help="Output directory (default: next to each input)")
+        op.add_argument("-j", "--jobs", type=int, default=1, help="Files processed in parallel")
+        if command == "split":
+            op.add_argument("--pages", required=True, help="Page range, e.g. '1-3, 5, 8-10'")
+        if command in ("encrypt", "decrypt"):
+            # لا تُقبل كلمة المرور نفسها كمعامل حتى لا تظهر في قائمة العمليات (ps) وسجل الأوامر
+            secret = op.add_mutually_exclusive_group()
+            secret.add_argument("--password-file", metavar="FILE",
+                                help="Read the password from the first line of FILE ('-' for stdin)")
+            secret.add_argument("--password-env", metavar="VAR", help="Read the password from environment variable VAR")
+        if command == "compress-images":
+            op.add_argument("--quality", type=int, default=70)
+        op.set_defaults(handler=cmd_per_file)
+
+    for command in COMBINE_OPERATIONS:
+        op = sub.add_parser(command, parents=[common], help=f"PDFProcessor.{COMBINE_OPERATIONS[command][0]}")
+        op.add_argument("-o", "--output", required=True, help="Output PDF file")
+        op.set_defaults(handler=cmd_combine)
+
+    return parser
+
+
+def read_password(opts, confirm=False):
+    """كلمة المرور من --password-file أو --password-env، أو بسؤال المستخدم دون إظهارها
+
+    ترفع ValueError إذا لم تتوفر كلمة مرور.
+    """
+    if opts.password_file:
+        if opts.password_file == "-":
+            password = sys.stdin.readline()
+        else:
+            with open(opts.password_file, encoding="utf-8") as f:
+                password = f.readline()
+        password = password.rstrip("\r\n")
+    elif opts.password_env:
+        password = os.environ.get(opts.password_env)
+        if password is None:
+            raise ValueError(f"environment variable {opts.password_env} is not set")
+    elif sys.stdin.isatty():
+        import getpass
+        password = getpass.getpass("Password: ")
+        if confirm and getpass.getpass("Confirm password: ") != password:
+            raise ValueError("passwords do not match")
+    else:
+        raise ValueError("no password given; use --password-file or --password-env")
+    if not password:
+        raise ValueError("the password is empty")
+    return password
+
+
+def main(argv=None):
+    parser = build_parser()
+    opts = parser.parse_args(argv)
+    if opts.command in ("encrypt", "decrypt"):
+        try:
+            opts.password = read_password(opts, confirm=opts.command == "encrypt")
+        except (OSError, ValueError) as e:
+            parser.error(f"{opts.command}: {e}")
+    setup_logging()
+    if opts.profile:
+        # عبر متغير البيئة حتى تصل إلى العمليات الفرعية (--jobs) أيضاً
+        os.environ[PROFILE_ENV_VAR] = opts.profile
+    reporter = Reporter(opts.command, opts.quiet)
+    opts.handler(opts, reporter)
+    return reporter.finish(opts)
@@ -13,6 +13,72 @@ else:
 VERSION = "2.0.0"
 LOG_FILE = BASE_DIR / "app.log"
 
+# مجلد البيانات الدائمة للمستخدم (ذاكرة OCR المؤقتة وغيرها) ويمكن تغييره عبر WARRAQ_DATA_DIR
+DATA_DIR = Path(os.environ.get('WARRAQ_DATA_DIR') or Path.home() / ".warraq")
+
+# ذاكرة نتائج OCR المؤقتة على القرص والحد الأقصى لحجمها
+OCR_CACHE_FILE = DATA_DIR / "ocr_cache.sqlite3"
+OCR_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# قواعد تنظيف نص OCR (التصحيحات وكلمات الضجيج): إضافات المستخدم وتعديلاته، والقواعد المرفقة مع البرنامج،
+# والملف المؤقت للقواعد المدمجة
+OCR_RULES_FILE = DATA_DIR / "ocr_rules.json"
+DEFAULT_OCR_RULES_FILE = BASE_DIR / "data" / "ocr_rules.json"
+OCR_RULES_CACHE_FILE = DATA_DIR / "ocr_rules.cache.json"
+
+# سجلات نقاط الاستئناف لمهام OCR غير المكتملة، وعمر السجل (منذ آخر كتابة فيه) الذي يُحذف بعده
+CHECKPOINT_DIR = DATA_DIR / "checkpoints"
+CHECKPOINT_MAX_AGE_DAYS = 30
+
+# عدد صفحات PDF التي يتم تحويلها إلى صور في كل دفعة أثناء OCR
+# (قيمة صغيرة تُبقي استهلاك الذاكرة ثابتاً مهما كان طول الملف)
+OCR_PAGE_WINDOW = 2
+
+# ميزانية الذاكرة المشتركة لصور الصفحات المحولة من PDF (بالبايت) بين كل المهام الجارية في البرنامج،
+# ويتوقف تحويل الصفحات مؤقتاً عند امتلائها (انظر core.memory_budget). يمكن تغييرها عبر WARRAQ_PAGE_MEMORY_MB
+# (صفحة A4 بتدرج الرمادي: 8.7 MB بدقة 300 و 35 MB بدقة 600)
+PAGE_MEMORY_BUDGET = int(os.environ.get('WARRAQ_PAGE_MEMORY_MB') or 1024) * 1024 * 1024
+
+# عدد صفحات PDF التي يتم تحويلها إلى صور في كل دفعة في أداة تحويل PDF إلى صور
+PDF_TO_IMAGES_WINDOW = 4
+
+# عدد الصفحات المسموح بانتظارها بين كل مرحلتين في خط معالجة OCR
+OCR_QUEUE_SIZE = 2
+
+# حجم ذاكرة الكتابة المؤقتة لملفات نتائج OCR (تُكتب الصفحات إلى القرص تدريجياً)
+OUTPUT_BUFFER_SIZE = 256 * 1024
+
+# مراقبة المجلدات (watch): الفاصل بين كل فحص، ومدة ثبات حجم الملف قبل اعتباره مكتمل النسخ، وملف الحالة
+WATCH_POLL_INTERVAL = 2.0
+WATCH_SETTLE_SECONDS = 5.0
+WATCH_STATUS_FILE = DATA_DIR / "watch_status.json"
+
+# خدمة HTTP المحلية (serve): العنوان والمنفذ، وحجم طابور المهام، وأقصى حجم للملفات المرفوعة في الطلب،
+# وحجم الدفعة التي يُقرأ بها الطلب ويُكتب إلى القرص، وعدد المهام المنتهية التي تُحفظ نتائجها قبل حذف الأقدم
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+SERVER_QUEUE_SIZE = 16
+SERVER_MAX_UPLOAD_BYTES = 512 * 1024 * 1024
+SERVER_UPLOAD_CHUNK_SIZE = 1024 * 1024
+SERVER_KEEP_JOBS = 100
+SERVER_JOBS_DIR = DATA_DIR / "server_jobs"
+
+# عدد العمليات المتوازية الافتراضي لـ OCR (نترك نواة واحدة لواجهة المستخدم)
+OCR_WORKERS = max(1, (os.cpu_count() or 1) - 1)
+
+# مجدول مهام الواجهة: عدد الخيوط المشتركة، وأقصى عدد من المهام المتزامنة لكل نوع
+# (مهمة OCR واحدة لأنها تستخدم كل الأنوية عبر OCR_WORKERS، وتبقى خيوط لأدوات PDF السريعة)
+SCHEDULER_WORKERS = 3
+SCHEDULER_LIMITS = {"ocr": 1, "pdf": 2}
+
+# تشخيص أداء المهام (اختياري، انظر core.profiling): يُفعَّل بمتغير البيئة WARRAQ_PROFILE
+# (1 للوقت والذاكرة، أو cpu أو memory لأحدهما)، وتُكتب الملفات في مجلد profiles بجانب ملف السجل.
+# PROFILE_TRACE_FRAMES: عدد إطارات المكدس المحفوظة لكل حجز ذاكرة، PROFILE_TOP: عدد الأسطر في الملخص النصي
+PROFILE_ENV_VAR = "WARRAQ_PROFILE"
+PROFILE_DIR = LOG_FILE.parent / "profiles"
+PROFILE_TRACE_FRAMES = 10
+PROFILE_TOP = 30
+
 def find_existing_path(candidates):
     for p in candidates:
         if p and Path(p).exists():
@@ -20,4 +86,8 @@ def find_existing_path(candidates):
     return None
 
 POPPLER_PATH = find_existing_path([BASE_DIR / 'poppler' / 'bin', os.environ.get('POPPLER_PATH', "")])
-TESSERACT_CMD = find_existing_path([BASE_DIR / 'tesseract' / 'tesseract.exe', os.environ.get('TESSERACT_CMD', "")])
\ No newline at end of file
+TESSERACT_CMD = find_existing_path([BASE_DIR / 'tesseract' / 'tesseract.exe', os.environ.get('TESSERACT_CMD', "")])
+TESSDATA_DIR = find_existing_path([BASE_DIR / 'tesseract' / 'tessdata', os.environ.get('TESSDATA_PREFIX', "")])
+
+# محرك OCR الافتراضي: auto (tesserocr إن توفرت وإلا pytesseract) أو tesserocr أو pytesseract
+OCR_ENGINE = os.environ.get('WARRAQ_OCR_ENGINE', "auto")
\ No newline at end of file
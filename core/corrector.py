@@ -1,98 +1,19 @@
 # -*- coding: utf-8 -*-
+"""
+التصحيحات اللغوية السياقية لنص OCR
 
-# تصحيحات لغوية سياقية (بناءً على العينة والجدول المحدث)
-OCR_CORRECTIONS = {
-    # --- رموز أجنبية وضجيج (حذف نهائي) ---
-    "ayli": "",
-    "abl": "",
-    "yall": "",
-    "ow": "",
-    "]": "",
-    "أو !": "",
-    "!": "",
-    
-    # --- تصحيحات الرتب والأسماء ---
-    "زقيب": "رقيب",
-    "إ(قيب": "رقيب",
-    "رليس": "رئيس",
-    "صالد": "خالد",
-    "لسعود": "لسعود",
-    
-    # --- تصحيحات الكلمات الرسمية ---
-    "اشعار": "إشعار",
-    "القصيمْ": "القصيم",
-    "الْقَصَيَم": "القصيم",
-    "و رحمة": "ورحمة",
-    "نشعر": "نُشعر",
-    "اطرافها": "أطرافها",
-    "الموضح": "الموضحة",
-    "الموضذ": "الموضح",
-    "الماده": "المادة",
-    "وَالَمّادة": "والمادة",
-    "اوراق": "أوراق",
-    "إحالة اوراق": "إحالة أوراق",
-    "اليكم": "إليكم",
-    "اقوال": "أقوال",
-    "امل": "آمل",
-    "تحياتائن": "تحياتنا",
-    "تحياتئ": "تحياتي",
-    "تحياتر": "تحياتي",
-    "اله": "الختم",
-    "الطباعه": "الطباعة",
-    "تم الطباعه": "تمّت الطباعة",
-    "بالأحاطة": "بالإحاطة",
-    "الجزانية": "الجزائية",
-    "بيّاناتها": "بياناتها",
-    "تَازّيُمْ": "تاريخ",
-    "تَازّي": "تاريخ",
-    "خُطاب": "خطاب",
-    "dla]": "إحالة",
-    "Jor": "رقم",
-    "sal": "من",
-    "Julai": "تحليل",
-    "rere /-1": "تاريخ",
-    "ع*-1.-لاعع ١": "١٤٤٧/١٠/٢٤",
-    "447-08-07": "١٤٤٧/٠٨/٠٧",
-    "447-": "١٤٤٧-",
-    "4777401807": "٤٧٧٧٤٠١٨٠٧",
-    "38883318": "٣٨٨٨٣٣١٨",
-    "سلمه ائله": "سلمه الله",
-    "الجزالية": "الجزائية",
-    "الاولية": "الأولية",
-    "بالاحاطة": "بالإحاطة",
-    "اأحريى": "الحربي",
-    "cag": "",
-    "ral": "",
-    "Lidl": "النيابة",
-    "Lit": "النيابة",
-    "المتدرية": "المتدربة",
-    "تمبير": "تمهير",
-    "بمنطتة": "بمنطقة",
-    "إدارد": "إدارة",
-    "أشبر": "أشهر",
-    "البرنامجع": "البرنامج",
-    "والتحلبيقية": "والتطبيقية",
-    "التى": "التي",
-    "أنخلمة": "أنظمة",
-    "التلع": "القطع",
-    "إعناد": "إعداد",
-    "وادارتبا": "وإدارتها",
-    "التتاريراللازمة": "التقارير اللازمة",
-    "اتشدم": "أتقدم",
-    "Las :": "منها :",
-    "Las": "منها",
-    "هذ ": "هذا ",
-    "ورحمة  وبركاتة": "ورحمة الله وبركاته",
-    "أن عبر": "أود أن أعبر",
-    "5,5 رع  ١:4 15 78 :141 م": "١٤٤٤/٠٦/٠٣ هـ إلى ١٤٤٤/١٢/٠٩ م",
-}
+جدول التصحيحات يُحمّل من ملف القواعد القابل للتعديل (انظر core.ocr_rules)
+ولم يعد مكتوباً داخل الكود.
+"""
+from core.ocr_rules import current_rules
 
-def apply_corrections(text):
-    """تطبيق التصحيحات اللغوية على النص"""
+
+def apply_corrections(text, rules=None):
+    """تطبيق التصحيحات اللغوية على النص في مرور واحد
+
+    rules: مجموعة القواعد (OCRRules)، والافتراضي القواعد المحملة حالياً.
+    """
     if not text:
         return ""
-    
-    for wrong, right in OCR_CORRECTIONS.items():
-        text = text.replace(wrong, right)
-    
-    return text
+
+    return (rules or current_rules()).apply_corrections(text)
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+ميزانية ذاكرة مشتركة لصور الصفحات المحولة من PDF
+
+صور الصفحات بدقة 300-600 هي أكبر مستهلك للذاكرة، وقد تعمل عدة مهام في نفس الوقت
+(مجدول الواجهة، خدمة HTTP، مراقبة المجلدات). قبل تحويل أي صفحة إلى صورة يُحجز حجمها
+المتوقع من ميزانية واحدة للبرنامج كله (PAGE_BUDGET)، فإذا امتلأت ينتظر التحويل حتى
+تتحرر صور صفحات أخرى. يبقى الحجز مع الصفحة حتى تحرير صورتها، ويُعدل إلى حجمها الفعلي
+بعد التحويل أو المعالجة المسبقة دون انتظار.
+
+الانتظار يحدث في مصدر الصفحات فقط وليس في مراحل خط المعالجة، لأن مرحلة تنتظر الذاكرة قد
+تنتظر صفحات في الطوابير قبلها لن تتحرر أبداً. لذلك يشمل الحجز من البداية حجم نسخة الصفحة بعد
+المعالجة المسبقة إن كان أكبر من صورتها (تكبير الصور الأضيق من TARGET_WIDTH)، فلا يزيد
+الحجز بعد المعالجة.
+
+ما لا تحسبه الميزانية:
+- أثناء preprocess_image تبقى الصورة الأصلية والنسخة المعالجة ونسخ الخطوات الوسيطة معاً
+  لحظياً، وذلك لصفحة واحدة في كل مهمة (مرحلة المعالجة المسبقة خيط واحد).
+- عند workers > 1 تتم المعالجة المسبقة والتعرف في عمليات مجمع OCR على نسخ من الصور
+  المحجوزة في العملية الرئيسية، والميزانية لا تشمل ذاكرة تلك العمليات.
+
+- الحجز الأكبر من الميزانية كلها يُسمح به عندما تكون فارغة، فلا تتوقف المهمة نهائياً.
+- لكل مهمة حساب (BudgetAccount) يسجل استخدامها الحالي والأقصى ومدة انتظارها لملخص المهمة.
+"""
+import time
+import logging
+import threading
+
+from pypdf import PdfReader
+
+from core.config import PAGE_MEMORY_BUDGET
+from core.cancellation import JobCancelled, CANCEL_POLL_INTERVAL
+
+# أبعاد A4 بالنقاط، تُستخدم للتقدير عندما تتعذر قراءة أبعاد الصفحة
+A4_POINTS = (595.0, 842.0)
+
+
+def pdf_page_sizes(path):
+    """أبعاد كل صفحة (العرض، الارتفاع) بالنقاط (1/72 بوصة) مع مراعاة التدوير، أو None عند التعذر"""
+    try:
+        sizes = []
+        for page in PdfReader(str(path)).pages:
+            box = page.mediabox
+            width, height = float(box.width), float(box.height)
+            sizes.append((height, width) if page.rotation % 180 else (width, height))
+        return sizes
+    except Exception as e:
+        logging.warning(f"تعذر قراءة أبعاد صفحات {path}: {e}")
+        return None
+
+
+def estimate_page_bytes(page_size, dpi, channels=1, width=None):
+    """حجم صورة الصفحة المتوقع بالبايت عند رسمها بالدقة dpi (أو بعرض width مع الحفاظ على النسبة)"""
+    page_width, page_height = page_size or A4_POINTS
+    if width:
+        height = width * page_height / page_width
+    else:
+        width, height = page_width * dpi / 72, page_height * dpi / 72
+    return int(width) * int(height) * channels
+
+
+class Reservation:
+    """حجز من الميزانية لصورة صفحة واحدة أو مجموعة صفحات"""
+
+    __slots__ = ("account", "nbytes")
+
+    def __init__(self, account, nbytes):
+        self.account = account
+        self.nbytes = nbytes
+
+    def resize(self, nbytes):
+        """تعديل الحجز إلى الحجم الفعلي للصورة (دون انتظار)"""
+        self.account.budget._adjust(self.account, nbytes - self.nbytes)
+        self.nbytes = nbytes
+
+    def split(self, sizes):
+        """تقسيم حجز مجموعة صفحات إلى حجز لكل صفحة بحجمها الفعلي"""
+        parts = [Reservation(self.account, nbytes) for nbytes in sizes]
+        self.account.budget._adjust(self.account, sum(sizes) - self.nbytes)
+        self.nbytes = 0
+        return parts
+
+    def release(self):
+        if self.nbytes:
+            self.account.budget._adjust(self.account, -self.nbytes)
+            self.nbytes = 0
+
+
+class BudgetAccount:
+    """استخدام مهمة واحدة من الميزانية المشتركة"""
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.used = 0
+        self.peak = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def acquire(self, nbytes, cancel_event=None):
+        """حجز nbytes مع الانتظار حتى تتسع الميزانية، ورفع JobCancelled إذا أُلغيت المهمة أثناء الانتظار"""
+        return self.budget._acquire(self, nbytes, cancel_event)
+
+    def summary(self):
+        return {
+            "limit_bytes": self.budget.limit,
+            "peak_bytes": self.peak,
+            "current_bytes": self.used,
+            "global_peak_bytes": self.budget.peak,
+            "waits": self.waits,
+            "wait_seconds": round(self.wait_seconds, 3),
+        }
+
+
+class MemoryBudget:
+    """حد أقصى لمجموع أحجام صور الصفحات الموجودة في الذاكرة (limit بالبايت، 0 بلا حد)"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.used = 0
+        self.peak = 0
+        self._cond = threading.Condition()
+
+    def account(self):
+        return BudgetAccount(self)
+
+    def _acquire(self, account, nbytes, cancel_event=None):
+        started = None
+        with self._cond:
+            while self.limit and self.used and self.used + nbytes > self.limit:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise JobCancelled()
+                if started is None:
+                    started = time.perf_counter()
+                    account.waits += 1
+                self._cond.wait(CANCEL_POLL_INTERVAL)
+            if started is not None:
+                account.wait_seconds += time.perf_counter() - started
+            self._add(account, nbytes)
+        return Reservation(account, nbytes)
+
+    def _adjust(self, account, delta):
+        with self._cond:
+            self._add(account, delta)
+            if delta < 0:
+                self._cond.notify_all()
+
+    def _add(self, account, delta):
+        self.used += delta
+        self.peak = max(self.peak, self.used)
+        account.used += delta
+        account.peak = max(account.peak, account.used)
+
+
+# الميزانية المشتركة لكل مهام البرنامج
+PAGE_BUDGET = MemoryBudget(PAGE_MEMORY_BUDGET)
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+قياس زمن مراحل OCR لكل صفحة وتجميعه على مستوى المهمة
+
+كل صفحة تحمل قاموس timings {اسم المرحلة: المدة بالثواني} يملؤه خط المعالجة
+(render و text_layer و blank و cache و preprocess و recognize و clean)، ويجمع JobMetrics
+هذه القيم مع أبعاد الصور وحجمها لحساب المجموع والمتوسط والمئينات لكل مرحلة في ملخص المهمة.
+"""
+import time
+from contextlib import contextmanager
+
+# ترتيب عرض المراحل في الملخص (المراحل غير المعروفة تأتي بعدها)
+STAGE_ORDER = ("render", "text_layer", "blank", "cache", "preprocess", "recognize", "clean")
+PERCENTILES = (50, 90, 95)
+
+
+def image_nbytes(img):
+    """حجم بيانات الصورة في الذاكرة بالبايت (العرض × الارتفاع × عدد القنوات)"""
+    if img is None:
+        return 0
+    return img.width * img.height * len(img.getbands())
+
+
+@contextmanager
+def timed(timings, stage):
+    """إضافة مدة تنفيذ الكتلة إلى timings[stage]"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - started
+
+
+def percentile(sorted_values, q):
+    """المئين q (0-100) بالاستيفاء الخطي من قائمة مرتبة غير فارغة"""
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+# عدد الخانات العشرية لكل المدد بالثواني في ملخصات المهام
+DIGITS = 4
+
+
+def round_timings(timings, digits=DIGITS):
+    return {stage: round(seconds, digits) for stage, seconds in timings.items()}
+
+
+class JobMetrics:
+    """تجميع مدد المراحل وأحجام الصور لكل صفحات المهمة"""
+
+    def __init__(self):
+        self._durations = {}
+        self.pages = 0
+        self.pixels = 0
+        self.bytes = 0
+
+    def add_page(self, timings, width=0, height=0, nbytes=0):
+        self.pages += 1
+        self.pixels += width * height
+        self.bytes += nbytes
+        for stage, seconds in timings.items():
+            self._durations.setdefault(stage, []).append(seconds)
+
+    def summary(self):
+        """{"stages": {المرحلة: {count, total, mean, p50, p90, p95, max}}, "pages", "megapixels", "bytes"}"""
+        stages = {}
+        order = {name: i for i, name in enumerate(STAGE_ORDER)}
+        for stage in sorted(self._durations, key=lambda name: (order.get(name, len(order)), name)):
+            values = sorted(self._durations[stage])
+            total = sum(values)
+            stats = {"count": len(values), "total": round(total, DIGITS), "mean": round(total / len(values), DIGITS)}
+            for q in PERCENTILES:
+                stats[f"p{q}"] = round(percentile(values, q), DIGITS)
+            stats["max"] = round(values[-1], DIGITS)
+            stages[stage] = stats
+        return {
+            "stages": stages,
+            "pages": self.pages,
+            "megapixels": round(self.pixels / 1e6, 2),
+            "bytes": self.bytes,
+        }
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+محركات التعرف على النصوص (Tesseract)
+
+- pytesseract: يشغّل عملية tesseract جديدة لكل صفحة (يعيد تحميل ملفات اللغة في كل مرة)،
+  وتُنهى العملية فوراً عند إلغاء المهمة.
+- tesserocr: يستخدم واجهة Tesseract البرمجية (C API) داخل نفس العملية، ويحتفظ بمجموعة
+  من المثيلات المهيأة مسبقاً لكل لغة ويعيد استخدامها عبر الصفحات والمهام.
+
+المحرك "auto" يختار tesserocr إن كانت متوفرة وإلا يعود إلى pytesseract.
+"""
+import os
+import queue
+import shlex
+import logging
+import threading
+
+import pytesseract
+
+from core.config import TESSDATA_DIR
+from core.cancellation import run_process, check_cancelled
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+ENGINES = ("auto", "tesserocr", "pytesseract")
+
+
+def build_tesseract_config(lang):
+    """إعدادات Tesseract المستخدمة للغة العربية والجداول"""
+    # --oem 1: استخدام LSTM
+    # --psm 3: تقسيم تلقائي للصفحة
+    return r'--oem 1 --psm 3 -l ' + lang
+
+
+class PytesseractBackend:
+    """تشغيل tesseract كعملية منفصلة لكل صفحة
+
+    نفس خطوات pytesseract.image_to_string (حفظ الصورة في ملف مؤقت ثم قراءة ملف txt الناتج)
+    لكن تُنتظر العملية عبر run_process حتى يمكن إنهاؤها عند إلغاء المهمة.
+    """
+
+    name = "pytesseract"
+
+    def recognize(self, img, lang, cancel_event=None):
+        tess = pytesseract.pytesseract
+        with tess.save(img) as (temp_name, input_filename):
+            args = [tess.tesseract_cmd, input_filename, temp_name]
+            args += shlex.split(build_tesseract_config(lang), posix=os.name != "nt")
+            args.append("txt")
+            try:
+                returncode, _, stderr = run_process(args, cancel_event, **tess.subprocess_args())
+            except FileNotFoundError:
+                raise tess.TesseractNotFoundError()
+            if returncode:
+                raise tess.TesseractError(returncode, tess.get_errors(stderr))
+            with open(f"{temp_name}.txt", "rb") as output_file:
+                return output_file.read().decode("utf-8")
+
+    def close(self):
+        pass
+
+
+class TesserocrBackend:
+    """مجموعة من مثيلات Tesseract الجاهزة داخل العملية الحالية (لكل لغة مجموعتها)"""
+
+    name = "tesserocr"
+
+    def __init__(self, tessdata_dir=None, max_instances=None):
+        if tesserocr is None:
+            raise ImportError("مكتبة tesserocr غير مثبتة")
+        self.tessdata_dir = str(tessdata_dir) if tessdata_dir else None
+        self.max_instances = max_instances or os.cpu_count() or 1
+        self._pools = {}
+        self._created = {}
+        self._lock = threading.Lock()
+
+    def _create_api(self, lang):
+        kwargs = {"lang": lang, "oem": tesserocr.OEM.LSTM_ONLY, "psm": tesserocr.PSM.AUTO}
+        if self.tessdata_dir:
+            kwargs["path"] = self.tessdata_dir
+        return tesserocr.PyTessBaseAPI(**kwargs)
+
+    def _acquire(self, lang):
+        with self._lock:
+            pool = self._pools.setdefault(lang, queue.LifoQueue())
+            try:
+                return pool.get_nowait()
+            except queue.Empty:
+                pass
+            can_create = self._created.get(lang, 0) < self.max_instances
+            if can_create:
+                self._created[lang] = self._created.get(lang, 0) + 1
+        if can_create:
+            try:
+                return self._create_api(lang)
+            except Exception:
+                with self._lock:
+                    self._created[lang] -= 1
+                raise
+        # جميع المثيلات مشغولة: انتظار إعادة أحدها
+        return pool.get()
+
+    def _release(self, lang, api):
+        self._pools[lang].put(api)
+
+    def warm_up(self, lang):
+        """تهيئة مثيل واحد مسبقاً (تحميل ملفات اللغة) قبل وصول أول صفحة"""
+        self._release(lang, self._acquire(lang))
+
+    def recognize(self, img, lang, cancel_event=None):
+        # لا توفر tesserocr طريقة لمقاطعة التعرف، فيُفحص الإلغاء قبل بدء الصفحة فقط
+        check_cancelled(cancel_event)
+        api = self._acquire(lang)
+        try:
+            api.SetImage(img)
+            return api.GetUTF8Text()
+        finally:
+            api.Clear()
+            self._release(lang, api)
+
+    def close(self):
+        with self._lock:
+            for pool in self._pools.values():
+                while True:
+                    try:
+                        pool.get_nowait().End()
+                    except queue.Empty:
+                        break
+            self._pools.clear()
+            self._created.clear()
+
+
+# المحركات المهيأة في العملية الحالية (تبقى حية بين المهام لإعادة استخدام المثيلات)
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def tesserocr_available():
+    return tesserocr is not None
+
+
+def resolve_engine(engine):
+    """تحديد اسم المحرك الفعلي بناءً على الاختيار والمكتبات المتوفرة"""
+    if engine not in ENGINES:
+        raise ValueError(f"محرك OCR غير معروف: {engine}")
+    if engine == "auto":
+        return "tesserocr" if tesserocr_available() else "pytesseract"
+    if engine == "tesserocr" and not tesserocr_available():
+        logging.warning("مكتبة tesserocr غير متوفرة، سيتم استخدام pytesseract")
+        return "pytesseract"
+    return engine
+
+
+def get_backend(engine="auto", lang=None):
+    """إرجاع محرك مهيأ (مشترك داخل العملية) مع الرجوع إلى pytesseract عند فشل tesserocr"""
+    name = resolve_engine(engine)
+    with _backends_lock:
+        backend = _backends.get(name)
+        if backend is None:
+            if name == "tesserocr":
+                try:
+                    backend = TesserocrBackend(TESSDATA_DIR)
+                    if lang:
+                        backend.warm_up(lang)
+                except Exception as e:
+                    logging.warning(f"تعذر تهيئة tesserocr، سيتم استخدام pytesseract: {e}")
+                    backend = None
+            if backend is None:
+                backend = _backends.setdefault("pytesseract", PytesseractBackend())
+            # عند فشل tesserocr يُحفظ البديل باسمها حتى لا تتكرر محاولة التهيئة مع كل صفحة
+            _backends[name] = backend
+        return backend
+
+
+def close_backends():
+    """تحرير جميع المثيلات المهيأة (عند إغلاق التطبيق)"""
+    with _backends_lock:
+        for backend in _backends.values():
+            backend.close()
+        _backends.clear()
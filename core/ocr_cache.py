@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+ذاكرة مؤقتة دائمة لنتائج OCR (على القرص) معنونة بمحتوى الصفحة
+
+المفتاح: بصمة SHA-256 لبكسلات الصفحة بعد تحويلها إلى صورة + إعدادات OCR
+(اللغة، الدقة، المعالجة المسبقة، إعدادات tesseract، المحرك).
+القيمة: النص الخام والنص بعد التنظيف.
+يتم حذف أقدم العناصر استخداماً (LRU) عند تجاوز الحجم الأقصى.
+"""
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+
+from core.config import OCR_CACHE_FILE, OCR_CACHE_MAX_BYTES
+
+# عند تجاوز الحد الأقصى يتم الحذف حتى هذه النسبة منه لتجنب الحذف مع كل إضافة
+_EVICT_TARGET_RATIO = 0.9
+
+
+def page_cache_key(img, lang, dpi, preprocess, tesseract_config, engine):
+    """حساب مفتاح الصفحة من بكسلاتها وإعدادات OCR"""
+    digest = hashlib.sha256()
+    settings = f"{lang}|{dpi}|{int(bool(preprocess))}|{tesseract_config}|{engine}|{img.mode}|{img.size}"
+    digest.update(settings.encode("utf-8"))
+    digest.update(img.tobytes())
+    return digest.hexdigest()
+
+
+class OCRCache:
+    """ذاكرة مؤقتة لنتائج OCR في قاعدة SQLite مع حد أقصى للحجم"""
+
+    def __init__(self, path=OCR_CACHE_FILE, max_bytes=OCR_CACHE_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # الاتصال مشترك بين خيوط خط المعالجة ومحمي بالقفل
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " key TEXT PRIMARY KEY,"
+            " raw_text TEXT NOT NULL,"
+            " clean_text TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_last_used ON pages (last_used)")
+        # الحجم الكلي محفوظ في صف واحد يُحدَّث مع كل كتابة حتى لا يُجمع الجدول كله عند كل إضافة،
+        # ويُعاد حسابه من الجدول عند الفتح فقط
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self._conn.execute("BEGIN IMMEDIATE")
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (name, value) VALUES ('total_size', (SELECT COALESCE(SUM(size), 0) FROM pages))"
+        )
+        self._conn.commit()
+
+    @classmethod
+    def open(cls, path=OCR_CACHE_FILE, max_bytes=OCR_CACHE_MAX_BYTES):
+        """فتح الذاكرة المؤقتة أو إرجاع None إذا تعذر ذلك (يستمر OCR بدونها)"""
+        try:
+            return cls(path, max_bytes)
+        except Exception as e:
+            logging.warning(f"تعذر فتح ذاكرة OCR المؤقتة ({path}): {e}")
+            return None
+
+    def get(self, key):
+        """إرجاع (النص الخام، النص المنظف) أو None"""
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT raw_text, clean_text FROM pages WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute("UPDATE pages SET last_used = ? WHERE key = ?", (time.time(), key))
+                    self._conn.commit()
+            except sqlite3.Error as e:
+                logging.warning(f"خطأ في قراءة ذاكرة OCR المؤقتة: {e}")
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row
+
+    def put(self, key, raw_text, clean_text):
+        size = len(raw_text.encode("utf-8")) + len(clean_text.encode("utf-8"))
+        with self._lock:
+            try:
+                # قفل الكتابة من بداية المعاملة: قد تكتب عمليات أو اتصالات أخرى في نفس الملف،
+                # فيُقرأ الحجم الكلي ويُحدَّث داخل المعاملة بدلاً من الاعتماد على عداد في الذاكرة
+                self._conn.execute("BEGIN IMMEDIATE")
+                row = self._conn.execute("SELECT size FROM pages WHERE key = ?", (key,)).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO pages (key, raw_text, clean_text, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                    (key, raw_text, clean_text, size, time.time())
+                )
+                total = self._add_total(size - (row[0] if row else 0))
+                if total > self.max_bytes:
+                    self._evict(total)
+                self._conn.commit()
+            except sqlite3.Error as e:
+                if self._conn.in_transaction:
+                    self._conn.rollback()
+                logging.warning(f"خطأ في الكتابة إلى ذاكرة OCR المؤقتة: {e}")
+
+    def _add_total(self, delta):
+        """تعديل الحجم الكلي المحفوظ وإرجاع قيمته الجديدة (يُستدعى داخل معاملة الكتابة)"""
+        self._conn.execute("UPDATE meta SET value = value + ? WHERE name = 'total_size'", (delta,))
+        return self._conn.execute("SELECT value FROM meta WHERE name = 'total_size'").fetchone()[0]
+
+    def _evict(self, total):
+        """حذف أقدم العناصر استخداماً حتى يعود الحجم تحت الحد (يُستدعى داخل معاملة الكتابة)"""
+        target = self.max_bytes * _EVICT_TARGET_RATIO
+        rows = self._conn.execute("SELECT key, size FROM pages ORDER BY last_used ASC")
+        expired = []
+        freed = 0
+        for key, size in rows:
+            if total - freed <= target:
+                break
+            expired.append((key,))
+            freed += size
+        self._conn.executemany("DELETE FROM pages WHERE key = ?", expired)
+        self._add_total(-freed)
+
+    def stats(self):
+        return {"cache_hits": self.hits, "cache_misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+دوال OCR الأساسية لصفحة واحدة (معالجة مسبقة، تعرف، تنظيف)
+
+الدوال هنا لا تعتمد على Qt ويمكن استدعاؤها داخل عمليات منفصلة (ProcessPoolExecutor)
+لذلك يجب أن تبقى دوالاً على مستوى الوحدة وأن تكون معاملاتها قابلة للتسلسل (pickle).
+"""
+import os
+import time
+import logging
+import re
+
+from PIL import Image, ImageFilter
+
+from core.corrector import apply_corrections
+from core.ocr_rules import current_rules
+from core.ocr_backends import get_backend
+from core.cancellation import check_cancelled
+
+# حدث إلغاء المهمة داخل عمليات مجمع OCR (multiprocessing.Event يُمرر عند إنشاء العملية)
+_worker_cancel_event = None
+
+
+def init_worker_process(cancel_event=None):
+    """تهيئة كل عملية في مجمع العمليات قبل استقبال الصفحات"""
+    global _worker_cancel_event
+    _worker_cancel_event = cancel_event
+
+    # منع Tesseract من تشغيل عدة خيوط داخل كل عملية حتى لا تتزاحم العمليات على الأنوية
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+    from core.utils import load_ocr_libraries
+    load_ocr_libraries()
+
+
+def recognize_image(img, lang="ara+eng", engine="pytesseract", cancel_event=None):
+    """التعرف على نص صورة جاهزة باستخدام محرك Tesseract المحدد (النص الخام دون تنظيف)
+
+    cancel_event: عند ضبطه تُنهى عملية tesseract الجارية وترفع JobCancelled.
+    """
+    return get_backend(engine, lang).recognize(img, lang, cancel_event)
+
+
+def recognize_page(img, lang="ara+eng", preprocess=True, engine="pytesseract"):
+    """معالجة الصفحة مسبقاً ثم التعرف عليها (مهمة واحدة ترسل لمجمع العمليات)
+
+    ترجع (النص الخام، {المرحلة: المدة بالثواني}) لأن مدد المراحل داخل العملية
+    لا يمكن قياسها من خط المعالجة في العملية الرئيسية.
+    """
+    # صفحة وصلت إلى العملية بعد إلغاء المهمة لا تتم معالجتها
+    check_cancelled(_worker_cancel_event)
+    timings = {}
+    started = time.perf_counter()
+    processed = preprocess_image(img) if preprocess else img
+    if preprocess:
+        timings["preprocess"] = time.perf_counter() - started
+    try:
+        started = time.perf_counter()
+        text = recognize_image(processed, lang, engine, _worker_cancel_event)
+        timings["recognize"] = time.perf_counter() - started
+        return text, timings
+    finally:
+        if processed is not img:
+            processed.close()
+
+
+# عرض الصورة المستهدف قبل OCR (مهم جداً للخطوط الصغيرة والجداول)
+TARGET_WIDTH = 2500
+# أي بكسل أقل من أو يساوي هذه القيمة (بعد زيادة التباين) يصبح أسود، والباقي أبيض
+THRESHOLD = 140
+
+# جدول تصفية الضجيج: مرشح الوسيط 3x3 على صورة ثنائية يساوي قاعدة الأغلبية،
+# أي يصبح البكسل أبيض إذا كان 5 من 9 بكسلات حوله بيضاء. متوسط النافذة (BoxBlur)
+# يكون 5*255/9 ≈ 142 أو أكثر للأبيض و 4*255/9 ≈ 113 أو أقل للأسود، فالحد 127 يفصل بينهما.
+_MAJORITY_LUT = [255 if v > 127 else 0 for v in range(256)]
+
+
+# كشف الصفحات الفارغة: عرض النسخة المصغرة، وفرق السطوع الذي يعتبر البكسل بعده حبراً،
+# وأقل نسبة حبر لاعتبار الصفحة غير فارغة (منخفضة عمداً حتى لا تُتجاهل صفحة بها سطر واحد)
+BLANK_SAMPLE_WIDTH = 500
+BLANK_INK_DELTA = 60
+BLANK_INK_RATIO = 0.0002
+
+
+def is_blank_page(img):
+    """تقدير سريع لكون الصفحة فارغة من نسبة الحبر في نسخة مصغرة منها
+
+    تُصغَّر الصفحة بمتوسط الكتل (reduce) وتُستبعد الهوامش حيث ظلال الماسح الضوئي،
+    ثم يُحسب لون الخلفية من وسيط المدرج التكراري، ويُعد حبراً كل بكسل يختلف عنها بفارق واضح
+    في أي اتجاه (أغمق منها في الصفحات العادية، وأفتح منها في الصفحات الداكنة أو المعكوسة).
+    """
+    factor = max(1, img.width // BLANK_SAMPLE_WIDTH)
+    small = img.reduce(factor) if factor > 1 else img
+    if small.mode != 'L':
+        small = small.convert('L')
+    width, height = small.size
+    margin_x, margin_y = width // 20, height // 20
+    histogram = small.crop((margin_x, margin_y, width - margin_x, height - margin_y)).histogram()
+
+    total = sum(histogram)
+    if not total:
+        return True
+    seen = 0
+    for background in range(255, -1, -1):
+        seen += histogram[background]
+        if seen * 2 >= total:
+            break
+    ink = sum(histogram[:max(0, background - BLANK_INK_DELTA)]) + sum(histogram[background + BLANK_INK_DELTA + 1:])
+    return ink / total < BLANK_INK_RATIO
+
+
+def _autocontrast_lut(img):
+    """جدول زيادة التباين التلقائي (مطابق لـ ImageOps.autocontrast دون قطع)"""
+    histogram = img.histogram()
+    lo = next((i for i in range(256) if histogram[i]), 0)
+    hi = next((i for i in range(255, -1, -1) if histogram[i]), 0)
+    if hi <= lo:
+        return list(range(256))
+    scale = 255.0 / (hi - lo)
+    offset = -lo * scale
+    return [min(255, max(0, int(ix * scale + offset))) for ix in range(256)]
+
+
+def preprocessed_size(width, height):
+    """أبعاد الصورة بعد المعالجة المسبقة: الصور الأضيق من TARGET_WIDTH تُكبَّر إليه مع الحفاظ على النسبة"""
+    if width < TARGET_WIDTH:
+        return TARGET_WIDTH, int(height * (TARGET_WIDTH / width))
+    return width, height
+
+
+def preprocess_image(img: Image.Image) -> Image.Image:
+    """معالجة متقدمة للصورة لتحسين دقة OCR دون مكتبات ثقيلة
+
+    جميع الخطوات تعمل على مخزن رمادي واحد بجداول بحث (LUT) ومرشح صندوقي،
+    وناتجها مطابق بكسلاً ببكسل للتسلسل السابق:
+    تكبير ← رمادي ← autocontrast ← عتبة 140 (نمط '1') ← رمادي ← MedianFilter(3).
+    """
+    try:
+        # 1. تكبير الصورة
+        new_size = preprocessed_size(img.width, img.height)
+        if new_size != img.size:
+            img = img.resize(new_size, Image.Resampling.LANCZOS)
+
+        # 2. تحويل لرمادي
+        if img.mode != 'L':
+            img = img.convert('L')
+
+        # 3+4. زيادة التباين والعتبة الثنائية في جدول واحد (دون المرور بنمط '1')
+        lut = [255 if v > THRESHOLD else 0 for v in _autocontrast_lut(img)]
+        img = img.point(lut)
+
+        # 5. تصفية الضجيج (قاعدة الأغلبية 3x3 = مرشح الوسيط على صورة ثنائية)
+        return img.filter(ImageFilter.BoxBlur(1)).point(_MAJORITY_LUT)
+    except Exception as e:
+        logging.warning(f"فشل المعالجة المسبقة للصورة: {e}")
+        return img
+
+
+# --- قواعد تنظيف النص (تُجمَّع مرة واحدة عند تحميل الوحدة) ---
+
+_LATIN_FRAGMENT_RE = re.compile(r'\b[a-zA-Z]{1,2}\b')
+_LEADING_JUNK_RE = re.compile(r'^[|I1l!ـ\-\s]+', re.MULTILINE)
+_TRAILING_JUNK_RE = re.compile(r'[|I1l!ـ\-\s]+$', re.MULTILINE)
+# الرموز العشوائية المتبقية تُستبدل بمسافة (جدول str.translate بدلاً من تعبير نمطي)
+_SYMBOLS_TABLE = str.maketrans({c: ' ' for c in '@#$%^&*(){}[]|\\<>/_'})
+# الحرف E الملاصق لرقم عربي هو غالباً ٤ (لا يدخل ٤ نفسه في الفئة فلا تتسلسل الاستبدالات)
+_DIGIT_FIX_RE = re.compile(r'1EEV|(?<=[١٢٣٥٦٧٨٩٠])E|E(?=[١٢٣٥٦٧٨٩٠])')
+_SPACING_RE = re.compile(r' {2,}|\n{3,}')
+
+
+def _fix_digit(match):
+    return '١٤٤٧' if len(match.group()) == 4 else '٤'
+
+
+def _fix_spacing(match):
+    return ' ' if match.group()[0] == ' ' else '\n\n'
+
+
+def clean_text(text: str, rules=None) -> str:
+    """تنظيف النص المستخرج من ضجيج OCR وتصحيح الأخطاء اللغوية الشائعة
+
+    القواعد مجمّعة مسبقاً: تعبير واحد لكل كلمات الضجيج، وتعبير واحد لتصحيح الأرقام،
+    وتعبير واحد للفراغات والسطور الزائدة، فيمر التنظيف على النص عدداً ثابتاً من المرات.
+    rules: قواعد التصحيحات وكلمات الضجيج (OCRRules)، والافتراضي القواعد المحملة حالياً
+    من ملف القواعد (انظر core.ocr_rules).
+    """
+    if not text:
+        return ""
+    rules = rules or current_rules()
+
+    # 1. إزالة الرموز الفردية والضجيج اللاتيني غير المفيد
+    text = _LATIN_FRAGMENT_RE.sub('', text)
+
+    # 2. إزالة الخطوط الرأسية والرموز العشوائية في بداية ونهاية الأسطر
+    text = _LEADING_JUNK_RE.sub('', text)
+    text = _TRAILING_JUNK_RE.sub('', text)
+
+    # 3. إزالة كلمات الضجيج المحددة في ملف القواعد
+    text = rules.remove_noise(text)
+
+    # 3.5 تنظيف الرموز العشوائية المتبقية
+    text = text.translate(_SYMBOLS_TABLE)
+
+    # 4. تصحيحات لغوية سياقية (من ملف القواعد، انظر corrector.py)
+    text = apply_corrections(text, rules)
+
+    # 5. معالجة الأرقام والتواريخ (تصحيح الأخطاء الشائعة في الأرقام العربية)
+    text = _DIGIT_FIX_RE.sub(_fix_digit, text)
+
+    # 6. تنظيف الفراغات والسطور الزائدة
+    text = _SPACING_RE.sub(_fix_spacing, text)
+
+    return text.strip()
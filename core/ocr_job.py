@@ -0,0 +1,533 @@
+# -*- coding: utf-8 -*-
+"""
+مهمة OCR مستقلة عن واجهة المستخدم
+
+OCRJob تنفذ مهمة OCR كاملة (خط المعالجة، الذاكرة المؤقتة، سجل الاستئناف، كتابة النتائج)
+وتبلغ عن التقدم عبر دوال استدعاء عادية، فلا تستورد PySide6 ويمكن استخدامها من سطر الأوامر.
+OCRWorker في core.ocr_worker يربط هذه الدوال بإشارات Qt لواجهة المستخدم.
+"""
+import time
+import logging
+import threading
+import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from pdf2image import pdfinfo_from_path
+from PIL import Image
+
+from core.utils import load_ocr_libraries
+from core.config import POPPLER_PATH, OCR_PAGE_WINDOW, OCR_QUEUE_SIZE, OCR_ENGINE
+from core.ocr_engine import (
+    preprocess_image, recognize_image, recognize_page, clean_text, init_worker_process, is_blank_page,
+    preprocessed_size, TARGET_WIDTH
+)
+from core.ocr_pipeline import OCRPipeline, PipelineStage, PageItem
+from core.ocr_backends import resolve_engine, get_backend, build_tesseract_config
+from core.ocr_cache import OCRCache, page_cache_key
+from core.text_layer import TextLayerReader, is_usable_text_layer
+from core.checkpoint import CheckpointJournal
+from core.output_writer import OCROutputWriter
+from core.ocr_rules import reload_rules
+from core.cancellation import JobCancelled
+from core.poppler import render_pages
+from core.metrics import JobMetrics, timed, round_timings, image_nbytes
+from core.memory_budget import PAGE_BUDGET, pdf_page_sizes, estimate_page_bytes
+from core.profiling import profiled
+
+
+def _ignore(*args):
+    pass
+
+
+class OCRJob:
+    """مهمة OCR على مجموعة ملفات
+
+    دوال الاستدعاء (كلها اختيارية وتُستدعى من خيط المهمة):
+    on_progress(dict) بعد كل صفحة، on_finished(dict) عند النجاح، on_error(str) لكل خطأ،
+    on_log(str) لرسائل السجل، on_page_started(str) عند بدء التعرف على صفحة.
+    """
+
+    def __init__(self, on_progress=None, on_finished=None, on_error=None, on_log=None, on_page_started=None):
+        self.on_progress = on_progress or _ignore
+        self.on_finished = on_finished or _ignore
+        self.on_error = on_error or _ignore
+        self.on_log = on_log or _ignore
+        self.on_page_started = on_page_started or _ignore
+        self._cancel_event = threading.Event()
+        # حدث الإلغاء المشترك مع عمليات مجمع OCR (عند workers > 1)
+        self._pool_cancel_event = None
+        self._pipeline = None
+        # استخدام المهمة من ميزانية ذاكرة صور الصفحات المشتركة
+        self._memory = PAGE_BUDGET.account()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def stop(self):
+        """إيقاف العملية دون انتظار (يمكن استدعاؤها من أي خيط)
+
+        تُنهى عمليات pdftoppm و tesseract الجارية، وتُلغى الصفحات المنتظرة في الطوابير
+        وفي مجمع العمليات، وتعود run() خلال جزء من الثانية.
+        """
+        self._cancel_event.set()
+        if self._pool_cancel_event is not None:
+            self._pool_cancel_event.set()
+        if self._pipeline is not None:
+            self._pipeline.cancel()
+        self.on_log("تم طلب إيقاف العملية.")
+
+    @profiled
+    def run(self, paths, lang="ara+eng", dpi=300, start_page=1, end_page=None, save_txt=True, preprocess=True,
+                page_window=OCR_PAGE_WINDOW, workers=1, engine=OCR_ENGINE, use_cache=True,
+                use_text_layer=True, skip_blank=True, resume=True, per_file_output=False):
+        """تشغيل عملية OCR على الملفات المحددة وإرجاع ملخص النتيجة (أو None عند الإيقاف أو الفشل)
+
+        تمر الصفحات عبر خط معالجة من مراحل متوازية (تحويل إلى صورة ← معالجة مسبقة ← تعرف ← تنظيف).
+        عند workers > 1 يتم توزيع مرحلتي المعالجة المسبقة والتعرف على مجمع عمليات
+        (ProcessPoolExecutor) مع الحفاظ على ترتيب النتائج حسب الصفحات.
+        engine: محرك التعرف (auto أو tesserocr أو pytesseract)، انظر core.ocr_backends.
+        use_cache: إعادة استخدام نتائج الصفحات المطابقة من ذاكرة OCR المؤقتة على القرص.
+        use_text_layer: الوضع الهجين؛ استخراج النص مباشرة من صفحات PDF التي تحتوي طبقة نص صالحة
+        وعدم إرسال إلا الصفحات المصورة إلى OCR.
+        skip_blank: تجاوز التعرف على الصفحات الفارغة (فواصل المسح والوجوه الخلفية الفارغة).
+        resume: تسجيل كل صفحة مكتملة في سجل نقاط الاستئناف، واستئناف نفس المهمة (نفس الملفات
+        والإعدادات) من الصفحات الناقصة بعد تعطل أو إيقاف.
+        save_txt: كتابة كل صفحة إلى ملف النتائج فور اكتمالها، ويظهر الملف باسمه النهائي عند انتهاء المهمة فقط.
+        per_file_output: كتابة ملف نتائج لكل ملف مدخل (<الاسم>_ocr.txt) بدلاً من ملف واحد مدمج.
+        """
+        try:
+            load_ocr_libraries()
+            engine = resolve_engine(engine)
+        except (ImportError, ValueError) as e:
+            self.on_error(f"خطأ في تحميل المكتبات: {e}")
+            return
+
+        if workers <= 1:
+            # تهيئة المحرك مسبقاً في هذه العملية (تحميل ملفات اللغة مرة واحدة لكل المهام)
+            engine = get_backend(engine, lang).name
+        self.on_log(f"محرك التعرف: {engine}")
+
+        # قراءة تعديلات ملف قواعد التنظيف (إن وجدت) قبل كل مهمة، وتثبيتها طوال المهمة
+        rules = reload_rules()
+
+        cache = OCRCache.open() if use_cache else None
+
+        journal = None
+        if resume:
+            journal = CheckpointJournal.open({
+                "lang": lang, "dpi": dpi, "start_page": start_page, "end_page": end_page,
+                "preprocess": preprocess, "engine": engine,
+                "use_text_layer": use_text_layer, "skip_blank": skip_blank, "rules": rules.signature
+            }, [str(p) for p in paths])
+            if journal and journal.completed_count:
+                self.on_log(f"استئناف المهمة: {journal.completed_count} صفحة مكتملة مسبقاً")
+
+        start_time = time.time()
+        metrics = JobMetrics()
+        self._memory = PAGE_BUDGET.account()
+        writer = OCROutputWriter(paths, per_file_output) if save_txt and paths else None
+        page_count = 0
+        text_layer_pages = 0
+        blank_pages = 0
+        resumed_pages = 0
+
+        executor = None
+        if workers > 1:
+            self.on_log(f"تشغيل OCR على {workers} عمليات متوازية")
+            # تنتظر عمليات المجمع tesseract على هذا الحدث فتنهيه فور إيقاف المهمة
+            self._pool_cancel_event = multiprocessing.Event()
+            if self.cancelled:
+                self._pool_cancel_event.set()
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker_process,
+                                           initargs=(self._pool_cancel_event,))
+
+        pipeline = OCRPipeline(
+            self._iter_items(paths, dpi, start_page, end_page, page_window, use_text_layer, preprocess, journal),
+            self._build_stages(lang, dpi, preprocess, engine, executor, workers, cache, skip_blank, rules),
+            output_queue_size=OCR_QUEUE_SIZE
+        ).start()
+        self._pipeline = pipeline
+        if self.cancelled:
+            pipeline.cancel()
+
+        try:
+            for item in pipeline:
+                if self.cancelled:
+                    item.release()
+                    self.on_log("تم إيقاف العملية أثناء المعالجة.")
+                    return
+
+                if item.error is not None:
+                    self.on_error(f"خطأ OCR في صفحة {item.page_no}: {item.error}")
+                if item.origin == "text_layer":
+                    text_layer_pages += 1
+                elif item.origin == "blank":
+                    blank_pages += 1
+                elif item.origin == "checkpoint":
+                    resumed_pages += 1
+
+                # تسجيل الصفحة فور اكتمالها (الصفحات الفاشلة لا تُسجل لتُعاد عند الاستئناف)
+                if journal and item.error is None and item.origin != "checkpoint":
+                    journal.record(item.file_index, item.page_no, item.text, item.origin)
+
+                block = f"\n\n--- {item.path.name} صفحة {item.page_no} ---\n\n{item.text}"
+                page_count += 1
+                metrics.add_page(item.timings, item.width, item.height, item.nbytes)
+                item.release()
+                if writer:
+                    try:
+                        writer.write_page(item.file_index, block)
+                    except OSError as e:
+                        self.on_error(f"فشل حفظ الملف النصي: {e}")
+                        writer.abort()
+                        writer = None
+
+                self.on_progress({
+                    "file_index": item.file_index,
+                    "page": item.page_no,
+                    "total": item.total_pages,
+                    "text_preview": block,
+                    "elapsed": round(time.time() - start_time, 2),
+                    "queues": pipeline.queue_depths(),
+                    "source": item.origin,
+                    "skipped": item.origin == "blank",
+                    "skipped_pages": blank_pages,
+                    # مدة كل مرحلة لهذه الصفحة بالثواني، وأبعاد صورتها وحجمها في الذاكرة
+                    "timings": round_timings(item.timings),
+                    "width": item.width,
+                    "height": item.height,
+                    "bytes": item.nbytes,
+                    # حجم صور صفحات هذه المهمة الموجودة حالياً في الذاكرة
+                    "memory_bytes": self._memory.used
+                })
+
+            if self.cancelled:
+                self.on_log("تم إيقاف العملية أثناء المعالجة.")
+                return
+
+            text_paths = []
+            if writer:
+                try:
+                    text_paths = writer.commit()
+                except OSError as e:
+                    self.on_error(f"فشل حفظ الملف النصي: {e}")
+                    writer.abort()
+                writer = None
+
+            # النص الكامل لا يُرسل مع الإشارة؛ وصل صفحةً بصفحة عبر progress وهو محفوظ في الملفات
+            summary = {
+                "text_path": text_paths[0] if text_paths else "",
+                "text_paths": text_paths,
+                "total_pages": page_count,
+                "text_layer_pages": text_layer_pages,
+                "blank_pages": blank_pages,
+                "resumed_pages": resumed_pages,
+                "processing_time": round(time.time() - start_time, 2),
+                # مجموع ومتوسط ومئينات مدة كل مرحلة على صفحات المهمة (انظر core.metrics)
+                "timings": metrics.summary(),
+                # الاستخدام الحالي والأقصى من ميزانية ذاكرة الصور ومدة انتظار التحويل بسببها
+                "memory": self._memory.summary()
+            }
+            if cache:
+                summary.update(cache.stats())
+            if journal:
+                # اكتملت المهمة فلا حاجة لنقاط الاستئناف
+                journal.discard()
+            self.on_finished(summary)
+            return summary
+
+        except Exception as ex:
+            self.on_error(f"خطأ غير متوقع: {ex}")
+            logging.error(traceback.format_exc())
+        finally:
+            if writer:
+                # مهمة لم تكتمل: حذف الملفات المؤقتة (الصفحات المكتملة محفوظة في سجل الاستئناف)
+                writer.abort()
+            pipeline.stop()
+            if executor:
+                # إلغاء الصفحات التي لم تبدأ بعد عند الإيقاف أو الخطأ
+                executor.shutdown(wait=False, cancel_futures=True)
+            if cache:
+                cache.close()
+            if journal:
+                journal.close()
+
+    def _build_stages(self, lang, dpi, preprocess, engine, executor, workers, cache, skip_blank, rules=None):
+        """بناء مراحل خط المعالجة بعد مرحلة تحويل الصفحات إلى صور"""
+        tesseract_config = build_tesseract_config(lang)
+
+        def blank_stage(item):
+            if is_blank_page(item.image):
+                item.finish("", "blank")
+
+        def cache_stage(item):
+            item.cache_key = page_cache_key(item.image, lang, dpi, preprocess, tesseract_config, engine)
+            cached = cache.get(item.cache_key)
+            if cached:
+                # يُعاد تنظيف النص الخام المخزن لأن قواعد التنظيف قد تكون تغيرت منذ تخزينه
+                item.raw_text = cached[0]
+                item.finish(clean_text(cached[0], rules), "cache")
+
+        def announce(item):
+            self.on_page_started(f"معالجة الصفحة {item.page_no} من {item.total_pages} - {item.path.name}")
+            self.on_log(f"OCR صفحة {item.page_no}/{item.total_pages} ({item.path.name})")
+
+        def preprocess_stage(item):
+            item.replace_image(preprocess_image(item.image))
+
+        def recognize_stage(item):
+            announce(item)
+            try:
+                item.text = recognize_image(item.image, lang, engine, self._cancel_event)
+            finally:
+                # تحرير الصورة فور الانتهاء منها للحفاظ على الذاكرة
+                item.release()
+
+        def submit_stage(item):
+            announce(item)
+            item.future = executor.submit(recognize_page, item.image, lang, preprocess, engine)
+
+        def clean_stage(item):
+            if item.future is not None:
+                try:
+                    # مدتا المعالجة المسبقة والتعرف مقاسة داخل عملية المجمع
+                    item.text, pool_timings = item.future.result()
+                    item.timings.update(pool_timings)
+                finally:
+                    item.release()
+            with timed(item.timings, "clean"):
+                item.raw_text = item.text
+                item.text = clean_text(item.raw_text, rules)
+            if cache and item.cache_key:
+                cache.put(item.cache_key, item.raw_text, item.text)
+
+        stages = []
+        if skip_blank:
+            stages.append(PipelineStage("blank", blank_stage, OCR_QUEUE_SIZE))
+        if cache:
+            stages.append(PipelineStage("cache", cache_stage, OCR_QUEUE_SIZE))
+
+        if executor:
+            # الطابور أمام مرحلة التنظيف يحمل الصفحات قيد المعالجة في مجمع العمليات
+            stages.append(PipelineStage("recognize", submit_stage, OCR_QUEUE_SIZE, timed=False))
+            stages.append(PipelineStage("clean", clean_stage, workers * 2, timed=False))
+            return stages
+
+        if preprocess:
+            stages.append(PipelineStage("preprocess", preprocess_stage, OCR_QUEUE_SIZE))
+        stages.append(PipelineStage("recognize", recognize_stage, OCR_QUEUE_SIZE))
+        stages.append(PipelineStage("clean", clean_stage, OCR_QUEUE_SIZE, timed=False))
+        return stages
+
+    def _iter_items(self, paths, dpi, start_page, end_page, page_window, use_text_layer, preprocess, journal=None):
+        """مصدر خط المعالجة: صفحات جميع الملفات بالترتيب"""
+        for file_index, path in enumerate(paths):
+            if self.cancelled:
+                return
+
+            path = Path(path)
+            if not path.is_file():
+                self.on_error(f"الملف غير موجود: {path}")
+                continue
+
+            completed = journal.pages_for(file_index) if journal else {}
+            for item in self._iter_pages(path, dpi, start_page, end_page, page_window, use_text_layer, preprocess,
+                                         file_index, completed):
+                if self.cancelled:
+                    item.release()
+                    return
+                yield item
+
+    def _iter_pages(self, path, dpi, start_page, end_page, page_window, use_text_layer=False, preprocess=False,
+                    file_index=0, completed=None):
+        """توليد صفحات الملف واحدة تلو الأخرى كعناصر PageItem
+
+        يتم تحويل ملفات PDF على دفعات صغيرة من الصفحات بحيث لا تبقى في الذاكرة
+        إلا صور الدفعة الحالية، وتُسلَّم كل صورة للمستهلك ثم تُحذف من الدفعة.
+        عند use_text_layer تُقرأ طبقة النص لكل دفعة أولاً، والصفحات ذات النص الصالح
+        تُسلَّم جاهزة دون تحويلها إلى صور، ولا تُرسل إلى Tesseract إلا الصفحات المصورة.
+        تُطلب الصور من Poppler بتدرج الرمادي، وعند preprocess تُرسم الصفحات الأضيق من
+        العرض المستهدف مباشرة بذلك العرض بدلاً من رسمها بالدقة المحددة ثم تكبيرها.
+        completed: الصفحات المكتملة من سجل الاستئناف {رقم الصفحة: (النص، المصدر)} وتُسلَّم دون معالجة.
+        قبل رسم كل مجموعة يُحجز حجم صورها المتوقع (أو حجم نسخها المعالجة إن كان أكبر) من ميزانية
+        الذاكرة المشتركة (PAGE_BUDGET)، فيتوقف التحويل مؤقتاً إذا امتلأت الميزانية حتى تتحرر صور صفحات أخرى.
+        """
+        completed = completed or {}
+        if path.suffix.lower() != ".pdf":
+            if 1 in completed:
+                yield self._ready_item(path, file_index, 1, 1, completed[1][0], "checkpoint")
+                return
+            try:
+                img = Image.open(path)
+                # Image.open يقرأ الأبعاد فقط، وتُحجز مساحة الصورة قبل تحميل بياناتها
+                reservation = self._memory.acquire(self._reserved_bytes(img, preprocess), self._cancel_event)
+            except JobCancelled:
+                img.close()
+                return
+            except Exception as e:
+                self.on_error(f"خطأ في فتح الصورة: {path.name} - {e}")
+                return
+            started = time.perf_counter()
+            try:
+                img.load()
+            except Exception as e:
+                reservation.release()
+                self.on_error(f"خطأ في فتح الصورة: {path.name} - {e}")
+                return
+            item = PageItem(path, 1, 1, img, file_index, reservation)
+            item.timings["render"] = time.perf_counter() - started
+            yield item
+            return
+
+        poppler_kwargs = {}
+        if POPPLER_PATH:
+            poppler_kwargs["poppler_path"] = str(POPPLER_PATH)
+
+        try:
+            total_pages = int(pdfinfo_from_path(str(path), **poppler_kwargs)["Pages"])
+        except Exception as e:
+            self.on_error(f"خطأ في قراءة معلومات ملف PDF: {path.name} - {e}")
+            return
+
+        first_page = max(1, start_page)
+        last_page = min(total_pages, end_page) if end_page else total_pages
+        page_window = max(1, page_window)
+        text_reader = TextLayerReader(path, POPPLER_PATH, self._cancel_event) if use_text_layer else None
+        page_sizes = pdf_page_sizes(path)
+
+        self.on_log(f"تحويل PDF إلى صور: {path.name}")
+        for window_start in range(first_page, last_page + 1, page_window):
+            window_end = min(last_page, window_start + page_window - 1)
+            window_pages = list(range(window_start, window_end + 1))
+
+            # الصفحات الجاهزة دون تحويل إلى صور: {رقم الصفحة: (النص، المصدر، مدد المراحل)}
+            ready = {n: (completed[n][0], "checkpoint", {}) for n in window_pages if n in completed}
+            if text_reader and len(ready) < len(window_pages):
+                try:
+                    started = time.perf_counter()
+                    layer = text_reader.extract(window_start, window_end)
+                    per_page = {"text_layer": (time.perf_counter() - started) / max(1, len(layer))}
+                    for n, text in zip(window_pages, layer):
+                        if n not in ready and is_usable_text_layer(text):
+                            ready[n] = (text.strip(), "text_layer", per_page)
+                except JobCancelled:
+                    return
+                except Exception as e:
+                    self.on_log(f"تعذر قراءة طبقة النص: {path.name} - {e}")
+
+            # تحويل الصفحات المصورة فقط، على شكل مقاطع متصلة داخل الدفعة
+            for run in self._contiguous_runs([n for n in window_pages if n not in ready]):
+                for n in sorted(ready):
+                    if n < run[0]:
+                        yield self._ready_item(path, file_index, n, total_pages, *ready.pop(n))
+                groups = self._render_groups(run, page_sizes if preprocess else None, dpi)
+                for group_first, group_last, size in groups:
+                    try:
+                        # انتظار مكان لصور المجموعة في ميزانية الذاكرة المشتركة قبل رسمها
+                        reservation = self._memory.acquire(sum(
+                            self._estimate_bytes(self._page_size(page_sizes, n), dpi, size, preprocess)
+                            for n in range(group_first, group_last + 1)
+                        ), self._cancel_event)
+                    except JobCancelled:
+                        return
+                    started = time.perf_counter()
+                    try:
+                        # عملية pdftoppm تُنهى فوراً عند إيقاف المهمة (انظر core.poppler)
+                        images = render_pages(
+                            path, dpi=dpi, first_page=group_first, last_page=group_last,
+                            grayscale=True, size=size, poppler_path=POPPLER_PATH, cancel_event=self._cancel_event
+                        )
+                    except JobCancelled:
+                        reservation.release()
+                        return
+                    except Exception as e:
+                        reservation.release()
+                        self.on_error(f"خطأ في تحويل PDF إلى صور: {path.name} - {e}")
+                        return
+
+                    # مدة تحويل المجموعة موزعة بالتساوي على صفحاتها، والحجز مقسم على أحجامها الفعلية
+                    render_seconds = (time.perf_counter() - started) / max(1, len(images))
+                    parts = reservation.split([self._reserved_bytes(img, preprocess) for img in images])
+                    page_no = group_first
+                    try:
+                        while images:
+                            # إخراج الصورة من الدفعة حتى يتحرر مرجعها بمجرد انتهاء المستهلك منها
+                            item = PageItem(path, page_no, total_pages, images.pop(0), file_index, parts.pop(0))
+                            item.timings["render"] = render_seconds
+                            yield item
+                            page_no += 1
+                    finally:
+                        # إيقاف المصدر قبل تسليم كل صور المجموعة
+                        for part in parts:
+                            part.release()
+
+            for n in sorted(ready):
+                yield self._ready_item(path, file_index, n, total_pages, *ready[n])
+
+    @staticmethod
+    def _ready_item(path, file_index, page_no, total_pages, text, origin, timings=None):
+        """صفحة نصها جاهز مسبقاً (طبقة النص أو سجل الاستئناف) فلا تمر بالتعرف ولا بالتنظيف"""
+        item = PageItem(path, page_no, total_pages, None, file_index)
+        item.timings.update(timings or {})
+        item.raw_text = text
+        item.finish(text, origin)
+        return item
+
+    @staticmethod
+    def _reserved_bytes(img, preprocess):
+        """حجز صورة الصفحة: حجمها، أو حجم نسختها المعالجة إن كانت أكبر (بعد تكبيرها إلى TARGET_WIDTH)
+
+        يُحجز الحجم الأكبر من البداية لأن المعالجة المسبقة تعدّل الحجز دون انتظار (Reservation.resize).
+        """
+        nbytes = image_nbytes(img)
+        if preprocess:
+            width, height = preprocessed_size(img.width, img.height)
+            nbytes = max(nbytes, width * height)
+        return nbytes
+
+    @staticmethod
+    def _estimate_bytes(page_size, dpi, size, preprocess):
+        """الحجم المتوقع لصورة صفحة PDF قبل رسمها، مع حجم نسختها المعالجة عند preprocess"""
+        nbytes = estimate_page_bytes(page_size, dpi, width=size and size[0])
+        if preprocess:
+            nbytes = max(nbytes, estimate_page_bytes(page_size, dpi, width=TARGET_WIDTH))
+        return nbytes
+
+    @staticmethod
+    def _page_size(page_sizes, page_no):
+        """أبعاد الصفحة بالنقاط من pdf_page_sizes، أو None إذا كانت غير معروفة"""
+        if page_sizes and page_no <= len(page_sizes):
+            return page_sizes[page_no - 1]
+        return None
+
+    @staticmethod
+    def _render_groups(run, page_sizes, dpi):
+        """تقسيم مقطع صفحات إلى مجموعات بنفس إعدادات الرسم (الصفحة الأولى، الأخيرة، size)
+
+        الصفحة التي يقل عرضها بالدقة المحددة عن TARGET_WIDTH تُرسم مباشرة بذلك العرض
+        (size=(TARGET_WIDTH, None)) فلا تحتاج المعالجة المسبقة إلى تكبيرها لاحقاً.
+        """
+        groups = []
+        for n in run:
+            size = None
+            if page_sizes and n <= len(page_sizes) and page_sizes[n - 1][0] * dpi / 72 < TARGET_WIDTH:
+                size = (TARGET_WIDTH, None)
+            if groups and groups[-1][2] == size and groups[-1][1] == n - 1:
+                groups[-1][1] = n
+            else:
+                groups.append([n, n, size])
+        return [tuple(group) for group in groups]
+
+    @staticmethod
+    def _contiguous_runs(page_numbers):
+        """تقسيم أرقام صفحات مرتبة إلى مقاطع متصلة"""
+        runs = []
+        for n in page_numbers:
+            if runs and n == runs[-1][-1] + 1:
+                runs[-1].append(n)
+            else:
+                runs.append([n])
+        return runs
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+خط معالجة (Pipeline) لصفحات OCR بمراحل متوازية تربطها طوابير محدودة الحجم
+
+كل مرحلة تعمل في خيط مستقل، فيتم تحويل الصفحة التالية إلى صورة بينما تتعرف
+المرحلة التالية على الصفحة الحالية وتنظف المرحلة الأخيرة نص الصفحة السابقة.
+الطوابير المحدودة تمنع المرحلة السريعة من تكديس الصور في الذاكرة (Backpressure).
+"""
+import time
+import queue
+import logging
+import threading
+
+from core.cancellation import JobCancelled
+from core.metrics import timed, image_nbytes
+from core.profiling import propagate
+
+# علامة نهاية التدفق بين المراحل
+_END = object()
+
+# مدة الانتظار قبل إعادة فحص طلب الإيقاف (بالثواني)
+_POLL_INTERVAL = 0.1
+
+# أقصى مدة إجمالية لانتظار خيوط المراحل عند الإيقاف (بالثواني)
+_JOIN_TIMEOUT = 2.0
+
+
+class PageItem:
+    """صفحة واحدة تمر عبر مراحل خط المعالجة"""
+
+    __slots__ = ("path", "file_index", "page_no", "total_pages", "image", "text", "raw_text", "error", "future",
+                 "cache_key", "origin", "done", "timings", "width", "height", "nbytes", "reservation")
+
+    def __init__(self, path, page_no, total_pages, image, file_index=0, reservation=None):
+        self.path = path
+        self.file_index = file_index
+        self.page_no = page_no
+        self.total_pages = total_pages
+        self.image = image
+        self.text = ""
+        self.raw_text = ""
+        self.error = None
+        self.future = None
+        self.cache_key = None
+        # مصدر نص الصفحة (ocr أو cache أو text_layer أو blank أو checkpoint)
+        self.origin = "ocr"
+        # صفحة اكتمل نصها مبكراً فتتجاوز بقية المراحل
+        self.done = False
+        # مدة كل مرحلة بالثواني، وأبعاد الصورة المحولة من PDF وحجمها في الذاكرة (انظر core.metrics)
+        self.timings = {}
+        self.width = image.width if image is not None else 0
+        self.height = image.height if image is not None else 0
+        self.nbytes = image_nbytes(image)
+        # حجز الصورة من ميزانية الذاكرة المشتركة (انظر core.memory_budget)، ويُحرر مع الصورة
+        self.reservation = reservation
+
+    def finish(self, text, origin):
+        """إكمال الصفحة بنص جاهز وتحرير صورتها"""
+        self.text = text
+        self.origin = origin
+        self.done = True
+        self.release()
+
+    def replace_image(self, image):
+        """استبدال صورة الصفحة بنسخة معالجة مع تحرير القديمة وتعديل حجزها إلى حجم الجديدة"""
+        if image is not self.image and self.image is not None:
+            self.image.close()
+        self.image = image
+        if self.reservation is not None:
+            self.reservation.resize(image_nbytes(image))
+
+    def release(self):
+        """تحرير صورة الصفحة من الذاكرة وإعادة حجزها إلى الميزانية"""
+        if self.image is not None:
+            self.image.close()
+            self.image = None
+        if self.reservation is not None:
+            self.reservation.release()
+            self.reservation = None
+
+
+class PipelineStage:
+    """مرحلة واحدة في خط المعالجة
+
+    fn: دالة تستقبل PageItem وتعدّله في مكانه.
+    queue_size: عدد الصفحات المسموح بانتظارها قبل هذه المرحلة.
+    timed: تسجيل مدة fn في item.timings باسم المرحلة (تُعطل للمراحل التي تسجل مددها بنفسها).
+    """
+
+    def __init__(self, name, fn, queue_size=2, timed=True):
+        self.name = name
+        self.fn = fn
+        self.queue = queue.Queue(maxsize=max(1, queue_size))
+        self.timed = timed
+
+
+class OCRPipeline:
+    """تشغيل مصدر الصفحات والمراحل في خيوط مستقلة وإرجاع الصفحات بالترتيب للمستهلك"""
+
+    def __init__(self, source, stages, output_queue_size=2):
+        self.source = source
+        self.stages = list(stages)
+        self.output = queue.Queue(maxsize=max(1, output_queue_size))
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        queues = [stage.queue for stage in self.stages] + [self.output]
+        self._threads.append(threading.Thread(
+            target=propagate(self._run_source), args=(queues[0],), name="ocr-rasterize", daemon=True))
+        for stage, out_queue in zip(self.stages, queues[1:]):
+            self._threads.append(threading.Thread(
+                target=propagate(self._run_stage), args=(stage, out_queue), name=f"ocr-{stage.name}", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def cancel(self):
+        """طلب الإيقاف دون انتظار (يمكن استدعاؤها من أي خيط)؛ ينتهي المستهلك خلال _POLL_INTERVAL"""
+        self._stop.set()
+
+    def stop(self):
+        """إيقاف جميع المراحل وتحرير الصور المتبقية في الطوابير
+
+        مدة انتظار الخيوط محدودة بـ _JOIN_TIMEOUT؛ الخيط المشغول بخطوة لا يمكن مقاطعتها
+        (مثل التعرف عبر tesserocr) يكمل صفحته في الخلفية ثم يحرر صورتها بنفسه.
+        """
+        self._stop.set()
+        deadline = time.monotonic() + _JOIN_TIMEOUT
+        for thread in self._threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        for q in [stage.queue for stage in self.stages] + [self.output]:
+            while True:
+                try:
+                    item = q.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _END:
+                    item.release()
+
+    def queue_depths(self):
+        """عدد الصفحات المنتظرة أمام كل مرحلة (لمعرفة المرحلة التي تشكل عنق الزجاجة)"""
+        depths = {stage.name: stage.queue.qsize() for stage in self.stages}
+        depths["output"] = self.output.qsize()
+        return depths
+
+    def __iter__(self):
+        while True:
+            item = self._get(self.output)
+            if item is _END:
+                return
+            yield item
+
+    def _get(self, q):
+        while True:
+            if self._stop.is_set():
+                return _END
+            try:
+                return q.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+
+    def _put(self, q, item):
+        while True:
+            if self._stop.is_set():
+                if item is not _END:
+                    item.release()
+                return False
+            try:
+                q.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+
+    def _run_source(self, out_queue):
+        try:
+            for item in self.source:
+                if not self._put(out_queue, item):
+                    break
+        except JobCancelled:
+            pass
+        except Exception as e:
+            logging.error(f"خطأ في مرحلة تحويل الصفحات إلى صور: {e}")
+        finally:
+            self.source.close()
+            self._put(out_queue, _END)
+
+    def _run_stage(self, stage, out_queue):
+        while True:
+            item = self._get(stage.queue)
+            if item is _END:
+                self._put(out_queue, _END)
+                return
+            if item.error is None and not item.done:
+                try:
+                    if stage.timed:
+                        with timed(item.timings, stage.name):
+                            stage.fn(item)
+                    else:
+                        stage.fn(item)
+                except Exception as e:
+                    item.error = e
+                    item.release()
+            if not self._put(out_queue, item):
+                return
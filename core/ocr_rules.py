@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+قواعد تنظيف نص OCR (التصحيحات اللغوية وكلمات الضجيج) من ملفات بيانات قابلة للتعديل
+
+القواعد المستخدمة هي القواعد المرفقة مع البرنامج (DEFAULT_OCR_RULES_FILE) مدمجاً فوقها ملف المستخدم
+الاختياري (OCR_RULES_FILE)، فتصل التصحيحات الجديدة في كل إصدار دون أن تضيع إضافات المستخدم. الصيغة:
+    {"version": 1, "corrections": {"الخطأ": "الصواب", ...}, "noise_words": ["...", ...]}
+ويقبل ملف المستخدم أيضاً remove_corrections و remove_noise_words (قوائم) لإلغاء قواعد مرفقة.
+تصحيحات المستخدم تُقدَّم على المرفقة لنفس المفتاح، وكلمات الضجيج تُضاف إلى المرفقة.
+
+تُحفظ القواعد المدمجة مع نصوص التعابير النمطية المبنية منها في ملف JSON مؤقت (OCR_RULES_CACHE_FILE)
+معنون بوقت تعديل الملفين وحجمهما، فلا يُعاد بناؤها عند كل تشغيل.
+لا يمكن حفظ التعابير المترجمة نفسها في بايثون، لذلك تُترجم عند أول استخدام فقط وليس عند بدء البرنامج.
+يتم فحص الملفين قبل كل مهمة (reload_rules) وتُطبق التعديلات دون إعادة تشغيل البرنامج.
+"""
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+from pathlib import Path
+
+from core.config import OCR_RULES_FILE, DEFAULT_OCR_RULES_FILE, OCR_RULES_CACHE_FILE
+
+# يتغير عند تغيير محتوى الملف المؤقت أو طريقة بناء التعابير فيُتجاهل الملف المؤقت القديم
+RULES_CACHE_VERSION = 2
+
+
+def corrections_pattern_source(corrections):
+    """نص تعبير نمطي واحد لمفاتيح التصحيحات على شكل شجرة بادئات (Trie)
+
+    يُطبَّق التعبير في مرور واحد على النص بدلاً من مرور لكل تصحيح، ولا تتأثر سرعته كثيراً بعدد
+    التصحيحات لأن المحرك لا يجرب عند كل موضع إلا الفروع التي تبدأ بالحرف الحالي.
+    عند تداخل المفاتيح يُختار أطول مفتاح يبدأ من الموضع الحالي (مثلاً "Las :" قبل "Las")،
+    ثم يُستأنف البحث بعد النص المطابق، ولا يُعاد فحص النص الناتج عن الاستبدال.
+    """
+    root = {}
+    for key in corrections:
+        if not key:
+            continue
+        node = root
+        for char in key:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # المجموعة الاختيارية جشعة فيُجرب المفتاح الأطول أولاً
+        return f"(?:{body})?" if "" in node else body
+
+    return build(root) or "(?!)"
+
+
+def noise_pattern_source(noise_words):
+    """نص تعبير نمطي واحد لكلمات الضجيج كاملة، الأطول أولاً حتى تُحذف العبارة قبل أي كلمة أقصر بداخلها"""
+    words = sorted((w for w in noise_words if w), key=len, reverse=True)
+    if not words:
+        return "(?!)"
+    return r'\b(?:' + '|'.join(re.escape(w) for w in words) + r')\b'
+
+
+class OCRRules:
+    """مجموعة قواعد التنظيف مع تعابيرها النمطية (تُترجم عند أول استخدام)"""
+
+    def __init__(self, corrections, noise_words, corrections_source=None, noise_source=None):
+        self.corrections = corrections
+        self.noise_words = noise_words
+        self.corrections_source = corrections_source or corrections_pattern_source(corrections)
+        self.noise_source = noise_source or noise_pattern_source(noise_words)
+        self._corrections_re = None
+        self._noise_re = None
+
+        # بصمة القواعد: تدخل في إعدادات سجل الاستئناف حتى لا تُخلط صفحات نُظفت بقواعد مختلفة
+        digest = hashlib.sha256(self.corrections_source.encode("utf-8"))
+        digest.update(json.dumps(corrections, ensure_ascii=False).encode("utf-8"))
+        digest.update(self.noise_source.encode("utf-8"))
+        self.signature = digest.hexdigest()[:16]
+
+    @property
+    def corrections_pattern(self):
+        if self._corrections_re is None:
+            self._corrections_re = re.compile(self.corrections_source)
+        return self._corrections_re
+
+    @property
+    def noise_pattern(self):
+        if self._noise_re is None:
+            self._noise_re = re.compile(self.noise_source, re.IGNORECASE)
+        return self._noise_re
+
+    def apply_corrections(self, text):
+        return self.corrections_pattern.sub(lambda m: self.corrections[m.group(0)], text)
+
+    def remove_noise(self, text):
+        return self.noise_pattern.sub('', text)
+
+
+def _is_text_map(value):
+    return isinstance(value, dict) and all(isinstance(k, str) and isinstance(v, str) for k, v in value.items())
+
+
+def _is_text_list(value):
+    return isinstance(value, list) and all(isinstance(w, str) for w in value)
+
+
+def _validate(data, path):
+    """التحقق من بنية ملف القواعد وإرجاع القاموس بعد التحقق"""
+    if not isinstance(data, dict):
+        raise ValueError(f"{path.name}: يجب أن يكون الملف كائن JSON")
+    if not _is_text_map(data.get("corrections", {})):
+        raise ValueError(f"{path.name}: corrections يجب أن يكون قاموساً من نص إلى نص")
+    for key in ("noise_words", "remove_corrections", "remove_noise_words"):
+        if not _is_text_list(data.get(key, [])):
+            raise ValueError(f"{path.name}: {key} يجب أن تكون قائمة نصوص")
+    return data
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return _validate(json.load(f), path)
+
+
+def merge_rules(bundled, user):
+    """دمج قواعد المستخدم فوق القواعد المرفقة وإرجاع (التصحيحات، كلمات الضجيج)"""
+    user = user or {}
+    corrections = dict(bundled.get("corrections", {}))
+    for key in user.get("remove_corrections", []):
+        corrections.pop(key, None)
+    corrections.update(user.get("corrections", {}))
+
+    removed = set(user.get("remove_noise_words", []))
+    noise_words = [w for w in bundled.get("noise_words", []) if w not in removed]
+    known = set(noise_words)
+    for word in user.get("noise_words", []):
+        if word not in known:
+            noise_words.append(word)
+            known.add(word)
+    return corrections, noise_words
+
+
+def _source_stamp(path):
+    stat = path.stat()
+    return [str(path), stat.st_mtime_ns, stat.st_size]
+
+
+def _load_cache(sources):
+    """القواعد من الملف المؤقت إذا كان صالحاً ومطابقاً للملفات المصدر، وإلا None"""
+    try:
+        with open(OCR_RULES_CACHE_FILE, encoding="utf-8") as f:
+            cached = json.load(f)
+        if (not isinstance(cached, dict) or cached.get("version") != RULES_CACHE_VERSION
+                or cached.get("sources") != sources):
+            return None
+        if not (_is_text_map(cached.get("corrections")) and _is_text_list(cached.get("noise_words"))
+                and isinstance(cached.get("corrections_source"), str) and isinstance(cached.get("noise_source"), str)):
+            raise ValueError("بنية غير صالحة")
+        return OCRRules(cached["corrections"], cached["noise_words"],
+                        cached["corrections_source"], cached["noise_source"])
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.warning(f"تجاهل الملف المؤقت لقواعد التنظيف {OCR_RULES_CACHE_FILE}: {e}")
+        return None
+
+
+def _save_cache(sources, rules):
+    try:
+        OCR_RULES_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = OCR_RULES_CACHE_FILE.with_name(OCR_RULES_CACHE_FILE.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": RULES_CACHE_VERSION, "sources": sources,
+                "corrections": rules.corrections, "noise_words": rules.noise_words,
+                "corrections_source": rules.corrections_source, "noise_source": rules.noise_source
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, OCR_RULES_CACHE_FILE)
+    except OSError as e:
+        logging.warning(f"تعذر حفظ الملف المؤقت لقواعد التنظيف: {e}")
+
+
+def load_rules(path, use_cache=True, overrides=None):
+    """تحميل القواعد من الملف path مدمجاً فوقها ملف المستخدم overrides (إن وُجد)
+
+    مع use_cache تُقرأ القواعد المدمجة من OCR_RULES_CACHE_FILE إذا كان مطابقاً للملفين، ويُحدَّث عند تغيرهما.
+    """
+    path = Path(path)
+    overrides = Path(overrides) if overrides else None
+    sources = [_source_stamp(path), _source_stamp(overrides) if overrides else None]
+    if use_cache:
+        rules = _load_cache(sources)
+        if rules is not None:
+            return rules
+
+    rules = OCRRules(*merge_rules(_read(path), _read(overrides) if overrides else None))
+    if use_cache:
+        _save_cache(sources, rules)
+    return rules
+
+
+def overrides_file():
+    """ملف قواعد المستخدم إن وُجد (لا يُنشأ تلقائياً)"""
+    return OCR_RULES_FILE if OCR_RULES_FILE.exists() else None
+
+
+_lock = threading.Lock()
+_current = None
+_current_stamp = None
+
+
+def reload_rules():
+    """إعادة تحميل القواعد إذا تغير أحد الملفين منذ آخر تحميل، وإرجاع القواعد الحالية
+
+    يُستدعى قبل كل مهمة. إذا كان ملف المستخدم المعدل غير صالح تبقى القواعد السابقة مستخدمة.
+    """
+    global _current, _current_stamp
+    with _lock:
+        overrides = overrides_file()
+        try:
+            stamp = (_source_stamp(DEFAULT_OCR_RULES_FILE), _source_stamp(overrides) if overrides else None)
+            if _current is not None and stamp == _current_stamp:
+                return _current
+            rules = load_rules(DEFAULT_OCR_RULES_FILE, overrides=overrides)
+        except Exception as e:
+            logging.error(f"خطأ في ملف قواعد التنظيف {overrides or DEFAULT_OCR_RULES_FILE}: {e}")
+            if _current is None:
+                # أول تحميل: الرجوع إلى القواعد المرفقة وحدها ثم إلى قواعد فارغة
+                try:
+                    rules = load_rules(DEFAULT_OCR_RULES_FILE, use_cache=False)
+                except Exception as default_error:
+                    logging.error(f"تعذر تحميل قواعد التنظيف الافتراضية: {default_error}")
+                    rules = OCRRules({}, [])
+                _current, _current_stamp = rules, None
+            return _current
+
+        if _current is not None:
+            logging.info("تم تحديث قواعد التنظيف")
+        _current, _current_stamp = rules, stamp
+        return _current
+
+
+def current_rules():
+    """القواعد المحملة حالياً (تُحمّل عند أول استدعاء)"""
+    return _current if _current is not None else reload_rules()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+كتابة نتائج OCR إلى الملفات النصية تدريجياً صفحةً بصفحة
+
+تُكتب كل صفحة فور اكتمالها إلى ملف مؤقت (.part) بذاكرة كتابة مؤقتة، وعند انتهاء المهمة
+يُستبدل الملف النهائي بالمؤقت دفعة واحدة (os.replace) فلا يظهر ملف ناقص أبداً.
+يمكن كتابة ملف واحد لكل الملفات المدخلة (الاسم المدمج القديم) أو ملف لكل ملف مدخل.
+"""
+import os
+import logging
+from pathlib import Path
+
+from core.config import OUTPUT_BUFFER_SIZE
+
+
+class OCROutputWriter:
+    """كاتب ملفات الإخراج لمهمة OCR واحدة"""
+
+    def __init__(self, paths, per_file=False, buffer_size=OUTPUT_BUFFER_SIZE):
+        self.paths = [Path(p) for p in paths]
+        self.per_file = per_file
+        self.buffer_size = buffer_size
+        # الملفات المفتوحة: {المسار النهائي: [الملف المؤقت، الفراغات المؤجلة]}
+        self._targets = {}
+
+    def output_path(self, file_index):
+        """مسار ملف الإخراج النهائي للملف المدخل المحدد"""
+        if self.per_file:
+            path = self.paths[file_index]
+            return path.parent / f"{path.stem}_ocr.txt"
+        out_name = "_".join([p.stem for p in self.paths]) + "_ocr.txt"
+        return self.paths[0].parent / out_name
+
+    def write_page(self, file_index, block):
+        """إضافة كتلة صفحة إلى ملف الإخراج
+
+        الناتج مطابق لـ "".join(blocks).strip(): تُحذف الفراغات في بداية الملف، وتؤجل الفراغات
+        في نهاية كل كتلة حتى تصل كتلة تالية فلا تبقى فراغات في نهاية الملف.
+        """
+        target = self.output_path(file_index)
+        state = self._targets.get(target)
+        if state is None:
+            part = open(self._part_path(target), "w", encoding="utf-8", buffering=self.buffer_size)
+            state = self._targets[target] = [part, None]
+            block = block.lstrip()
+        else:
+            block = state[1] + block
+        content = block.rstrip()
+        state[1] = block[len(content):]
+        state[0].write(content)
+
+    def commit(self):
+        """إنهاء الكتابة ونقل الملفات المؤقتة إلى أسمائها النهائية، وإرجاع قائمة المسارات"""
+        written = []
+        for target, (part, _) in self._targets.items():
+            part.flush()
+            os.fsync(part.fileno())
+            part.close()
+            os.replace(self._part_path(target), target)
+            written.append(str(target))
+        self._targets.clear()
+        return written
+
+    def abort(self):
+        """إلغاء الكتابة وحذف الملفات المؤقتة (عند الإيقاف أو الخطأ)"""
+        for target, (part, _) in self._targets.items():
+            try:
+                part.close()
+                os.remove(self._part_path(target))
+            except OSError as e:
+                logging.warning(f"تعذر حذف الملف المؤقت {target}: {e}")
+        self._targets.clear()
+
+    @staticmethod
+    def _part_path(target):
+        return target.with_name(target.name + ".part")
@@ -4,12 +4,18 @@ import logging
 from pypdf import PdfReader, PdfWriter
 from pathlib import Path
 from PIL import Image
-from pdf2image import convert_from_path
+from pdf2image import pdfinfo_from_path
+
+from core.config import PDF_TO_IMAGES_WINDOW
+from core.memory_budget import PAGE_BUDGET, pdf_page_sizes, estimate_page_bytes
+from core.poppler import render_pages
+from core.profiling import profiled
 
 class PDFProcessor:
     """Class to handle advanced PDF operations like merging, splitting, and security."""
     
     @staticmethod
+    @profiled
     def merge_pdfs(file_paths, output_path):
         """Merges multiple PDF files into one."""
         current_file = ""
@@ -38,6 +44,7 @@ class PDFProcessor:
             return False, f"خطأ في الملف '{current_file}': {error_msg}"
 
     @staticmethod
+    @profiled
     def split_pdf(file_path, output_dir, page_range_str):
         """Splits a PDF based on a page range string (e.g., '1-3, 5, 8-10')."""
         try:
@@ -72,6 +79,7 @@ class PDFProcessor:
             return False, f"خطأ أثناء الفصل: {str(e)}"
 
     @staticmethod
+    @profiled
     def split_pdf_to_pages(file_path, output_dir):
         """Splits a PDF into individual files, one per page."""
         try:
@@ -95,6 +103,7 @@ class PDFProcessor:
             return False, f"خطأ أثناء فصل الصفحات: {str(e)}"
 
     @staticmethod
+    @profiled
     def encrypt_pdf(file_path, password, output_path):
         """Encrypts a PDF with a password."""
         try:
@@ -114,6 +123,7 @@ class PDFProcessor:
             return False, str(e)
 
     @staticmethod
+    @profiled
     def decrypt_pdf(file_path, password, output_path):
         """Decrypts a password-protected PDF."""
         try:
@@ -133,6 +143,7 @@ class PDFProcessor:
             return False, "تأكد من صحة كلمة المرور"
 
     @staticmethod
+    @profiled
     def images_to_pdf(image_paths, output_path):
         """Converts multiple images into a single PDF."""
         try:
@@ -150,20 +161,39 @@ class PDFProcessor:
             return False, str(e)
 
     @staticmethod
-    def pdf_to_images(pdf_path, output_dir, poppler_path=None):
-        """Converts PDF pages into images."""
+    @profiled
+    def pdf_to_images(pdf_path, output_dir, poppler_path=None, dpi=200):
+        """Converts PDF pages into images.
+
+        Pages are rendered a few at a time (PDF_TO_IMAGES_WINDOW) and written out before the
+        next batch, each batch reserving its size from the shared page memory budget first.
+        """
         try:
-            images = convert_from_path(pdf_path, poppler_path=poppler_path)
+            total_pages = int(pdfinfo_from_path(pdf_path, poppler_path=poppler_path)["Pages"])
+            page_sizes = pdf_page_sizes(pdf_path)
+            memory = PAGE_BUDGET.account()
             stem = Path(pdf_path).stem
-            for i, image in enumerate(images):
-                output_path = os.path.join(output_dir, f"{stem}_page_{i+1}.jpg")
-                image.save(output_path, 'JPEG')
-            return True, f"تم تحويل {len(images)} صفحة إلى صور بنجاح في: {output_dir}"
+            for first in range(1, total_pages + 1, PDF_TO_IMAGES_WINDOW):
+                last = min(total_pages, first + PDF_TO_IMAGES_WINDOW - 1)
+                reservation = memory.acquire(sum(
+                    estimate_page_bytes(page_sizes[n - 1] if page_sizes and n <= len(page_sizes) else None, dpi, 3)
+                    for n in range(first, last + 1)
+                ))
+                try:
+                    images = render_pages(pdf_path, dpi=dpi, first_page=first, last_page=last, poppler_path=poppler_path)
+                    for page_no, image in enumerate(images, start=first):
+                        output_path = os.path.join(output_dir, f"{stem}_page_{page_no}.jpg")
+                        image.save(output_path, 'JPEG')
+                        image.close()
+                finally:
+                    reservation.release()
+            return True, f"تم تحويل {total_pages} صفحة إلى صور بنجاح في: {output_dir}"
         except Exception as e:
             logging.error(f"Error converting PDF to images: {e}")
             return False, str(e)
 
     @staticmethod
+    @profiled
     def compress_pdf(pdf_path, output_path):
         """Compresses a PDF file."""
         try:
@@ -171,8 +201,8 @@ class PDFProcessor:
             writer = PdfWriter()
             
             for page in reader.pages:
-                page.compress_content_streams()
-                writer.add_page(page)
+                # pypdf requires the page to belong to the writer before compressing it
+                writer.add_page(page).compress_content_streams()
             
             with open(output_path, "wb") as f:
                 writer.write(f)
@@ -182,6 +212,7 @@ class PDFProcessor:
             return False, str(e)
 
     @staticmethod
+    @profiled
     def compress_images(image_paths, output_dir, quality=70):
         """Compresses multiple images."""
         try:
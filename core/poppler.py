@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+تحويل صفحات PDF إلى صور عبر pdftoppm من Poppler كعملية يمكن إنهاؤها
+
+تعطي نفس نتيجة pdf2image.convert_from_path (إخراج الصور عبر stdout وقراءتها في الذاكرة)
+لكن تُشغَّل العملية عبر core.cancellation.run_process، فيُنهى تحويل دفعة الصفحات فوراً
+عند إلغاء مهمة OCR بدلاً من انتظار اكتماله.
+"""
+import os
+import subprocess
+from pathlib import Path
+
+from pdf2image.parsers import parse_buffer_to_pgm, parse_buffer_to_ppm
+
+from core.cancellation import run_process
+
+
+def poppler_command(name, poppler_path=None):
+    """مسار أداة Poppler (مثل pdftoppm) داخل poppler_path، أو اسمها فقط للبحث في PATH"""
+    if os.name == "nt":
+        name += ".exe"
+    return str(Path(poppler_path) / name) if poppler_path else name
+
+
+def _process_kwargs(poppler_path):
+    kwargs = {"stdout": subprocess.PIPE, "stderr": subprocess.PIPE}
+    if os.name == "nt":
+        # منع ظهور نافذة سطر الأوامر لكل دفعة صفحات
+        kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
+    elif poppler_path:
+        env = os.environ.copy()
+        env["LD_LIBRARY_PATH"] = str(poppler_path) + ":" + env.get("LD_LIBRARY_PATH", "")
+        kwargs["env"] = env
+    return kwargs
+
+
+def render_pages(pdf_path, dpi=200, first_page=None, last_page=None, grayscale=False, size=None,
+                 poppler_path=None, cancel_event=None):
+    """تحويل الصفحات من first_page إلى last_page إلى قائمة صور PIL
+
+    size: (العرض، None) لرسم الصفحة بعرض محدد مع الحفاظ على النسبة (مثل convert_from_path).
+    cancel_event: حدث يُنهي pdftoppm ويرفع JobCancelled عند ضبطه.
+    """
+    args = [poppler_command("pdftoppm", poppler_path), "-r", str(dpi)]
+    if first_page is not None:
+        args += ["-f", str(first_page)]
+    if last_page is not None:
+        args += ["-l", str(last_page)]
+    if grayscale:
+        args.append("-gray")
+    if size is not None:
+        width, height = size
+        args += ["-scale-to-x", str(int(width) if width else -1), "-scale-to-y", str(int(height) if height else -1)]
+    args.append(str(pdf_path))
+
+    returncode, stdout, stderr = run_process(args, cancel_event, **_process_kwargs(poppler_path))
+    if returncode != 0 and not stdout:
+        message = stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(message or f"pdftoppm exited with code {returncode}")
+    return parse_buffer_to_pgm(stdout) if grayscale else parse_buffer_to_ppm(stdout)
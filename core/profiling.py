@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+تشخيص أداء مهام OCR وأدوات PDF بعد حدوثها (cProfile للوقت و tracemalloc للذاكرة)
+
+معطل افتراضياً، ويُفعَّل بمتغير البيئة WARRAQ_PROFILE (أو warraq --profile):
+- 1 أو all: الوقت والذاكرة معاً.
+- cpu: cProfile فقط.
+- memory: tracemalloc فقط.
+
+لكل مهمة (OCRJob.run أو عملية PDFProcessor) تُكتب في PROFILE_DIR بجانب ملف السجل ملفات
+تبدأ بوقت المهمة واسمها:
+- <الاسم>.prof: نتائج cProfile لكل خيوط المهمة، تُفتح بـ python -m pstats أو snakeviz.
+- <الاسم>.tracemalloc: لقطة الذاكرة في نهاية المهمة (tracemalloc.Snapshot.load).
+- <الاسم>.txt: ملخص مقروء: المدة، أثقل الدوال، أقصى ذاكرة، وأكبر زيادات الذاكرة منذ بداية المهمة.
+
+خيوط خط معالجة OCR تُقاس ضمن جلسة المهمة التي أنشأتها (انظر propagate)، أما عمليات
+المعالجة المتوازية (workers > 1) فلا تُقاس، ومدد مراحلها متاحة في ملخص المهمة (timings).
+منذ Python 3.12 يعمل cProfile عبر sys.monitoring فيقيس كل خيوط العملية ولا يسمح إلا بمقياس
+واحد نشط فيها: تُقاس المهمة بمقياس واحد للعملية كلها، وإذا كانت مهمة أخرى تُقاس في نفس الوقت
+تُكتب ملفات الذاكرة والملخص فقط. وفي كل الإصدارات إذا تعذر تشغيل cProfile (أداة قياس أخرى نشطة)
+يُسجل تحذير وتعمل المهمة دون قياس الوقت، فلا يوقف التشخيص أي مهمة.
+tracemalloc يقيس ذاكرة البرنامج كله، فتتداخل أرقام المهام التي تعمل في نفس الوقت، ولا يرى
+بيانات صور Pillow (تُحجز خارج Python)؛ حجم الصور لكل صفحة موجود في ملخص المهمة.
+"""
+import io
+import os
+import sys
+import time
+import pstats
+import logging
+import cProfile
+import functools
+import itertools
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+from core.config import PROFILE_ENV_VAR, PROFILE_DIR, PROFILE_TRACE_FRAMES, PROFILE_TOP
+
+_MODES = {"1": ("cpu", "memory"), "all": ("cpu", "memory"), "on": ("cpu", "memory"), "true": ("cpu", "memory"),
+          "cpu": ("cpu",), "memory": ("memory",)}
+
+_local = threading.local()
+_ids = itertools.count(1)
+
+# Python 3.12+: مقياس cProfile واحد للعملية كلها، تملكه جلسة واحدة في كل وقت
+_PROCESS_WIDE_CPU = sys.version_info >= (3, 12)
+_cpu_lock = threading.Lock()
+_cpu_owner = None
+
+# عدد الجلسات التي تستخدم tracemalloc حالياً (يعمل مرة واحدة للبرنامج كله)
+_memory_lock = threading.Lock()
+_memory_users = 0
+_memory_started = False
+
+
+def profile_modes():
+    """أنواع القياس المفعّلة حسب WARRAQ_PROFILE (تُقرأ عند كل مهمة)"""
+    return _MODES.get(os.environ.get(PROFILE_ENV_VAR, "").strip().lower(), ())
+
+
+def current_session():
+    """جلسة التشخيص الجارية في هذا الخيط، أو None"""
+    return getattr(_local, "session", None)
+
+
+def propagate(fn):
+    """تغليف دالة خيط جديد لتُقاس ضمن جلسة الخيط الذي أنشأه (إن وجدت)"""
+    session = current_session()
+    if session is None:
+        return fn
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        _local.session = session
+        try:
+            with session.thread_profile():
+                return fn(*args, **kwargs)
+        finally:
+            _local.session = None
+    return run
+
+
+def profiled(fn):
+    """مزخرف يقيس كل استدعاء للدالة كمهمة مستقلة عند تفعيل التشخيص"""
+    name = fn.__qualname__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not profile_modes():
+            return fn(*args, **kwargs)
+        with profile_job(name):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def profile_job(name):
+    """قياس الكتلة كمهمة باسم name وكتابة ملفات التشخيص عند انتهائها
+
+    الاستدعاءات المتداخلة في نفس الخيط تُحسب ضمن الجلسة الخارجية.
+    """
+    modes = profile_modes()
+    if not modes or current_session() is not None:
+        yield current_session()
+        return
+    session = ProfileSession(name, cpu="cpu" in modes, memory="memory" in modes)
+    _local.session = session
+    session.start()
+    try:
+        with session.thread_profile():
+            yield session
+    finally:
+        _local.session = None
+        session.finish()
+
+
+def _start_tracing():
+    global _memory_users, _memory_started
+    with _memory_lock:
+        if _memory_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(PROFILE_TRACE_FRAMES)
+            _memory_started = True
+        elif _memory_users == 0:
+            tracemalloc.reset_peak()
+        _memory_users += 1
+
+
+def _stop_tracing():
+    global _memory_users, _memory_started
+    with _memory_lock:
+        _memory_users -= 1
+        if _memory_users == 0 and _memory_started:
+            tracemalloc.stop()
+            _memory_started = False
+
+
+def _enable(profile):
+    """تشغيل cProfile، أو False إذا كانت أداة قياس أخرى نشطة في العملية أو الخيط"""
+    try:
+        profile.enable()
+        return True
+    except ValueError as e:
+        logging.warning(f"تعذر تشغيل cProfile، تستمر المهمة دون قياس الوقت: {e}")
+        return False
+
+
+class ProfileSession:
+    """قياسات مهمة واحدة: ملف cProfile لكل خيط ولقطتا ذاكرة عند البداية والنهاية"""
+
+    def __init__(self, name, cpu=True, memory=True):
+        self.name = name
+        self.cpu = cpu
+        self.memory = memory
+        self.started_at = None
+        self.duration = 0.0
+        self._started = None
+        self._lock = threading.Lock()
+        # (profile, اسم الخيط, انتهى؟)
+        self._profiles = []
+        self._start_snapshot = None
+        # أسباب غياب قياس الوقت كلياً أو جزئياً، تُكتب في الملخص
+        self._notes = []
+        self._owns_cpu = False
+
+    def start(self):
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        if self.cpu and _PROCESS_WIDE_CPU:
+            self._start_process_profile()
+        if self.memory:
+            _start_tracing()
+            self._start_snapshot = tracemalloc.take_snapshot()
+
+    def _start_process_profile(self):
+        """تشغيل مقياس العملية (Python 3.12+) إذا لم تكن جلسة أخرى تملكه"""
+        global _cpu_owner
+        with _cpu_lock:
+            if _cpu_owner is not None:
+                self._notes.append(f"cpu: not profiled, job '{_cpu_owner.name}' is being profiled in this process")
+                return
+            profile = cProfile.Profile()
+            if not _enable(profile):
+                self._notes.append("cpu: not profiled, another profiling tool is active")
+                return
+            _cpu_owner = self
+            self._owns_cpu = True
+        with self._lock:
+            self._profiles.append([profile, "all threads", False])
+
+    def _stop_process_profile(self):
+        global _cpu_owner
+        if not self._owns_cpu:
+            return
+        with self._lock:
+            entry = self._profiles[0]
+        entry[0].disable()
+        entry[2] = True
+        with _cpu_lock:
+            _cpu_owner = None
+        self._owns_cpu = False
+
+    @contextmanager
+    def thread_profile(self):
+        """تشغيل cProfile للخيط الحالي طوال الكتلة (قبل Python 3.12 يقيس cProfile خيطاً واحداً فقط)
+
+        في Python 3.12+ لا تفعل شيئاً لأن مقياس العملية يشمل كل الخيوط.
+        """
+        if not self.cpu or _PROCESS_WIDE_CPU:
+            yield
+            return
+        entry = [cProfile.Profile(), threading.current_thread().name, False]
+        if not _enable(entry[0]):
+            with self._lock:
+                self._notes.append(f"cpu: thread {entry[1]} not profiled, another profiling tool is active")
+            yield
+            return
+        with self._lock:
+            self._profiles.append(entry)
+        try:
+            yield
+        finally:
+            entry[0].disable()
+            entry[2] = True
+
+    def finish(self):
+        self.duration = time.perf_counter() - self._started
+        try:
+            self._stop_process_profile()
+            self._write()
+        except Exception as e:
+            logging.warning(f"تعذر حفظ ملفات تشخيص الأداء للمهمة '{self.name}': {e}")
+        finally:
+            if self.memory:
+                _stop_tracing()
+
+    def _write(self):
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at))
+        base = PROFILE_DIR / f"{stamp}-{os.getpid()}-{next(_ids)}-{self.name.replace('.', '-')}"
+        report = io.StringIO()
+        report.write(f"job: {self.name}\nstarted: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started_at))}\n"
+                     f"duration: {self.duration:.3f}s\n")
+
+        with self._lock:
+            # الخيوط التي لم تنته بعد (مثل مرحلة لا يمكن مقاطعتها) لا تُقرأ نتائجها أثناء عملها
+            finished = [entry for entry in self._profiles if entry[2]]
+            running = [entry[1] for entry in self._profiles if not entry[2]]
+            notes = list(self._notes)
+        for note in notes:
+            report.write(f"{note}\n")
+
+        if self.cpu and finished:
+            stats = pstats.Stats(finished[0][0], stream=report)
+            for profile, _, _ in finished[1:]:
+                stats.add(profile)
+            stats.dump_stats(f"{base}.prof")
+            report.write(f"threads: {', '.join(entry[1] for entry in finished)}\n")
+            if running:
+                report.write(f"threads still running (not included): {', '.join(running)}\n")
+            report.write("\n")
+            stats.sort_stats("cumulative").print_stats(PROFILE_TOP)
+
+        if self.memory:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot.dump(f"{base}.tracemalloc")
+            report.write(f"memory: current {current / 2 ** 20:.1f} MB, peak {peak / 2 ** 20:.1f} MB\n")
+            report.write(f"\ntop {PROFILE_TOP} allocation growth since job start:\n")
+            for stat in snapshot.compare_to(self._start_snapshot, "lineno")[:PROFILE_TOP]:
+                report.write(f"{stat}\n")
+
+        with open(f"{base}.txt", "w", encoding="utf-8") as f:
+            f.write(report.getvalue())
+        logging.info(f"ملفات تشخيص الأداء للمهمة '{self.name}': {base}.*")
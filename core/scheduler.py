@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+مجدول مهام مشترك لمهام OCR وأدوات PDF
+
+- تعمل المهام على مجموعة خيوط مشتركة بعدد SCHEDULER_WORKERS.
+- لكل نوع مهمة حد أقصى للمهام المتزامنة (SCHEDULER_LIMITS)، فلا تشغل مهام OCR الطويلة
+  كل الخيوط وتبقى أدوات PDF السريعة (دمج، فصل...) قادرة على العمل في نفس الوقت.
+- تُختار المهمة التالية حسب الأولوية (الرقم الأصغر أولاً) ثم ترتيب الإضافة، مع تجاوز
+  المهام التي بلغ نوعها حده الأقصى.
+- المجدول لا يعتمد على Qt: تصل تغيرات الحالة عبر on_change (من خيوط المجدول)،
+  وتستطيع الواجهة عرض الطابور عبر snapshot().
+"""
+import time
+import logging
+import itertools
+import threading
+
+from core.config import SCHEDULER_WORKERS, SCHEDULER_LIMITS
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+FINISHED_STATES = ("done", "failed", "cancelled")
+
+
+class ScheduledJob:
+    """مهمة في المجدول
+
+    fn: الدالة التي تنفذ المهمة في خيط المجدول، وقيمتها المرجعة تُحفظ في result.
+    on_cancel: دالة تُستدعى عند إلغاء المهمة أثناء تشغيلها (مثل OCRJob.stop).
+    """
+
+    def __init__(self, job_id, kind, fn, label="", priority=PRIORITY_NORMAL, on_cancel=None):
+        self.id = job_id
+        self.kind = kind
+        self.fn = fn
+        self.label = label or kind
+        self.priority = priority
+        self.on_cancel = on_cancel
+        self.status = "queued"
+        self.result = None
+        self.error = ""
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in FINISHED_STATES
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "label": self.label,
+            "priority": self.priority,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobScheduler:
+    """تشغيل المهام على مجموعة خيوط مشتركة مع أولويات وحدود تزامن لكل نوع
+
+    limits: {نوع المهمة: أقصى عدد متزامن}، والأنواع غير المذكورة لا يحدها إلا عدد الخيوط.
+    on_change: تُستدعى بقاموس حالة المهمة (to_dict) عند كل تغير في حالتها.
+    keep_finished: عدد المهام المنتهية التي تبقى في snapshot().
+    """
+
+    def __init__(self, workers=SCHEDULER_WORKERS, limits=None, on_change=None, keep_finished=20):
+        self.workers = max(1, workers)
+        self.limits = dict(SCHEDULER_LIMITS if limits is None else limits)
+        self.on_change = on_change or (lambda job: None)
+        self.keep_finished = keep_finished
+
+        self._cond = threading.Condition()
+        # يرتب إشعارات on_change القادمة من خيوط مختلفة (RLock حتى تستطيع on_change استدعاء المجدول)
+        self._notify_lock = threading.RLock()
+        self._ids = itertools.count(1)
+        self._pending = []
+        self._running = {}
+        self._finished = []
+        self._threads = []
+        self._stopping = False
+
+    # --- التشغيل والإيقاف ---
+
+    def start(self):
+        with self._cond:
+            if self._threads:
+                return self
+            self._stopping = False
+            self._threads = [threading.Thread(target=self._run_worker, name=f"scheduler-worker-{i + 1}", daemon=True)
+                             for i in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def shutdown(self, wait=True, timeout=None):
+        """إلغاء المهام المنتظرة وإيقاف الجارية ثم إنهاء الخيوط
+
+        timeout: أقصى مدة إجمالية لانتظار الخيوط (بالثواني)، والافتراضي الانتظار حتى انتهائها.
+        """
+        with self._cond:
+            self._stopping = True
+            pending, self._pending = self._pending, []
+            running = list(self._running.values())
+            self._cond.notify_all()
+        for job in pending:
+            self._finish(job, "cancelled")
+        for job in running:
+            self._cancel_running(job)
+        if wait:
+            deadline = time.monotonic() + timeout if timeout is not None else None
+            for thread in self._threads:
+                thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        self._threads = []
+
+    # --- المهام ---
+
+    def submit(self, kind, fn, label="", priority=PRIORITY_NORMAL, on_cancel=None):
+        """إضافة مهمة إلى الطابور وإرجاعها (ScheduledJob)"""
+        with self._cond:
+            if self._stopping:
+                raise RuntimeError("المجدول متوقف")
+            job = ScheduledJob(next(self._ids), kind, fn, label, priority, on_cancel)
+            self._pending.append(job)
+            self._cond.notify_all()
+        self._notify(job)
+        return job
+
+    def cancel(self, job_id):
+        """إلغاء مهمة منتظرة أو إيقاف مهمة جارية
+
+        ترجع False إذا لم تكن المهمة موجودة أو انتهت، أو كانت جارية ولا تدعم الإيقاف (دون on_cancel).
+        """
+        with self._cond:
+            job = next((j for j in self._pending if j.id == job_id), None)
+            # يُحدد المسار تحت القفل: بعد تحريره قد ينهي الخيط المهمة الجارية ويغير حالتها
+            running = job is None
+            if not running:
+                self._pending.remove(job)
+            else:
+                job = self._running.get(job_id)
+                if job is None or job.on_cancel is None:
+                    return False
+                job.status = "cancelling"
+        if running:
+            # قد تنتهي المهمة قبل الوصول إلى هنا، فلا يُرسل "cancelling" بعد حالتها النهائية
+            self._notify(job, unless_finished=True)
+            self._cancel_running(job)
+        else:
+            self._finish(job, "cancelled")
+        return True
+
+    def get(self, job_id):
+        with self._cond:
+            for job in itertools.chain(self._running.values(), self._pending, self._finished):
+                if job.id == job_id:
+                    return job
+        return None
+
+    def running(self, kind=None):
+        with self._cond:
+            return [job for job in self._running.values() if kind is None or job.kind == kind]
+
+    def snapshot(self):
+        """قائمة المهام للعرض: الجارية ثم المنتظرة بترتيب تنفيذها ثم المنتهية (الأحدث أولاً)"""
+        with self._cond:
+            jobs = list(self._running.values()) + sorted(self._pending, key=self._order) + self._finished[::-1]
+            return [job.to_dict() for job in jobs]
+
+    def is_busy(self):
+        with self._cond:
+            return bool(self._pending or self._running)
+
+    # --- التنفيذ ---
+
+    @staticmethod
+    def _order(job):
+        return job.priority, job.id
+
+    def _next_job(self):
+        """أعلى مهمة أولوية لم يبلغ نوعها حده الأقصى (يُستدعى مع القفل)"""
+        counts = {}
+        for job in self._running.values():
+            counts[job.kind] = counts.get(job.kind, 0) + 1
+        for job in sorted(self._pending, key=self._order):
+            limit = self.limits.get(job.kind)
+            if limit is None or counts.get(job.kind, 0) < limit:
+                return job
+        return None
+
+    def _run_worker(self):
+        while True:
+            with self._cond:
+                job = None
+                while not self._stopping:
+                    job = self._next_job()
+                    if job is not None:
+                        break
+                    self._cond.wait()
+                if job is None:
+                    return
+                self._pending.remove(job)
+                self._running[job.id] = job
+                job.status = "running"
+                job.started_at = time.time()
+            self._notify(job)
+
+            status = "done"
+            try:
+                job.result = job.fn()
+            except Exception as e:
+                logging.error(f"خطأ في مهمة المجدول '{job.label}': {e}")
+                job.error = str(e)
+                status = "failed"
+
+            with self._cond:
+                self._running.pop(job.id, None)
+                if job.status == "cancelling":
+                    status = "cancelled"
+                # انتهاء مهمة يحرر مكاناً لنوعها، فقد تصبح مهمة منتظرة قابلة للتشغيل
+                self._cond.notify_all()
+            self._finish(job, status)
+
+    def _cancel_running(self, job):
+        if job.on_cancel is None:
+            return
+        try:
+            job.on_cancel()
+        except Exception as e:
+            logging.warning(f"تعذر إيقاف مهمة المجدول '{job.label}': {e}")
+
+    def _finish(self, job, status):
+        # الحالة النهائية تتغير تحت قفل الإشعارات، فلا يرسل إشعار آخر جارٍ حالة نصف منتهية
+        with self._notify_lock:
+            job.status = status
+            job.finished_at = time.time()
+            with self._cond:
+                self._finished.append(job)
+                del self._finished[:-self.keep_finished or None]
+            self._notify(job)
+
+    def _notify(self, job, unless_finished=False):
+        with self._notify_lock:
+            if unless_finished and job.finished:
+                return
+            try:
+                self.on_change(job.to_dict())
+            except Exception as e:
+                logging.warning(f"خطأ في متابعة حالة مهمة المجدول: {e}")
@@ -0,0 +1,687 @@
+# -*- coding: utf-8 -*-
+"""
+خدمة HTTP محلية لمهام OCR وأدوات PDF (لاستخدامها من الأدوات الداخلية الأخرى دون الواجهة الرسومية)
+
+تعمل على 127.0.0.1 افتراضياً وتستخدم مكتبة بايثون القياسية فقط، ويمكن تجربتها بـ curl:
+
+    curl -F file=@scan.pdf "http://127.0.0.1:8765/jobs?kind=ocr&lang=ara"
+    curl --data-binary @a.pdf "http://127.0.0.1:8765/jobs?kind=compress-pdf&filename=a.pdf"
+    curl -N http://127.0.0.1:8765/jobs/<id>/events
+    curl -o result.txt http://127.0.0.1:8765/jobs/<id>/result
+
+المسارات:
+    POST   /jobs?kind=<نوع>&...     رفع الملفات (multipart/form-data أو محتوى الملف مباشرة مع filename)
+                                    وإرجاع رقم المهمة (202)، أو 503 إذا كان الطابور ممتلئاً.
+                                    يُكتب الطلب إلى مجلد المهمة على دفعات دون تحميله كاملاً في الذاكرة
+    GET    /jobs                    قائمة المهام
+    GET    /jobs/<id>               حالة المهمة وملخصها
+    GET    /jobs/<id>/events        أحداث المهمة (التقدم صفحةً بصفحة) كتدفق NDJSON حتى انتهائها؛
+                                    أحداث صفحات OCR تحمل اسم ملف النتيجة وموضع الصفحة فيه بالأحرف
+                                    (offset و length) وليس نصها
+    GET    /jobs/<id>/result        ملف النتيجة، أو ملف ZIP إذا كانت النتائج أكثر من ملف
+    DELETE /jobs/<id>               إيقاف المهمة أو حذفها مع ملفاتها (409 لأدوات PDF أثناء تنفيذها)
+    GET    /health                  عدادات الخدمة
+
+الأنواع: ocr و merge و images-to-pdf وعمليات الملف الواحد في core.cli.PER_FILE_OPERATIONS.
+معاملات إضافية في الاستعلام أو حقول النموذج: lang و dpi و first_page و last_page و workers
+و preprocess و text_layer و skip_blank و cache (لـ OCR)، و pages و quality لأدوات PDF.
+كلمة مرور PDF تُرسل كحقل نموذج password أو في الترويسة X-Warraq-Password فقط، ويُرفض الطلب بـ 400
+إذا وردت في الاستعلام حتى لا تظهر في الروابط والسجلات.
+القيم الرقمية غير الصالحة أو خارج حدودها تُرفض عند الرفع بـ 400.
+"""
+import re
+import json
+import time
+import uuid
+import queue
+import shutil
+import tempfile
+import logging
+import zipfile
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from urllib.parse import urlparse, parse_qs, quote
+from email.parser import BytesHeaderParser
+from email.policy import HTTP as HTTP_POLICY
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from core.config import (
+    VERSION, SERVER_HOST, SERVER_PORT, SERVER_QUEUE_SIZE, SERVER_MAX_UPLOAD_BYTES, SERVER_UPLOAD_CHUNK_SIZE,
+    SERVER_KEEP_JOBS, SERVER_JOBS_DIR
+)
+from core.cli import PER_FILE_OPERATIONS, COMBINE_OPERATIONS, run_operation
+
+JOB_KINDS = ("ocr",) + tuple(COMBINE_OPERATIONS) + tuple(PER_FILE_OPERATIONS)
+
+# أسماء ملفات النتائج لعمليات الدمج
+_COMBINE_OUTPUT_NAMES = {"merge": "merged.pdf", "images-to-pdf": "images.pdf"}
+
+# أقصى حجم لترويسات جزء multipart ولقيمة حقل نموذج (الحقول نصوص قصيرة تُحفظ في الذاكرة)
+_MAX_PART_HEADERS = 16 * 1024
+_MAX_FIELD_BYTES = 64 * 1024
+
+# المعاملات الرقمية وحدودها (نفس حدود حقول الواجهة الرسومية)
+_INT_PARAMS = {"dpi": (100, 600), "first_page": (1, 9999), "last_page": (1, 9999), "workers": (1, 64),
+               "quality": (1, 100)}
+
+# كلمة مرور PDF لا تُقبل في الاستعلام، بل كحقل نموذج أو في هذه الترويسة
+PASSWORD_HEADER = "X-Warraq-Password"
+
+# قيم الاستعلام في سطر الطلب تُحجب قبل كتابته في السجل
+_QUERY_VALUE_RE = re.compile(r"(?<=[?&])([^=&\s\"]+)=[^&\s\"]*")
+
+
+class ServerJob:
+    """مهمة واحدة في الخدمة مع سجل أحداثها"""
+
+    def __init__(self, kind, params, directory):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.params = params
+        self.directory = Path(directory) / self.id
+        self.input_dir = self.directory / "input"
+        self.output_dir = self.directory / "output"
+        self.inputs = []
+        self.outputs = []
+        self.status = "queued"
+        self.message = ""
+        self.result = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.runner = None
+        self.errors = []
+        self.events = []
+        self._changed = threading.Condition()
+
+    @property
+    def is_finished(self):
+        return self.status in ("done", "failed", "cancelled")
+
+    def add_event(self, kind, **data):
+        with self._changed:
+            self.events.append({"seq": len(self.events), "type": kind, "time": round(time.time(), 3), **data})
+            self._changed.notify_all()
+
+    def set_status(self, status, message=""):
+        self.status = status
+        self.message = message
+        if status == "running":
+            self.started = time.time()
+        elif self.is_finished:
+            self.finished = time.time()
+        self.add_event("status", status=status, message=message)
+
+    def wait_events(self, start, timeout=15.0):
+        """أحداث جديدة بعد الرقم start (ينتظر حتى timeout ثانية إذا لم تصل أحداث)"""
+        with self._changed:
+            if len(self.events) <= start and not self.is_finished:
+                self._changed.wait(timeout)
+            return self.events[start:]
+
+    def to_dict(self):
+        return {
+            "id": self.id, "kind": self.kind, "status": self.status, "message": self.message,
+            "inputs": [p.name for p in self.inputs], "outputs": [p.name for p in self.outputs],
+            "created": self.created, "started": self.started, "finished": self.finished,
+            "events": len(self.events), "result": self.result,
+        }
+
+
+class JobManager:
+    """طابور مهام محدود الحجم مع عدد ثابت من خيوط التنفيذ"""
+
+    def __init__(self, jobs_dir=SERVER_JOBS_DIR, workers=1, queue_size=SERVER_QUEUE_SIZE,
+                 keep_jobs=SERVER_KEEP_JOBS, ocr_workers=1):
+        self.jobs_dir = Path(jobs_dir)
+        self.keep_jobs = keep_jobs
+        self.ocr_workers = ocr_workers
+        self.jobs = {}
+        self.counters = {"submitted": 0, "rejected": 0, "done": 0, "failed": 0, "cancelled": 0}
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = [threading.Thread(target=self._run_worker, name=f"server-worker-{i + 1}", daemon=True)
+                         for i in range(max(1, workers))]
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def shutdown(self):
+        self._stop.set()
+        with self._lock:
+            running = [job for job in self.jobs.values() if job.runner is not None]
+        for job in running:
+            job.runner.stop()
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+    def create(self, kind, params):
+        return ServerJob(kind, params, self.jobs_dir)
+
+    def submit(self, job):
+        """إضافة المهمة إلى الطابور، أو إرجاع False إذا كان ممتلئاً"""
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self.counters["rejected"] += 1
+            shutil.rmtree(job.directory, ignore_errors=True)
+            return False
+        with self._lock:
+            self.jobs[job.id] = job
+            self.counters["submitted"] += 1
+        job.add_event("status", status="queued", message="")
+        self._evict_finished()
+        return True
+
+    def get(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def list(self):
+        with self._lock:
+            return [job.to_dict() for job in self.jobs.values()]
+
+    def cancel_or_delete(self, job):
+        """إيقاف مهمة قيد الانتظار أو التنفيذ، أو حذف مهمة منتهية مع ملفاتها
+
+        تعيد "cancelled" أو "deleted"، أو "not_cancellable" لمهمة أدوات PDF قيد التنفيذ
+        (تعمل دون أداة إيقاف فتكمل حتى نهايتها).
+        """
+        with self._lock:
+            if job.is_finished:
+                self.jobs.pop(job.id, None)
+            elif job.status == "running" and job.runner is None:
+                return "not_cancellable"
+            else:
+                if job.runner is not None:
+                    job.runner.stop()
+                job.set_status("cancelled", "تم إلغاء المهمة")
+                self.counters["cancelled"] += 1
+                return "cancelled"
+        shutil.rmtree(job.directory, ignore_errors=True)
+        return "deleted"
+
+    def health(self):
+        with self._lock:
+            active = sum(1 for job in self.jobs.values() if job.status == "running")
+            counters = dict(self.counters)
+        return {"version": VERSION, "queued": self._queue.qsize(), "queue_size": self._queue.maxsize,
+                "running": active, "workers": len(self._threads), **counters}
+
+    def _evict_finished(self):
+        """حذف أقدم المهام المنتهية مع ملفاتها عند تجاوز SERVER_KEEP_JOBS"""
+        with self._lock:
+            finished = sorted((job for job in self.jobs.values() if job.is_finished), key=lambda job: job.finished)
+            expired = finished[:max(0, len(finished) - self.keep_jobs)]
+            for job in expired:
+                del self.jobs[job.id]
+        for job in expired:
+            shutil.rmtree(job.directory, ignore_errors=True)
+
+    def _run_worker(self):
+        while not self._stop.is_set():
+            try:
+                job = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            # أداة الإيقاف تُنشأ قبل حالة "running" وتحت نفس القفل، فلا يجد الإلغاء مهمة OCR جارية بدونها
+            with self._lock:
+                if job.status == "cancelled":
+                    continue
+                if job.kind == "ocr":
+                    job.runner = self._create_ocr_runner(job)
+                job.set_status("running")
+            try:
+                success, message = self._execute(job)
+            except Exception as e:
+                logging.error(f"خطأ غير متوقع في مهمة {job.id}: {e}")
+                success, message = False, str(e)
+            with self._lock:
+                job.runner = None
+                if job.status != "cancelled":
+                    status = "done" if success else "failed"
+                    job.set_status(status, message)
+                    self.counters[status] += 1
+            self._evict_finished()
+
+    def _execute(self, job):
+        job.output_dir.mkdir(parents=True, exist_ok=True)
+        if job.kind == "ocr":
+            return self._execute_ocr(job)
+
+        params = job.params
+        if job.kind in COMBINE_OPERATIONS:
+            name = COMBINE_OPERATIONS[job.kind][0]
+            output = job.output_dir / _COMBINE_OUTPUT_NAMES[job.kind]
+            success, message = run_operation(name, ([str(p) for p in job.inputs], str(output)))
+        else:
+            name, _, build_args = PER_FILE_OPERATIONS[job.kind]
+            opts = SimpleNamespace(output_dir=str(job.output_dir), pages=params.get("pages", ""),
+                                   password=params.get("password", ""), quality=params.get("quality", 70))
+            success, messages = True, []
+            for path in job.inputs:
+                ok, msg = run_operation(name, build_args(str(path), opts))
+                job.add_event("file", input=path.name, ok=ok, message=msg)
+                success = success and ok
+                messages.append(msg)
+            message = "\n".join(messages)
+        job.outputs = sorted(p for p in job.output_dir.iterdir() if p.is_file())
+        job.result = {"outputs": [p.name for p in job.outputs]}
+        return success, message
+
+    def _create_ocr_runner(self, job):
+        from core.ocr_job import OCRJob
+
+        # الموضع التالي في ملف نتيجة كل ملف مدخل، بالأحرف (مطابق لما يكتبه OCROutputWriter)
+        offsets = {}
+
+        def on_error(message):
+            job.errors.append(message)
+            job.add_event("error", message=message)
+
+        def on_progress(data):
+            index = data["file_index"]
+            block = data["text_preview"] if index in offsets else data["text_preview"].lstrip()
+            offset = offsets.get(index, 0)
+            offsets[index] = offset + len(block)
+            job.add_event("progress", page=data["page"], total=data["total"], elapsed=data["elapsed"],
+                          source=data["source"], file=f"{job.inputs[index].stem}_ocr.txt",
+                          offset=offset, length=len(block.rstrip()))
+
+        return OCRJob(on_progress=on_progress, on_error=on_error,
+                      on_log=lambda message: job.add_event("log", message=message))
+
+    def _execute_ocr(self, job):
+        params = job.params
+        errors = job.errors
+        result = job.runner.run(
+            [str(p) for p in job.inputs],
+            lang=params.get("lang", "ara+eng"),
+            dpi=params.get("dpi", 300),
+            start_page=params.get("first_page", 1),
+            end_page=params.get("last_page"),
+            preprocess=_flag(params.get("preprocess"), True),
+            workers=params.get("workers", self.ocr_workers),
+            use_text_layer=_flag(params.get("text_layer"), True),
+            skip_blank=_flag(params.get("skip_blank"), True),
+            use_cache=_flag(params.get("cache"), True),
+            resume=False, per_file_output=True
+        )
+        if result is None:
+            return False, errors[-1] if errors else "تم إيقاف المهمة"
+
+        for path in result["text_paths"]:
+            target = job.output_dir / Path(path).name
+            shutil.move(path, target)
+            job.outputs.append(target)
+        result["text_paths"] = [p.name for p in job.outputs]
+        result.pop("text_path", None)
+        job.result = result
+        return not errors, "\n".join(errors) or f"تم تحويل {result['total_pages']} صفحة"
+
+
+def _flag(value, default):
+    if value is None or value == "":
+        return default
+    return str(value).lower() not in ("0", "false", "no", "off")
+
+
+def _parse_int(name, value, minimum=0, maximum=None):
+    """تحويل معامل رقمي من الطلب، أو ValueError برسالة تُعاد للعميل"""
+    try:
+        number = int(str(value).strip())
+    except ValueError:
+        raise ValueError(f"قيمة غير صالحة للمعامل {name}: {value}") from None
+    if number < minimum or (maximum is not None and number > maximum):
+        limits = f"بين {minimum} و {maximum}" if maximum is not None else f"{minimum} أو أكثر"
+        raise ValueError(f"قيمة المعامل {name} يجب أن تكون {limits}")
+    return number
+
+
+def _validate_params(params):
+    """التحقق من المعاملات الرقمية عند استلام الطلب وتحويلها إلى أعداد (بدلاً من الفشل أثناء التنفيذ)"""
+    for name, (minimum, maximum) in _INT_PARAMS.items():
+        if params.get(name) not in (None, ""):
+            params[name] = _parse_int(name, params[name], minimum, maximum)
+        else:
+            params.pop(name, None)
+    if params.get("last_page") and params["last_page"] < params.get("first_page", 1):
+        raise ValueError("last_page يجب ألا تكون قبل first_page")
+
+
+class _BodyReader:
+    """قراءة جسم الطلب على دفعات دون تجاوز Content-Length"""
+
+    def __init__(self, rfile, length):
+        self.rfile = rfile
+        self.remaining = length
+
+    def read(self, size=SERVER_UPLOAD_CHUNK_SIZE):
+        if self.remaining <= 0:
+            return b""
+        data = self.rfile.read(min(size, self.remaining))
+        if not data:
+            raise ValueError("انقطع الاتصال قبل اكتمال الطلب")
+        self.remaining -= len(data)
+        return data
+
+
+def _copy_until(reader, buffer, marker, write):
+    """تمرير البيانات إلى write حتى العلامة marker وإرجاع ما بعدها من المخزن
+
+    يبقى في الذاكرة دفعة واحدة على الأكثر مهما كان حجم الجزء.
+    """
+    keep = len(marker) - 1
+    while True:
+        index = buffer.find(marker)
+        if index >= 0:
+            write(buffer[:index])
+            return buffer[index + len(marker):]
+        if len(buffer) > keep:
+            write(buffer[:-keep])
+            buffer = buffer[-keep:]
+        chunk = reader.read()
+        if not chunk:
+            raise ValueError("محتوى multipart غير صالح")
+        buffer += chunk
+
+
+def _limited(target, limit, message):
+    """دالة كتابة إلى bytearray ترفض تجاوز limit بايت"""
+    def write(data):
+        if len(target) + len(data) > limit:
+            raise ValueError(message)
+        target.extend(data)
+    return write
+
+
+def _read_multipart(reader, boundary, job):
+    """قراءة multipart/form-data كتدفق: الملفات تُكتب مباشرة إلى مجلد المهمة والحقول تُعاد كقاموس
+
+    البادئة في أسماء الملفات تحافظ على ترتيبها وتمنع تصادم الأسماء المتكررة.
+    """
+    fields = {}
+    buffer = _copy_until(reader, b"", b"--" + boundary, lambda data: None)
+    while True:
+        while len(buffer) < 2:
+            chunk = reader.read()
+            if not chunk:
+                raise ValueError("محتوى multipart غير صالح")
+            buffer += chunk
+        if buffer.startswith(b"--"):
+            # نهاية النموذج: تُهمل أي بيانات بعدها
+            while reader.read():
+                pass
+            return fields
+        if not buffer.startswith(b"\r\n"):
+            raise ValueError("محتوى multipart غير صالح")
+
+        raw_headers = bytearray()
+        buffer = _copy_until(reader, buffer[2:], b"\r\n\r\n",
+                             _limited(raw_headers, _MAX_PART_HEADERS, "ترويسات جزء multipart طويلة جداً"))
+        part = BytesHeaderParser(policy=HTTP_POLICY).parsebytes(bytes(raw_headers) + b"\r\n\r\n")
+        delimiter = b"\r\n--" + boundary
+        filename = part.get_filename()
+        if filename:
+            name = _safe_filename(filename)
+            if not name:
+                raise ValueError(f"اسم ملف غير صالح: {filename}")
+            path = job.input_dir / f"{len(job.inputs) + 1:03d}_{name}"
+            job.inputs.append(path)
+            with open(path, "wb") as f:
+                buffer = _copy_until(reader, buffer, delimiter, f.write)
+        else:
+            value = bytearray()
+            field = part.get_param("name", header="content-disposition")
+            buffer = _copy_until(reader, buffer, delimiter,
+                                 _limited(value, _MAX_FIELD_BYTES, f"قيمة الحقل {field} طويلة جداً"))
+            if field:
+                fields[field] = value.decode("utf-8", errors="replace")
+
+
+def _attachment(name):
+    """ترويسة Content-Disposition تدعم الأسماء العربية (RFC 6266) مع اسم ASCII بديل"""
+    fallback = name.encode("ascii", "replace").decode("ascii").replace('"', "_")
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(name)}"
+
+
+def _safe_filename(name):
+    """اسم ملف بدون مسار (حتى لا يكتب الطلب خارج مجلد المهمة)"""
+    name = Path(str(name).replace("\\", "/")).name
+    return name if name not in ("", ".", "..") else ""
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    server_version = f"Warraq/{VERSION}"
+    manager = None
+
+    # --- مساعدات الاستجابة ---
+
+    def log_message(self, format, *args):
+        message = _QUERY_VALUE_RE.sub(r"\1=***", format % args)
+        logging.info(f"HTTP {self.address_string()} {message}")
+
+    def _send_json(self, status, data, headers=None):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message, headers=None):
+        self._send_json(status, {"error": message}, headers)
+
+    def _route(self):
+        parsed = urlparse(self.path)
+        parts = [p for p in parsed.path.split("/") if p]
+        params = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        return parts, params
+
+    def _job_or_404(self, job_id):
+        job = self.manager.get(job_id)
+        if job is None:
+            self._error(404, "المهمة غير موجودة")
+        return job
+
+    # --- المسارات ---
+
+    def do_GET(self):
+        parts, params = self._route()
+        if parts == ["health"]:
+            return self._send_json(200, self.manager.health())
+        if parts == ["jobs"]:
+            return self._send_json(200, {"jobs": self.manager.list()})
+        if len(parts) >= 2 and parts[0] == "jobs":
+            job = self._job_or_404(parts[1])
+            if job is None:
+                return
+            if len(parts) == 2:
+                return self._send_json(200, job.to_dict())
+            if parts[2:] == ["events"]:
+                try:
+                    since = _parse_int("since", params.get("since", 0))
+                except ValueError as e:
+                    return self._error(400, str(e))
+                return self._stream_events(job, since)
+            if parts[2:] == ["result"]:
+                return self._send_result(job)
+        self._error(404, "المسار غير موجود")
+
+    def do_POST(self):
+        parts, params = self._route()
+        if parts != ["jobs"]:
+            return self._error(404, "المسار غير موجود")
+
+        try:
+            length = _parse_int("Content-Length", self.headers.get("Content-Length") or 0)
+        except ValueError as e:
+            return self._error(400, str(e))
+        if length <= 0:
+            return self._error(411, "يجب تحديد Content-Length وإرسال ملف واحد على الأقل")
+        if length > SERVER_MAX_UPLOAD_BYTES:
+            return self._error(413, f"الحد الأقصى لحجم الطلب {SERVER_MAX_UPLOAD_BYTES} بايت")
+        if params.get("kind") and params["kind"] not in JOB_KINDS:
+            # رفض النوع الخاطئ في الاستعلام قبل استلام الملفات
+            self.close_connection = True
+            return self._error(400, f"نوع مهمة غير معروف: {params['kind']} (المتاح: {', '.join(JOB_KINDS)})")
+        if "password" in params:
+            self.close_connection = True
+            return self._error(400, f"لا تُرسل كلمة المرور في الاستعلام، استخدم حقل النموذج password "
+                                    f"أو الترويسة {PASSWORD_HEADER}")
+
+        job = self.manager.create(None, params)
+        try:
+            fields = self._receive_upload(job, _BodyReader(self.rfile, length), params)
+            params.update(fields)
+            if self.headers.get(PASSWORD_HEADER) is not None:
+                params["password"] = self.headers[PASSWORD_HEADER]
+            _validate_params(params)
+            job.kind = params.get("kind", "")
+            if job.kind not in JOB_KINDS:
+                raise ValueError(f"نوع مهمة غير معروف: {job.kind} (المتاح: {', '.join(JOB_KINDS)})")
+            if not job.inputs:
+                raise ValueError("لم يتم إرسال أي ملف")
+        except (ValueError, OSError) as e:
+            shutil.rmtree(job.directory, ignore_errors=True)
+            # قد يبقى جزء من الطلب دون قراءة
+            self.close_connection = True
+            if isinstance(e, OSError):
+                logging.error(f"تعذر حفظ الملفات المرفوعة: {e}")
+                return self._error(500, "تعذر حفظ الملفات المرفوعة")
+            return self._error(400, str(e))
+
+        if not self.manager.submit(job):
+            return self._error(503, "طابور المهام ممتلئ، حاول لاحقاً", {"Retry-After": "30"})
+        self._send_json(202, {
+            "id": job.id, "status": job.status,
+            "links": {key: f"/jobs/{job.id}{suffix}" for key, suffix in
+                      (("self", ""), ("events", "/events"), ("result", "/result"))}
+        }, {"Location": f"/jobs/{job.id}"})
+
+    def do_DELETE(self):
+        parts, _ = self._route()
+        if len(parts) != 2 or parts[0] != "jobs":
+            return self._error(404, "المسار غير موجود")
+        job = self._job_or_404(parts[1])
+        if job is None:
+            return
+        status = self.manager.cancel_or_delete(job)
+        if status == "not_cancellable":
+            return self._error(409, "لا يمكن إيقاف هذه المهمة أثناء تنفيذها، انتظر انتهاءها ثم احذفها")
+        self._send_json(200, {"id": job.id, "status": status})
+
+    # --- التنفيذ ---
+
+    def _receive_upload(self, job, reader, params):
+        """كتابة الملفات المرفوعة إلى مجلد مدخلات المهمة وإرجاع حقول النموذج {الحقل: القيمة}"""
+        job.input_dir.mkdir(parents=True, exist_ok=True)
+        content_type = self.headers.get("Content-Type", "")
+        if not content_type.startswith("multipart/form-data"):
+            name = _safe_filename(params.get("filename", ""))
+            if not name:
+                raise ValueError("عند إرسال محتوى الملف مباشرة يجب تحديد filename في الاستعلام")
+            path = job.input_dir / name
+            with open(path, "wb") as f:
+                for chunk in iter(reader.read, b""):
+                    f.write(chunk)
+            job.inputs.append(path)
+            return {}
+
+        boundary = BytesHeaderParser(policy=HTTP_POLICY).parsebytes(
+            b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n").get_boundary()
+        if not boundary:
+            raise ValueError("محتوى multipart غير صالح")
+        fields = _read_multipart(reader, boundary.encode("latin-1"), job)
+        if len(job.inputs) == 1:
+            # البادئة تلزم فقط عند رفع أكثر من ملف
+            path = job.inputs[0]
+            job.inputs[0] = path.rename(path.with_name(path.name.split("_", 1)[1]))
+        return fields
+
+    def _stream_events(self, job, since):
+        """إرسال الأحداث كسطور JSON فور حدوثها حتى انتهاء المهمة"""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        position = since
+        try:
+            while True:
+                events = job.wait_events(position)
+                for event in events:
+                    self.wfile.write(json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\n")
+                position += len(events)
+                self.wfile.flush()
+                if job.is_finished and position >= len(job.events):
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            # أغلق العميل الاتصال
+            return
+
+    def _send_result(self, job):
+        if not job.is_finished:
+            return self._error(409, "المهمة لم تنته بعد", {"Retry-After": "5"})
+        outputs = [p for p in job.outputs if p.exists()]
+        if not outputs:
+            return self._error(404, "لا توجد نتائج لهذه المهمة")
+
+        if len(outputs) == 1:
+            path = outputs[0]
+            content_type = "text/plain; charset=utf-8" if path.suffix == ".txt" else "application/octet-stream"
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(path.stat().st_size))
+            self.send_header("Content-Disposition", _attachment(path.name))
+            self.end_headers()
+            with open(path, "rb") as f:
+                shutil.copyfileobj(f, self.wfile)
+            return
+
+        # الأرشيف يُبنى في ملف مؤقت داخل مجلد المهمة (يُحذف عند إغلاقه) ثم يُرسل على دفعات
+        with tempfile.TemporaryFile(dir=job.directory) as buffer:
+            with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+                for path in outputs:
+                    archive.write(path, path.name)
+            size = buffer.tell()
+            buffer.seek(0)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/zip")
+            self.send_header("Content-Length", str(size))
+            self.send_header("Content-Disposition", _attachment(f"{job.id}.zip"))
+            self.end_headers()
+            shutil.copyfileobj(buffer, self.wfile)
+
+
+def create_server(host=SERVER_HOST, port=SERVER_PORT, manager=None):
+    """إنشاء خادم HTTP مرتبط بمدير مهام (port=0 لاختيار منفذ متاح)"""
+    handler = type("WarraqRequestHandler", (RequestHandler,), {"manager": manager or JobManager().start()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(host=SERVER_HOST, port=SERVER_PORT, workers=1, queue_size=SERVER_QUEUE_SIZE, ocr_workers=1, on_log=None):
+    """تشغيل الخدمة حتى Ctrl+C"""
+    manager = JobManager(workers=workers, queue_size=queue_size, ocr_workers=ocr_workers).start()
+    server = create_server(host, port, manager)
+    if on_log:
+        on_log(f"خدمة وراق تعمل على http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        manager.shutdown()
+    return manager.health()
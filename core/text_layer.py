@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+استخراج طبقة النص المضمّنة في صفحات PDF (الملفات الرقمية غير الممسوحة)
+
+يتم استخدام pdftotext من Poppler المرفق (يحافظ على ترتيب النص العربي) مع الرجوع
+إلى pypdf عند عدم توفره، ثم تقرر is_usable_text_layer إن كان النص صالحاً لتجاوز OCR.
+"""
+import os
+import shutil
+import logging
+import subprocess
+from pathlib import Path
+
+from pypdf import PdfReader
+
+from core.cancellation import JobCancelled, run_process
+
+# أقل عدد من الحروف والأرقام لاعتبار طبقة النص مفيدة (أقل من ذلك غالباً رقم صفحة أو ترويسة)
+MIN_TEXT_CHARS = 20
+# أقل نسبة للحروف والأرقام من الرموز غير الفارغة
+MIN_ALNUM_RATIO = 0.6
+# أعلى نسبة مسموحة لرموز الاستبدال الناتجة عن خطوط بلا جدول Unicode
+MAX_GARBAGE_RATIO = 0.02
+
+_PDFTOTEXT_TIMEOUT = 60
+
+
+def is_usable_text_layer(text):
+    """هل نص الطبقة المضمّنة كافٍ وسليم بحيث يغني عن OCR؟"""
+    if not text:
+        return False
+    chars = [c for c in text if not c.isspace()]
+    alnum = sum(1 for c in chars if c.isalnum())
+    if alnum < MIN_TEXT_CHARS:
+        return False
+    garbage = sum(1 for c in chars if c == "�" or ord(c) < 32) + text.count("(cid:") * 5
+    return alnum / len(chars) >= MIN_ALNUM_RATIO and garbage / len(chars) <= MAX_GARBAGE_RATIO
+
+
+class TextLayerReader:
+    """قراءة نص صفحات ملف PDF واحد على دفعات"""
+
+    def __init__(self, path, poppler_path=None, cancel_event=None):
+        self.path = Path(path)
+        self.cancel_event = cancel_event
+        self._pdftotext = self._find_pdftotext(poppler_path)
+        self._reader = None
+
+    @staticmethod
+    def _find_pdftotext(poppler_path):
+        if poppler_path:
+            for name in ("pdftotext.exe", "pdftotext"):
+                candidate = Path(poppler_path) / name
+                if candidate.exists():
+                    return str(candidate)
+        return shutil.which("pdftotext")
+
+    def extract(self, first_page, last_page):
+        """إرجاع قائمة بنصوص الصفحات من first_page إلى last_page (ترقيم يبدأ من 1)"""
+        count = last_page - first_page + 1
+        if self._pdftotext:
+            try:
+                return self._extract_pdftotext(first_page, last_page, count)
+            except JobCancelled:
+                raise
+            except Exception as e:
+                logging.warning(f"فشل pdftotext، سيتم استخدام pypdf: {self.path.name} - {e}")
+                self._pdftotext = None
+        return self._extract_pypdf(first_page, last_page)
+
+    def _extract_pdftotext(self, first_page, last_page, count):
+        kwargs = {}
+        if os.name == "nt":
+            kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
+        args = [self._pdftotext, "-f", str(first_page), "-l", str(last_page), "-enc", "UTF-8", str(self.path), "-"]
+        returncode, stdout, stderr = run_process(
+            args, self.cancel_event, timeout=_PDFTOTEXT_TIMEOUT,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, **kwargs
+        )
+        if returncode:
+            raise subprocess.CalledProcessError(returncode, args, stdout, stderr)
+        # يفصل pdftotext بين الصفحات بالرمز \f
+        pages = stdout.decode("utf-8", errors="replace").split("\f")
+        pages = (pages + [""] * count)[:count]
+        return pages
+
+    def _extract_pypdf(self, first_page, last_page):
+        if self._reader is None:
+            self._reader = PdfReader(str(self.path))
+        texts = []
+        for index in range(first_page - 1, last_page):
+            try:
+                texts.append(self._reader.pages[index].extract_text() or "")
+            except Exception as e:
+                logging.warning(f"تعذر استخراج نص الصفحة {index + 1} من {self.path.name}: {e}")
+                texts.append("")
+        return texts
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+مراقبة مجلدات الإدخال وتشغيل OCR تلقائياً على الملفات الجديدة (وضع الخدمة المستمرة)
+
+- يتم فحص المجلدات كل WATCH_POLL_INTERVAL ثانية (فحص دوري يعمل على أقراص الشبكة المشتركة
+  التي لا تدعم إشعارات نظام الملفات).
+- لا يُعتبر الملف جاهزاً إلا إذا بقي حجمه ووقت تعديله ثابتين مدة WATCH_SETTLE_SECONDS
+  وأمكن فتحه للقراءة، حتى لا تتم معالجة ملف ما زال الماسح الضوئي يكتبه.
+- تدخل الملفات الجاهزة طابوراً يعالجه عدد محدد من الخيوط، كل خيط يشغل مهمة OCRJob لملف واحد.
+- بعد المعالجة يُنقل الملف الأصلي وملف النص إلى مجلد done، أو إلى مجلد failed مع ملف
+  يوضح الأخطاء.
+- العدادات (الطابور، الملفات قيد المعالجة، المكتملة، الفاشلة، الصفحات، سرعة المعالجة)
+  متاحة عبر status() وتُكتب دورياً إلى ملف JSON.
+"""
+import os
+import json
+import time
+import queue
+import shutil
+import logging
+import threading
+from pathlib import Path
+
+from core.config import WATCH_POLL_INTERVAL, WATCH_SETTLE_SECONDS, WATCH_STATUS_FILE
+from core.ocr_job import OCRJob
+
+WATCH_EXTENSIONS = (".pdf", ".png", ".jpg", ".jpeg", ".bmp", ".tiff", ".tif")
+
+
+def unique_destination(directory, name):
+    """مسار داخل directory لا يكتب فوق ملف موجود (يضاف _1 و _2 ... عند التكرار)"""
+    target = Path(directory) / name
+    counter = 1
+    while target.exists():
+        target = Path(directory) / f"{Path(name).stem}_{counter}{Path(name).suffix}"
+        counter += 1
+    return target
+
+
+class FolderWatcher:
+    """خدمة مراقبة مجلدات الإدخال ومعالجة ملفاتها
+
+    input_dirs: مجلدات الإدخال (لا يتم البحث داخل المجلدات الفرعية).
+    done_dir / failed_dir: مجلدات النتائج، والافتراضي done و failed داخل كل مجلد إدخال.
+    jobs: عدد الملفات التي تتم معالجتها في نفس الوقت.
+    ocr_options: معاملات OCRJob.run (مثل lang و dpi و workers).
+    """
+
+    def __init__(self, input_dirs, done_dir=None, failed_dir=None, jobs=1, ocr_options=None,
+                 poll_interval=WATCH_POLL_INTERVAL, settle_seconds=WATCH_SETTLE_SECONDS,
+                 status_file=WATCH_STATUS_FILE, on_log=None):
+        self.input_dirs = [Path(d) for d in input_dirs]
+        self.done_dir = Path(done_dir) if done_dir else None
+        self.failed_dir = Path(failed_dir) if failed_dir else None
+        self.jobs = max(1, jobs)
+        self.ocr_options = dict(ocr_options or {})
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.status_file = Path(status_file) if status_file else None
+        self.on_log = on_log or (lambda message: None)
+
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._status_lock = threading.Lock()
+        self._threads = []
+        self._active_jobs = {}
+        # الملفات قيد الانتظار: {المسار: (الحجم، وقت التعديل، وقت آخر تغير)}
+        self._pending = {}
+        # الملفات التي دخلت الطابور ولم تُنقل بعد
+        self._claimed = set()
+
+        self._started_at = time.time()
+        self._counters = {"files_done": 0, "files_failed": 0, "pages_done": 0, "last_file": "", "last_error": ""}
+
+    # --- التشغيل والإيقاف ---
+
+    def run(self):
+        """تشغيل المراقبة حتى استدعاء stop() (أو Ctrl+C)"""
+        for d in self.input_dirs:
+            d.mkdir(parents=True, exist_ok=True)
+        for i in range(self.jobs):
+            thread = threading.Thread(target=self._run_worker, name=f"watch-worker-{i + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        self.on_log(f"مراقبة المجلدات: {', '.join(str(d) for d in self.input_dirs)}")
+        try:
+            while not self._stop.is_set():
+                self.scan()
+                self.write_status()
+                self._stop.wait(self.poll_interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        """إيقاف المراقبة والمهام الجارية (الملفات غير المكتملة تبقى في مجلد الإدخال)"""
+        if self._stop.is_set() and not self._threads:
+            return
+        self._stop.set()
+        with self._lock:
+            jobs = list(self._active_jobs.values())
+        for job in jobs:
+            job.stop()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self.write_status()
+
+    # --- اكتشاف الملفات ---
+
+    def scan(self):
+        """فحص مجلدات الإدخال وإضافة الملفات المكتملة إلى الطابور"""
+        now = time.monotonic()
+        seen = set()
+        for directory in self.input_dirs:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError as e:
+                logging.warning(f"تعذر قراءة مجلد الإدخال {directory}: {e}")
+                continue
+            for entry in entries:
+                path = Path(entry.path)
+                if not entry.is_file() or path.suffix.lower() not in WATCH_EXTENSIONS:
+                    continue
+                seen.add(path)
+                with self._lock:
+                    if path in self._claimed:
+                        continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                if self._is_settled(path, stat, now):
+                    self._enqueue(path)
+
+        # نسيان الملفات التي حُذفت أو نُقلت قبل أن تكتمل
+        for path in list(self._pending):
+            if path not in seen:
+                del self._pending[path]
+
+    def _is_settled(self, path, stat, now):
+        signature = (stat.st_size, stat.st_mtime_ns)
+        previous = self._pending.get(path)
+        if previous is None or previous[:2] != signature:
+            self._pending[path] = signature + (now,)
+            return False
+        if stat.st_size == 0 or now - previous[2] < self.settle_seconds:
+            return False
+        try:
+            # على ويندوز يفشل الفتح إذا كان برنامج المسح ما زال يكتب الملف
+            with open(path, "rb"):
+                pass
+        except OSError:
+            return False
+        return True
+
+    def _enqueue(self, path):
+        del self._pending[path]
+        with self._lock:
+            self._claimed.add(path)
+        self._queue.put(path)
+        self.on_log(f"ملف جديد في الطابور: {path.name}")
+
+    # --- المعالجة ---
+
+    def _run_worker(self):
+        while not self._stop.is_set():
+            try:
+                path = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                self._process(path)
+            except Exception as e:
+                logging.error(f"خطأ غير متوقع أثناء معالجة {path}: {e}")
+            finally:
+                # ملف لم يمكن نقله يبقى محجوزاً حتى لا تُعاد معالجته مع كل فحص
+                if not path.exists() or self._stop.is_set():
+                    with self._lock:
+                        self._claimed.discard(path)
+
+    def _process(self, path):
+        errors = []
+        job = OCRJob(on_error=errors.append, on_log=lambda message: logging.info(f"[{path.name}] {message}"))
+        with self._lock:
+            self._active_jobs[path] = job
+        self.on_log(f"بدء المعالجة: {path.name}")
+        try:
+            options = dict(self.ocr_options, save_txt=True, per_file_output=True)
+            result = job.run([str(path)], **options)
+        finally:
+            with self._lock:
+                self._active_jobs.pop(path, None)
+
+        if self._stop.is_set() and result is None:
+            # إيقاف الخدمة: يبقى الملف في مكانه ويُستأنف من سجل نقاط الاستئناف عند التشغيل التالي
+            return
+
+        failed = result is None or bool(errors) or not result.get("total_pages")
+        outputs = [Path(p) for p in (result or {}).get("text_paths", [])]
+        target_dir = self._target_dir(path, failed)
+        try:
+            target_dir.mkdir(parents=True, exist_ok=True)
+            for output in outputs:
+                shutil.move(str(output), str(unique_destination(target_dir, output.name)))
+            shutil.move(str(path), str(unique_destination(target_dir, path.name)))
+            if failed:
+                report = "\n".join(errors) or "لم يتم استخراج أي صفحة"
+                unique_destination(target_dir, f"{path.stem}_errors.txt").write_text(report, encoding="utf-8")
+        except OSError as e:
+            logging.error(f"تعذر نقل {path} إلى {target_dir}: {e}")
+            errors.append(str(e))
+            failed = True
+
+        with self._lock:
+            self._counters["last_file"] = path.name
+            if failed:
+                self._counters["files_failed"] += 1
+                self._counters["last_error"] = errors[-1] if errors else ""
+            else:
+                self._counters["files_done"] += 1
+                self._counters["pages_done"] += result["total_pages"]
+        self.on_log(f"{'فشلت' if failed else 'اكتملت'} معالجة: {path.name}")
+        self.write_status()
+
+    def _target_dir(self, path, failed):
+        configured = self.failed_dir if failed else self.done_dir
+        return configured or path.parent / ("failed" if failed else "done")
+
+    # --- الحالة ---
+
+    def status(self):
+        """عدادات الخدمة الحالية"""
+        with self._lock:
+            uptime = time.time() - self._started_at
+            status = dict(self._counters)
+            status.update({
+                "queued": self._queue.qsize(),
+                "waiting_to_settle": len(self._pending),
+                "active": sorted(p.name for p in self._active_jobs),
+                "uptime": round(uptime, 1),
+                "pages_per_minute": round(status["pages_done"] * 60 / uptime, 2) if uptime else 0.0,
+                "files_per_hour": round(status["files_done"] * 3600 / uptime, 2) if uptime else 0.0,
+                "running": not self._stop.is_set(),
+            })
+        return status
+
+    def write_status(self):
+        """كتابة العدادات إلى ملف الحالة (استبدال ذري حتى لا تقرأ الأدوات الأخرى ملفاً ناقصاً)"""
+        if not self.status_file:
+            return
+        try:
+            with self._status_lock:
+                self.status_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.status_file.with_name(self.status_file.name + ".tmp")
+                tmp_path.write_text(json.dumps(self.status(), ensure_ascii=False, indent=2), encoding="utf-8")
+                os.replace(tmp_path, self.status_file)
+        except OSError as e:
+            logging.warning(f"تعذر كتابة ملف حالة المراقبة: {e}")
@@ -1,12 +1,14 @@
 # -*- coding: utf-8 -*-
 import sys
 import logging
+import multiprocessing
 from PySide6.QtWidgets import QApplication, QSplashScreen
 from PySide6.QtGui import QPixmap, QIcon
 from PySide6.QtCore import Qt, QTimer
 
 from ui.main_window import MainWindow
 from core.utils import setup_logging
+from core.ocr_backends import close_backends
 from core.config import BASE_DIR, LOG_FILE, VERSION
 
 
@@ -40,7 +42,10 @@ def main():
         # 6. إغلاق شاشة التحميل عند ظهور البرنامج
         QTimer.singleShot(1500, lambda: (window.show(), splash.finish(window)))
 
-        sys.exit(app.exec())
+        exit_code = app.exec()
+        # تحرير مثيلات Tesseract المهيأة قبل الخروج
+        close_backends()
+        sys.exit(exit_code)
     except Exception as e:
         print(f"خطأ في تشغيل التطبيق: {e}")
         logging.error(f"خطأ في تشغيل التطبيق: {e}")
@@ -48,4 +53,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # ضروري لعمل مجمع عمليات OCR داخل النسخة المحزمة بـ PyInstaller
+    multiprocessing.freeze_support()
     main()
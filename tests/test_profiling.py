@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+اختبارات تشخيص الأداء: تفعيل WARRAQ_PROFILE لا يوقف خط معالجة OCR ولا يعطله أبداً
+
+StrictProfile يحاكي سلوك cProfile في Python 3.12+ (مقياس واحد نشط في العملية كلها)
+حتى تعمل الاختبارات على كل الإصدارات.
+
+التشغيل: python -m pytest tests
+"""
+import os
+import sys
+import shutil
+import cProfile
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from core import profiling
+from core.ocr_pipeline import OCRPipeline, PipelineStage, PageItem
+
+PAGES = 5
+TIMEOUT = 10.0
+
+
+class StrictProfile(cProfile.Profile):
+    """cProfile.Profile يرفض التشغيل إذا كان مقياس آخر نشطاً في العملية (مثل Python 3.12+)"""
+
+    _active = 0
+    _lock = threading.Lock()
+
+    def enable(self, *args, **kwargs):
+        with StrictProfile._lock:
+            if StrictProfile._active:
+                raise ValueError("Another profiling tool is already active")
+            StrictProfile._active += 1
+        super().enable(*args, **kwargs)
+
+    def disable(self):
+        super().disable()
+        with StrictProfile._lock:
+            StrictProfile._active = max(0, StrictProfile._active - 1)
+
+
+def run_pipeline(name, barrier=None):
+    """تشغيل خط معالجة بمرحلتين على صفحات بلا صور داخل جلسة تشخيص، وإرجاع نصوص الصفحات
+
+    barrier: تنتظر المرحلة الأولى عنده في أول صفحة حتى تتداخل جلسات المهام المتزامنة.
+    """
+    def source():
+        for n in range(1, PAGES + 1):
+            yield PageItem(Path("stub.pdf"), n, PAGES, None)
+
+    def recognize(item):
+        if barrier is not None and item.page_no == 1:
+            barrier.wait(TIMEOUT)
+        item.text = f"page {item.page_no}"
+
+    def clean(item):
+        item.text = item.text.upper()
+
+    with profiling.profile_job(name):
+        pipeline = OCRPipeline(source(), [PipelineStage("recognize", recognize), PipelineStage("clean", clean)])
+        pipeline.start()
+        try:
+            return [item.text for item in pipeline]
+        finally:
+            pipeline.stop()
+
+
+class ProfilingTests(unittest.TestCase):
+
+    def setUp(self):
+        self.profile_dir = Path(tempfile.mkdtemp(prefix="warraq-profile-"))
+        self.addCleanup(shutil.rmtree, self.profile_dir, True)
+        for patcher in (mock.patch.object(profiling, "PROFILE_DIR", self.profile_dir),
+                        mock.patch.dict(os.environ, {profiling.PROFILE_ENV_VAR: "1"})):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_jobs(self, names, overlap=False):
+        """تشغيل كل مهمة في خيط مستقل في نفس الوقت، مع فشل الاختبار بدلاً من التعليق"""
+        results = {}
+        barrier = threading.Barrier(len(names)) if overlap else None
+
+        def run(name):
+            results[name] = run_pipeline(name, barrier)
+
+        threads = [threading.Thread(target=run, args=(name,), daemon=True) for name in names]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(TIMEOUT)
+        self.assertFalse(any(thread.is_alive() for thread in threads), "profiled pipeline did not finish")
+        expected = [f"PAGE {n}" for n in range(1, PAGES + 1)]
+        for name in names:
+            self.assertEqual(results.get(name), expected)
+
+    def reports(self):
+        return sorted(self.profile_dir.glob("*.txt"))
+
+    def test_pipeline_finishes_with_profiling_enabled(self):
+        self.run_jobs(["job"])
+        self.assertEqual(len(self.reports()), 1)
+        self.assertEqual(len(list(self.profile_dir.glob("*.prof"))), 1)
+        self.assertEqual(len(list(self.profile_dir.glob("*.tracemalloc"))), 1)
+
+    def test_per_thread_profiles_fall_back_when_another_profiler_is_active(self):
+        # سلوك 3.12 مع قياس كل خيط على حدة: يفشل تشغيل المقياس في خيوط المراحل فتعمل دون قياس
+        with mock.patch.object(profiling, "_PROCESS_WIDE_CPU", False), \
+                mock.patch.object(profiling.cProfile, "Profile", StrictProfile):
+            self.run_jobs(["job"])
+        [report] = self.reports()
+        self.assertIn("not profiled, another profiling tool is active", report.read_text(encoding="utf-8"))
+
+    def test_one_process_profile_shared_by_concurrent_jobs(self):
+        with mock.patch.object(profiling, "_PROCESS_WIDE_CPU", True), \
+                mock.patch.object(profiling.cProfile, "Profile", StrictProfile):
+            self.run_jobs(["first", "second"], overlap=True)
+        self.assertEqual(StrictProfile._active, 0)
+        self.assertIsNone(profiling._cpu_owner)
+        texts = [report.read_text(encoding="utf-8") for report in self.reports()]
+        self.assertEqual(len(texts), 2)
+        # جلسة واحدة تملك مقياس العملية، والأخرى تكتب ملخص الذاكرة مع سبب غياب قياس الوقت
+        self.assertEqual(len(list(self.profile_dir.glob("*.prof"))), 1)
+        self.assertEqual(sum("is being profiled in this process" in text for text in texts), 1)
+
+    def test_profiling_disabled_runs_without_session(self):
+        with mock.patch.dict(os.environ, {profiling.PROFILE_ENV_VAR: ""}):
+            self.run_jobs(["job"])
+        self.assertEqual(self.reports(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+اختبارات مجدول المهام: ترتيب الأولويات، حدود التزامن لكل نوع، والإلغاء في كل حالة
+
+التشغيل: python -m pytest tests
+"""
+import sys
+import time
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from core.scheduler import JobScheduler, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
+
+TIMEOUT = 5.0
+
+
+def wait_for(predicate, timeout=TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return predicate()
+
+
+class SchedulerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.changes = []
+        self._lock = threading.Lock()
+
+    def make_scheduler(self, workers=1, limits=None):
+        def on_change(data):
+            with self._lock:
+                self.changes.append(data)
+        scheduler = JobScheduler(workers=workers, limits=limits or {}, on_change=on_change).start()
+        self.addCleanup(scheduler.shutdown, True, TIMEOUT)
+        return scheduler
+
+    def statuses(self, job):
+        with self._lock:
+            return [data["status"] for data in self.changes if data["id"] == job.id]
+
+    def finished_entries(self, scheduler, job):
+        return [data for data in scheduler.snapshot() if data["id"] == job.id and data["finished_at"]]
+
+    def blocker(self, scheduler, kind="pdf"):
+        """مهمة تشغل خيطاً حتى يُضبط الحدث المرجع"""
+        release = threading.Event()
+        job = scheduler.submit(kind, lambda: release.wait(TIMEOUT), label="blocker")
+        self.assertTrue(wait_for(lambda: job.status == "running"))
+        self.addCleanup(release.set)
+        return job, release
+
+
+class PriorityTests(SchedulerTestCase):
+
+    def test_higher_priority_runs_first_then_submission_order(self):
+        scheduler = self.make_scheduler(workers=1)
+        _, release = self.blocker(scheduler)
+        order = []
+        jobs = [scheduler.submit("pdf", lambda name=name: order.append(name), priority=priority)
+                for name, priority in (("low", PRIORITY_LOW), ("normal-1", PRIORITY_NORMAL),
+                                       ("high", PRIORITY_HIGH), ("normal-2", PRIORITY_NORMAL))]
+        pending = [data["label"] for data in scheduler.snapshot() if data["status"] == "queued"]
+        self.assertEqual(len(pending), 4)
+
+        release.set()
+        self.assertTrue(wait_for(lambda: all(job.status == "done" for job in jobs)))
+        self.assertEqual(order, ["high", "normal-1", "normal-2", "low"])
+
+    def test_snapshot_lists_pending_jobs_in_run_order(self):
+        scheduler = self.make_scheduler(workers=1)
+        self.blocker(scheduler)
+        scheduler.submit("pdf", lambda: None, label="low", priority=PRIORITY_LOW)
+        scheduler.submit("pdf", lambda: None, label="high", priority=PRIORITY_HIGH)
+        labels = [data["label"] for data in scheduler.snapshot()]
+        self.assertEqual(labels, ["blocker", "high", "low"])
+
+
+class LimitTests(SchedulerTestCase):
+
+    def test_kind_limit_leaves_workers_for_other_kinds(self):
+        scheduler = self.make_scheduler(workers=3, limits={"ocr": 1})
+        first, release = self.blocker(scheduler, kind="ocr")
+        second = scheduler.submit("ocr", lambda: None)
+        pdf = scheduler.submit("pdf", lambda: "merged")
+
+        # مهمة OCR الثانية تنتظر رغم وجود خيوط فارغة، ومهمة PDF تعمل فوراً
+        self.assertTrue(wait_for(lambda: pdf.status == "done"))
+        self.assertEqual(pdf.result, "merged")
+        self.assertEqual(second.status, "queued")
+        self.assertEqual(len(scheduler.running("ocr")), 1)
+
+        release.set()
+        self.assertTrue(wait_for(lambda: second.status == "done"))
+        self.assertEqual(first.status, "done")
+
+    def test_concurrency_never_exceeds_limit(self):
+        scheduler = self.make_scheduler(workers=4, limits={"ocr": 2})
+        lock = threading.Lock()
+        active, peak = [0], [0]
+
+        def work():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+
+        jobs = [scheduler.submit("ocr", work) for _ in range(8)]
+        self.assertTrue(wait_for(lambda: all(job.status == "done" for job in jobs)))
+        self.assertEqual(peak[0], 2)
+
+    def test_failed_job_records_error_and_frees_its_slot(self):
+        scheduler = self.make_scheduler(workers=1, limits={"ocr": 1})
+
+        def fail():
+            raise ValueError("broken")
+
+        failed = scheduler.submit("ocr", fail)
+        after = scheduler.submit("ocr", lambda: 1)
+        self.assertTrue(wait_for(lambda: after.status == "done"))
+        self.assertEqual(failed.status, "failed")
+        self.assertEqual(failed.error, "broken")
+
+
+class CancelTests(SchedulerTestCase):
+
+    def test_cancel_queued_job_never_runs_it(self):
+        scheduler = self.make_scheduler(workers=1)
+        _, release = self.blocker(scheduler)
+        calls = []
+        job = scheduler.submit("pdf", lambda: calls.append(1))
+
+        self.assertTrue(scheduler.cancel(job.id))
+        self.assertEqual(job.status, "cancelled")
+        release.set()
+        self.assertTrue(wait_for(lambda: not scheduler.is_busy()))
+        self.assertEqual(calls, [])
+        self.assertEqual(self.statuses(job), ["queued", "cancelled"])
+        self.assertEqual(len(self.finished_entries(scheduler, job)), 1)
+
+    def test_cancel_running_job_calls_on_cancel(self):
+        scheduler = self.make_scheduler(workers=1)
+        stop = threading.Event()
+        job = scheduler.submit("ocr", lambda: stop.wait(TIMEOUT), on_cancel=stop.set)
+        self.assertTrue(wait_for(lambda: job.status == "running"))
+
+        self.assertTrue(scheduler.cancel(job.id))
+        self.assertTrue(wait_for(lambda: job.finished))
+        self.assertTrue(stop.is_set())
+        self.assertEqual(job.status, "cancelled")
+        self.assertEqual(self.statuses(job), ["queued", "running", "cancelling", "cancelled"])
+        self.assertEqual(len(self.finished_entries(scheduler, job)), 1)
+
+    def test_running_job_without_on_cancel_cannot_be_cancelled(self):
+        scheduler = self.make_scheduler(workers=1)
+        job, release = self.blocker(scheduler)
+
+        self.assertFalse(scheduler.cancel(job.id))
+        self.assertEqual(job.status, "running")
+        release.set()
+        self.assertTrue(wait_for(lambda: job.status == "done"))
+
+    def test_cancel_finished_or_unknown_job_returns_false(self):
+        scheduler = self.make_scheduler(workers=1)
+        job = scheduler.submit("pdf", lambda: None, on_cancel=lambda: None)
+        self.assertTrue(wait_for(lambda: job.status == "done"))
+
+        self.assertFalse(scheduler.cancel(job.id))
+        self.assertFalse(scheduler.cancel(9999))
+        self.assertEqual(job.status, "done")
+        self.assertEqual(len(self.finished_entries(scheduler, job)), 1)
+
+    def test_cancel_while_job_finishes_records_it_once(self):
+        # المهمة تنتهي فور طلب إيقافها، فتتسابق نهايتها مع cancel: يجب أن تنتهي مرة واحدة فقط
+        scheduler = self.make_scheduler(workers=2)
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, interval)
+        jobs = []
+        for _ in range(200):
+            holder = []
+
+            def work():
+                while not holder or holder[0].status != "cancelling":
+                    time.sleep(0)
+
+            job = scheduler.submit("ocr", work, on_cancel=lambda: None)
+            holder.append(job)
+            jobs.append(job)
+            self.assertTrue(wait_for(lambda: job.status == "running"))
+            self.assertTrue(scheduler.cancel(job.id))
+            self.assertTrue(wait_for(lambda: "cancelled" in self.statuses(job)))
+
+        scheduler.shutdown(wait=True, timeout=TIMEOUT)
+        for job in jobs:
+            statuses = self.statuses(job)
+            self.assertEqual([status for status in statuses if status in ("done", "failed", "cancelled")],
+                             ["cancelled"])
+            self.assertEqual(statuses[-1], "cancelled")
+
+    def test_shutdown_cancels_pending_and_stops_running(self):
+        scheduler = JobScheduler(workers=1, limits={}).start()
+        stop = threading.Event()
+        running = scheduler.submit("ocr", lambda: stop.wait(TIMEOUT), on_cancel=stop.set)
+        self.assertTrue(wait_for(lambda: running.status == "running"))
+        pending = scheduler.submit("pdf", lambda: None)
+
+        scheduler.shutdown(wait=True, timeout=TIMEOUT)
+        self.assertTrue(stop.is_set())
+        self.assertEqual(pending.status, "cancelled")
+        self.assertEqual(running.status, "done")
+        with self.assertRaises(RuntimeError):
+            scheduler.submit("pdf", lambda: None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -221,9 +221,14 @@ class ProgressDialog(QDialog):
         self.timer_label.setStyleSheet("color: #6c757d;")
         layout.addWidget(self.timer_label)
 
-        # زر الإلغاء
+        # زر الإلغاء، وزر إخفاء النافذة مع استمرار التحويل (لاستخدام أدوات PDF في الأثناء)
+        buttons = QHBoxLayout()
         self.cancel_btn = QPushButton("⏹ إلغاء التحويل")
-        layout.addWidget(self.cancel_btn)
+        self.background_btn = QPushButton("⬇ متابعة في الخلفية")
+        self.background_btn.setStyleSheet("background: #667eea;")
+        buttons.addWidget(self.cancel_btn)
+        buttons.addWidget(self.background_btn)
+        layout.addLayout(buttons)
 
     def _setup_timer(self):
         self.timer = QTimer()
@@ -5,29 +5,54 @@ from pathlib import Path
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QFileDialog, QVBoxLayout, QHBoxLayout,
     QWidget, QPushButton, QLabel, QComboBox, QCheckBox,
-    QLineEdit, QGroupBox, QScrollArea, QTextEdit, QProgressBar,
+    QLineEdit, QGroupBox, QScrollArea, QTextEdit, QPlainTextEdit, QProgressBar,
     QStackedWidget, QTabWidget, QFrame, QMessageBox, QGraphicsOpacityEffect,
-    QSizePolicy, QStatusBar, QGridLayout
+    QSizePolicy, QStatusBar, QGridLayout, QListWidget, QListWidgetItem
 )
-from PySide6.QtCore import Qt, QThread, Signal, QPropertyAnimation, QEasingCurve, QSize, QParallelAnimationGroup, QSequentialAnimationGroup, QTimer
-from PySide6.QtGui import QFont, QDragEnterEvent, QDropEvent, QIntValidator, QIcon, QPixmap
+from PySide6.QtCore import Qt, QObject, Signal, QPropertyAnimation, QEasingCurve, QSize, QParallelAnimationGroup, QSequentialAnimationGroup, QTimer
+from PySide6.QtGui import QFont, QDragEnterEvent, QDropEvent, QIntValidator, QIcon, QPixmap, QTextCursor
 
 from core.ocr_worker import OCRWorker
 from core.pdf_processor import PDFProcessor
-from core.config import VERSION
+from core.scheduler import JobScheduler, PRIORITY_HIGH, PRIORITY_NORMAL, FINISHED_STATES
+from core.config import VERSION, OCR_WORKERS
 from ui.styles import LIGHT_STYLESHEET, DARK_STYLESHEET
 from ui.custom_widgets import NotificationPopup, ProgressDialog, CreditsDialog
 from ui.icon_factory import IconFactory
 
+JOB_STATUS_LABELS = {
+    "queued": "في الانتظار",
+    "running": "قيد التنفيذ",
+    "cancelling": "جارٍ الإيقاف",
+    "done": "اكتملت",
+    "failed": "فشلت",
+    "cancelled": "أُلغيت",
+}
+
+
+class SchedulerBridge(QObject):
+    """نقل تغيرات حالة مهام المجدول من خيوطه إلى خيط الواجهة عبر إشارة Qt"""
+
+    job_changed = Signal(dict)
+
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.current_files = []
-        self.ocr_thread = None
-        self.ocr_worker = None
         self.is_dark_mode = False
         self.progress_dialog = None
+
+        # مجدول المهام المشترك لـ OCR وأدوات PDF
+        self.scheduler_bridge = SchedulerBridge()
+        self.scheduler_bridge.job_changed.connect(self.handle_job_changed)
+        self.scheduler = JobScheduler(on_change=self.scheduler_bridge.job_changed.emit).start()
+        # عمال OCR للمهام غير المنتهية، ودوال تُستدعى بعد نجاح مهام أدوات PDF
+        self.ocr_workers = {}
+        self.job_callbacks = {}
+        # عدد كلمات وأحرف النتائج، يُحدَّث مع كل صفحة مضافة دون إعادة عدّ النص كاملاً
+        self.text_words = 0
+        self.text_chars = 0
         
         # دعم اللغة العربية (يمين إلى يسار)
         self.setLayoutDirection(Qt.RightToLeft)
@@ -376,6 +401,9 @@ class MainWindow(QMainWindow):
         
         # Results
         self.create_results_section(layout)
+
+        # Job queue
+        self.create_queue_section(layout)
         
         # إضافة مساحة مرنة في الأسفل
         layout.addStretch()
@@ -738,11 +766,34 @@ class MainWindow(QMainWindow):
         
         controls_layout.addWidget(pages_widget, 1, 1, 1, 3)
         
-        # الصف الثالث: المعالجة المسبقة
+        # الصف الثالث: عدد العمليات المتوازية
+        workers_label = QLabel("العمليات المتوازية:")
+        workers_label.setStyleSheet("font-weight: bold;")
+        controls_layout.addWidget(workers_label, 2, 0)
+
+        self.workers_spin = QLineEdit(str(OCR_WORKERS))
+        self.workers_spin.setValidator(QIntValidator(1, 64))
+        self.workers_spin.setMinimumWidth(70)
+        self.workers_spin.setMaximumWidth(100)
+        controls_layout.addWidget(self.workers_spin, 2, 1)
+
+        # الصف الرابع: المعالجة المسبقة
         self.preprocess_check = QCheckBox("تفعيل المعالجة المسبقة للصور (يحسن دقة النصوص العربية)")
         self.preprocess_check.setChecked(True)
         self.preprocess_check.setStyleSheet("font-weight: 500; margin-top: 10px;")
-        controls_layout.addWidget(self.preprocess_check, 2, 0, 1, 4)
+        controls_layout.addWidget(self.preprocess_check, 3, 0, 1, 4)
+
+        # الصف الخامس: الوضع الهجين لملفات PDF الرقمية
+        self.text_layer_check = QCheckBox("استخدام النص المضمّن في صفحات PDF الرقمية بدلاً من OCR (أسرع)")
+        self.text_layer_check.setChecked(True)
+        self.text_layer_check.setStyleSheet("font-weight: 500;")
+        controls_layout.addWidget(self.text_layer_check, 4, 0, 1, 4)
+
+        # الصف السادس: حفظ ملف نصي لكل ملف مدخل
+        self.per_file_check = QCheckBox("حفظ ملف نصي منفصل لكل ملف")
+        self.per_file_check.setChecked(False)
+        self.per_file_check.setStyleSheet("font-weight: 500;")
+        controls_layout.addWidget(self.per_file_check, 5, 0, 1, 4)
         
         # جعل الأعمدة تتمدد بشكل متساوي
         controls_layout.setColumnStretch(1, 2)
@@ -794,7 +845,8 @@ class MainWindow(QMainWindow):
         results_layout.setContentsMargins(20, 25, 20, 20)
         results_layout.setSpacing(12)
         
-        self.text_edit = QTextEdit()
+        # QPlainTextEdit يضيف الصفحات الجديدة دون إعادة تخطيط النص السابق (انظر append_result_text)
+        self.text_edit = QPlainTextEdit()
         self.text_edit.setPlaceholderText("ستظهر النتائج هنا بعد التحويل...")
         results_layout.addWidget(self.text_edit)
         
@@ -822,6 +874,26 @@ class MainWindow(QMainWindow):
         results_layout.addLayout(btns)
         
         parent_layout.addWidget(results_group)
+
+    def create_queue_section(self, parent_layout):
+        queue_group = QGroupBox("طابور المهام")
+        queue_layout = QVBoxLayout(queue_group)
+        queue_layout.setContentsMargins(20, 25, 20, 20)
+        queue_layout.setSpacing(12)
+
+        self.queue_list = QListWidget()
+        self.queue_list.setMinimumHeight(120)
+        queue_layout.addWidget(self.queue_list)
+
+        btns = QHBoxLayout()
+        cancel_btn = QPushButton("⏹ إلغاء المهمة المحددة")
+        cancel_btn.clicked.connect(self.cancel_selected_job)
+        btns.addWidget(cancel_btn)
+        btns.addStretch()
+        queue_layout.addLayout(btns)
+
+        parent_layout.addWidget(queue_group)
+
     def toggle_theme(self):
         """تبديل بين الوضع النهاري والليلي مع تأثير انتقالي"""
         # تأثير fade out/in
@@ -912,6 +984,7 @@ class MainWindow(QMainWindow):
         """عرض نافذة التقدم"""
         self.progress_dialog = ProgressDialog(self)
         self.progress_dialog.cancel_btn.clicked.connect(self.stop_ocr)
+        self.progress_dialog.background_btn.clicked.connect(self.close_progress_dialog)
         self.progress_dialog.show()
 
         # وضع النافذة في وسط الشاشة
@@ -972,10 +1045,6 @@ class MainWindow(QMainWindow):
             self.show_custom_message("خطأ", "الرجاء اختيار ملفات أولاً", "error")
             return
 
-        if self.ocr_thread and self.ocr_thread.isRunning():
-            self.show_custom_message("تحذير", "هناك عملية تحويل قيد التشغيل بالفعل", "warning")
-            return
-
         # Get settings
         lang_map = {"عربي + إنجليزي": "ara+eng", "فقط عربي": "ara", "فقط إنجليزي": "eng"}
         lang = lang_map[self.lang_combo.currentText()]
@@ -983,48 +1052,107 @@ class MainWindow(QMainWindow):
         start_page = int(self.start_page_spin.text() or "1")
         end_page = int(self.end_page_spin.text()) if self.end_page_spin.text() else None
         preprocess = self.preprocess_check.isChecked()
+        workers = max(1, int(self.workers_spin.text() or "1"))
+        use_text_layer = self.text_layer_check.isChecked()
+        per_file_output = self.per_file_check.isChecked()
+        files = list(self.current_files)
+
+        # Setup worker (يعمل في أحد خيوط المجدول وتصل إشاراته إلى الواجهة عبر الطابور)
+        worker = OCRWorker()
+        worker.progress.connect(self.handle_progress)
+        worker.finished.connect(self.handle_finished)
+        worker.error.connect(self.handle_error)
+        worker.log.connect(self.handle_log)
+        worker.page_started.connect(self.handle_page_started)
+
+        names = ", ".join(Path(f).name for f in files[:2]) + ("..." if len(files) > 2 else "")
+        busy = bool(self.scheduler.running("ocr"))
+        job = self.scheduler.submit(
+            "ocr",
+            lambda: worker.run_ocr(
+                files, lang, dpi, start_page, end_page, True, preprocess, workers=workers,
+                use_text_layer=use_text_layer, per_file_output=per_file_output
+            ),
+            label=f"OCR: {names}", priority=PRIORITY_NORMAL, on_cancel=worker.stop
+        )
+        self.ocr_workers[job.id] = worker
+
+        if busy:
+            self.show_custom_message("في الطابور", "تمت إضافة التحويل إلى طابور المهام وسيبدأ بعد انتهاء التحويل الحالي", "info")
 
+    def begin_ocr_view(self):
+        """تهيئة قسم التقدم والنتائج عند بدء تشغيل مهمة OCR من الطابور"""
         # Reset UI
         self.text_edit.clear()
+        self.update_text_stats()
         self.progress_bar.setValue(0)
         self.page_stats_label.setText("0 صفحة")
         self.time_stats_label.setText("الوقت: 00:00")
         self.current_page_label.setText("جاري بدء عملية التحويل...")
         self.current_page_label.setStyleSheet(
             "background-color: #FFF9C4; color: #000; padding: 5px; border-radius: 3px;")
-
-        # تعطيل عناصر التحكم أثناء المعالجة
-        self.set_controls_enabled(False)
-
-        # عرض نافذة التقدم
-        self.show_progress_dialog()
-
-        # Setup worker and thread
-        self.ocr_worker = OCRWorker()
-        self.ocr_thread = QThread()
-
-        self.ocr_worker.moveToThread(self.ocr_thread)
-
-        # Connect signals
-        self.ocr_worker.progress.connect(self.handle_progress)
-        self.ocr_worker.finished.connect(self.handle_finished)
-        self.ocr_worker.error.connect(self.handle_error)
-        self.ocr_worker.log.connect(self.handle_log)
-        self.ocr_worker.page_started.connect(self.handle_page_started)
-
-        self.ocr_thread.started.connect(
-            lambda: self.ocr_worker.run_ocr(
-                self.current_files, lang, dpi, start_page, end_page, True, preprocess
-            )
-        )
-
-        # Start thread
-        self.ocr_thread.start()
-
-        # Update UI
-        self.start_btn.setEnabled(False)
         self.stop_btn.setEnabled(True)
 
+        # عرض نافذة التقدم إذا كان المستخدم في صفحة OCR
+        if self.stacked_widget.currentWidget() is self.page_ocr and not self.progress_dialog:
+            self.show_progress_dialog()
+
+    # --- Job Scheduler ---
+
+    def submit_pdf_job(self, label, fn, on_success=None, error_prefix=""):
+        """إضافة عملية من أدوات PDF إلى المجدول بأولوية عالية حتى لا تنتظر انتهاء OCR"""
+        job = self.scheduler.submit("pdf", fn, label=label, priority=PRIORITY_HIGH)
+        self.job_callbacks[job.id] = (on_success, error_prefix)
+
+    def handle_job_changed(self, job):
+        """متابعة تغير حالة مهمة في المجدول (تصل عبر SchedulerBridge في خيط الواجهة)"""
+        if job["kind"] == "ocr":
+            if job["status"] == "running":
+                self.begin_ocr_view()
+            elif job["status"] in FINISHED_STATES:
+                self.ocr_workers.pop(job["id"], None)
+                self.stop_btn.setEnabled(bool(self.scheduler.running("ocr")))
+        elif job["status"] in FINISHED_STATES:
+            self.finish_pdf_job(job)
+        self.refresh_queue_view()
+
+    def finish_pdf_job(self, job):
+        on_success, error_prefix = self.job_callbacks.pop(job["id"], (None, ""))
+        if job["status"] == "failed":
+            self.show_custom_message("خطأ", f"{error_prefix}{job['error']}", "error")
+        elif job["status"] == "done":
+            success, msg = job["result"]
+            if success:
+                self.show_custom_message("نجاح", msg, "success")
+                if on_success:
+                    on_success()
+            else:
+                self.show_custom_message("خطأ", f"{error_prefix}{msg}", "error")
+
+    def refresh_queue_view(self):
+        selected = self.queue_list.currentItem()
+        selected_id = selected.data(Qt.UserRole) if selected else None
+
+        jobs = self.scheduler.snapshot()
+        self.queue_list.clear()
+        for job in jobs:
+            item = QListWidgetItem(f"{job['label']} — {JOB_STATUS_LABELS.get(job['status'], job['status'])}")
+            item.setData(Qt.UserRole, job["id"])
+            self.queue_list.addItem(item)
+            if job["id"] == selected_id:
+                self.queue_list.setCurrentItem(item)
+
+        active = sum(1 for job in jobs if job["status"] not in FINISHED_STATES)
+        self.current_status_label.setText(f"مهام في الطابور: {active}" if active else "جاهز")
+
+    def cancel_selected_job(self):
+        item = self.queue_list.currentItem()
+        if item is None:
+            self.show_custom_message("تنبيه", "الرجاء اختيار مهمة من الطابور أولاً", "warning")
+            return
+        if not self.scheduler.cancel(item.data(Qt.UserRole)):
+            self.show_custom_message("تنبيه", "لا يمكن إلغاء هذه المهمة (منتهية أو لا تدعم الإيقاف أثناء التنفيذ)", "warning")
+
     def handle_page_started(self, message):
         """التعامل مع بدء معالجة صفحة جديدة"""
         self.current_page_label.setText(message)
@@ -1051,12 +1179,11 @@ class MainWindow(QMainWindow):
         
         output_path, _ = QFileDialog.getSaveFileName(self, "حفظ الملف المدمج", "merged_document.pdf", "PDF Files (*.pdf)")
         if output_path:
-            success, msg = PDFProcessor.merge_pdfs(files, output_path)
-            if success:
-                self.show_custom_message("نجاح", msg, "success")
-                self.merge_list.clear()
-            else:
-                self.show_custom_message("خطأ", f"فشل الدمج: {msg}", "error")
+            self.submit_pdf_job(
+                f"دمج: {Path(output_path).name}",
+                lambda: PDFProcessor.merge_pdfs(files, output_path),
+                on_success=self.merge_list.clear, error_prefix="فشل الدمج: "
+            )
 
     def choose_split_file(self):
         file, _ = QFileDialog.getOpenFileName(self, "اختر ملف PDF للفصل", "", "PDF Files (*.pdf)")
@@ -1088,14 +1215,11 @@ class MainWindow(QMainWindow):
         output_dir = QFileDialog.getExistingDirectory(self, "اختر مجلد الحفظ")
         if output_dir:
             if split_each:
-                success, msg = PDFProcessor.split_pdf_to_pages(file, output_dir)
-            else:
-                success, msg = PDFProcessor.split_pdf(file, output_dir, range_str)
-                
-            if success:
-                self.show_custom_message("نجاح", msg, "success")
+                self.submit_pdf_job(f"فصل الصفحات: {Path(file).name}",
+                                    lambda: PDFProcessor.split_pdf_to_pages(file, output_dir))
             else:
-                self.show_custom_message("خطأ", msg, "error")
+                self.submit_pdf_job(f"فصل: {Path(file).name}",
+                                    lambda: PDFProcessor.split_pdf(file, output_dir, range_str))
 
     # --- Security Logic ---
 
@@ -1113,12 +1237,9 @@ class MainWindow(QMainWindow):
             
         output_path, _ = QFileDialog.getSaveFileName(self, "حفظ الملف المحمي", "protected_document.pdf", "PDF Files (*.pdf)")
         if output_path:
-            success, msg = PDFProcessor.encrypt_pdf(file, password, output_path)
-            if success:
-                self.show_custom_message("نجاح", msg, "success")
-                self.lock_pass_input.clear()
-            else:
-                self.show_custom_message("خطأ", msg, "error")
+            self.submit_pdf_job(f"قفل: {Path(file).name}",
+                                lambda: PDFProcessor.encrypt_pdf(file, password, output_path),
+                                on_success=self.lock_pass_input.clear)
 
     def choose_unlock_file(self):
         file, _ = QFileDialog.getOpenFileName(self, "اختر ملف PDF المحمي", "", "PDF Files (*.pdf)")
@@ -1134,12 +1255,9 @@ class MainWindow(QMainWindow):
             
         output_path, _ = QFileDialog.getSaveFileName(self, "حفظ النسخة المفتوحة", "unlocked_document.pdf", "PDF Files (*.pdf)")
         if output_path:
-            success, msg = PDFProcessor.decrypt_pdf(file, password, output_path)
-            if success:
-                self.show_custom_message("نجاح", msg, "success")
-                self.unlock_pass_input.clear()
-            else:
-                self.show_custom_message("خطأ", msg, "error")
+            self.submit_pdf_job(f"فتح الحماية: {Path(file).name}",
+                                lambda: PDFProcessor.decrypt_pdf(file, password, output_path),
+                                on_success=self.unlock_pass_input.clear)
 
     # --- Conversion Logic ---
 
@@ -1156,11 +1274,8 @@ class MainWindow(QMainWindow):
         
         output_path, _ = QFileDialog.getSaveFileName(self, "حفظ ملف PDF", "images_combined.pdf", "PDF Files (*.pdf)")
         if output_path:
-            success, msg = PDFProcessor.images_to_pdf(files, output_path)
-            if success:
-                self.show_custom_message("نجاح", msg, "success")
-            else:
-                self.show_custom_message("خطأ", msg, "error")
+            self.submit_pdf_job(f"صور إلى PDF: {Path(output_path).name}",
+                                lambda: PDFProcessor.images_to_pdf(files, output_path))
 
     def choose_pdf2img_file(self):
         file, _ = QFileDialog.getOpenFileName(self, "اختر ملف PDF", "", "PDF Files (*.pdf)")
@@ -1176,11 +1291,8 @@ class MainWindow(QMainWindow):
         output_dir = QFileDialog.getExistingDirectory(self, "اختر مجلد حفظ الصور")
         if output_dir:
             from core.config import POPPLER_PATH
-            success, msg = PDFProcessor.pdf_to_images(file, output_dir, poppler_path=POPPLER_PATH)
-            if success:
-                self.show_custom_message("نجاح", msg, "success")
-            else:
-                self.show_custom_message("خطأ", msg, "error")
+            self.submit_pdf_job(f"PDF إلى صور: {Path(file).name}",
+                                lambda: PDFProcessor.pdf_to_images(file, output_dir, poppler_path=POPPLER_PATH))
 
     # --- Compression Logic ---
 
@@ -1192,11 +1304,8 @@ class MainWindow(QMainWindow):
         
         output_path, _ = QFileDialog.getSaveFileName(self, "حفظ الملف المضحوط", "compressed.pdf", "PDF Files (*.pdf)")
         if output_path:
-            success, msg = PDFProcessor.compress_pdf(file, output_path)
-            if success:
-                self.show_custom_message("نجاح", msg, "success")
-            else:
-                self.show_custom_message("خطأ", msg, "error")
+            self.submit_pdf_job(f"ضغط: {Path(file).name}",
+                                lambda: PDFProcessor.compress_pdf(file, output_path))
 
     def choose_img_comp_files(self):
         files, _ = QFileDialog.getOpenFileNames(self, "اختر صور للضغط", "", "Images (*.png *.jpg *.jpeg *.bmp)")
@@ -1212,25 +1321,18 @@ class MainWindow(QMainWindow):
         quality = int(self.quality_spin.text() or "70")
         output_dir = QFileDialog.getExistingDirectory(self, "اختر مجلد حفظ الصور المضغوطة")
         if output_dir:
-            success, msg = PDFProcessor.compress_images(files, output_dir, quality=quality)
-            if success:
-                self.show_custom_message("نجاح", msg, "success")
-            else:
-                self.show_custom_message("خطأ", msg, "error")
+            self.submit_pdf_job(f"ضغط {len(files)} صور",
+                                lambda: PDFProcessor.compress_images(files, output_dir, quality=quality))
 
     def stop_ocr(self):
-        if self.ocr_worker:
-            self.ocr_worker.stop()
-        if self.ocr_thread and self.ocr_thread.isRunning():
-            self.ocr_thread.quit()
-            self.ocr_thread.wait()
+        # إيقاف التحويل الجاري فقط، وتبقى مهام الطابور الأخرى في انتظارها
+        for job in self.scheduler.running("ocr"):
+            self.scheduler.cancel(job.id)
 
-        self.start_btn.setEnabled(True)
         self.stop_btn.setEnabled(False)
         self.current_page_label.setText("تم إيقاف عملية التحويل")
         self.current_page_label.setStyleSheet(
             "background-color: #FFEBEE; color: #000; padding: 5px; border-radius: 3px;")
-        self.set_controls_enabled(True)
 
         # إغلاق نافذة التقدم
         self.close_progress_dialog()
@@ -1248,12 +1350,8 @@ class MainWindow(QMainWindow):
         self.page_stats_label.setText(f"{data['page']} من {data['total']} صفحة")
         self.time_stats_label.setText(f"الوقت: {data['elapsed']}s")
 
-        # Append text
-        current_text = self.text_edit.toPlainText()
-        self.text_edit.setPlainText(current_text + data["text_preview"])
-
-        # Update stats
-        self.update_text_stats()
+        # إضافة نص الصفحة الجديدة فقط
+        self.append_result_text(data["text_preview"])
 
     def handle_finished(self, data):
         self.progress_bar.setValue(100)
@@ -1265,20 +1363,18 @@ class MainWindow(QMainWindow):
         self.close_progress_dialog()
 
         # عرض رسالة النجاح
-        self.show_custom_message("تم الانتهاء",
-                                 f"تم تحويل {data['total_pages']} صفحة بنجاح في {data['processing_time']} ثانية",
-                                 "success")
-
-        # Update final text
-        self.text_edit.setPlainText(data["text_preview"])
+        message = f"تم تحويل {data['total_pages']} صفحة بنجاح في {data['processing_time']} ثانية"
+        if data.get("blank_pages"):
+            message += f"\n(تم تجاوز {data['blank_pages']} صفحة فارغة)"
+        if len(data.get("text_paths", [])) > 1:
+            message += f"\n(تم حفظ {len(data['text_paths'])} ملفات نصية)"
+        self.show_custom_message("تم الانتهاء", message, "success")
+
+        # النص الكامل معروض بالفعل صفحةً بصفحة عبر handle_progress، ويُعاد عدّه مرة واحدة
+        # في النهاية ليشمل أي تعديل أجراه المستخدم أثناء التحويل
         self.update_text_stats()
 
-        # Cleanup
-        self.ocr_thread.quit()
-        self.ocr_thread.wait()
-        self.start_btn.setEnabled(True)
         self.stop_btn.setEnabled(False)
-        self.set_controls_enabled(True)
 
     def handle_error(self, message):
         self.current_page_label.setText("حدث خطأ أثناء التحويل")
@@ -1295,23 +1391,39 @@ class MainWindow(QMainWindow):
         # يمكن إضافة سجل إذا لزم الأمر
         pass
 
-    def set_controls_enabled(self, enabled):
-        """تمكين أو تعطيل عناصر التحكم"""
-        self.lang_combo.setEnabled(enabled)
-        self.dpi_spin.setEnabled(enabled)
-        self.start_page_spin.setEnabled(enabled)
-        self.end_page_spin.setEnabled(enabled)
-        self.preprocess_check.setEnabled(enabled)
-        self.theme_btn.setEnabled(enabled)
-        self.credits_btn.setEnabled(enabled)
-        self.drop_label.setEnabled(enabled)
+    def append_result_text(self, block):
+        """إضافة نص صفحة إلى نهاية النتائج بتكلفة ثابتة مهما طال النص
+
+        يُدرج النص عبر مؤشر مستقل في نهاية المستند، فلا يُنسخ النص السابق ولا يتغير
+        تحديد المستخدم، ويستمر العرض بمتابعة آخر صفحة فقط إذا كان عند نهاية النص.
+        """
+        document = self.text_edit.document()
+        if document.isEmpty():
+            block = block.lstrip()
+        scrollbar = self.text_edit.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum()
+
+        cursor = QTextCursor(document)
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(block)
+
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+        # الكتل تبدأ بفاصل أسطر، فعدد كلماتها يُجمع مباشرة على عدد كلمات النص السابق
+        self.text_words += len(block.split())
+        self.text_chars += len(block)
+        self.show_text_stats()
 
     def update_text_stats(self):
+        """إعادة عدّ كلمات وأحرف النص كاملاً (بعد مسحه أو تعديله)"""
         text = self.text_edit.toPlainText()
-        words = len(text.split())
-        chars = len(text)
-        self.word_count_label.setText(f"{words} كلمة")
-        self.char_count_label.setText(f"{chars} حرف")
+        self.text_words = len(text.split())
+        self.text_chars = len(text)
+        self.show_text_stats()
+
+    def show_text_stats(self):
+        self.word_count_label.setText(f"{self.text_words} كلمة")
+        self.char_count_label.setText(f"{self.text_chars} حرف")
 
     def copy_text(self):
         text = self.text_edit.toPlainText()
@@ -1363,18 +1475,17 @@ class MainWindow(QMainWindow):
 
 
     def closeEvent(self, event):
-        if self.ocr_thread and self.ocr_thread.isRunning():
+        if self.scheduler.is_busy():
             reply = QMessageBox.question(
                 self,
                 "تأكيد الإغلاق",
-                "هناك عملية تحويل قيد التشغيل. هل تريد الإغلاق على أي حال؟",
+                "هناك مهام قيد التشغيل أو في الطابور. هل تريد الإغلاق على أي حال؟",
                 QMessageBox.Yes | QMessageBox.No
             )
 
-            if reply == QMessageBox.Yes:
-                self.stop_ocr()
-                event.accept()
-            else:
+            if reply == QMessageBox.No:
                 event.ignore()
-        else:
-            event.accept()
\ No newline at end of file
+                return
+        # إيقاف مهام OCR ينهي عمليات tesseract و pdftoppm الجارية فلا يطول انتظار الخيوط
+        self.scheduler.shutdown(timeout=5)
+        event.accept()
\ No newline at end of file
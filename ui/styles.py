@@ -76,7 +76,7 @@ LIGHT_STYLESHEET = """
     }
     
     /* ========== حقول الإدخال ========== */
-    QTextEdit, QLineEdit {
+    QTextEdit, QPlainTextEdit, QLineEdit {
         background-color: #ffffff;
         border: 2px solid #e1e8ed;
         padding: 8px 12px;
@@ -87,7 +87,7 @@ LIGHT_STYLESHEET = """
         selection-color: white;
     }
     
-    QTextEdit:focus, QLineEdit:focus {
+    QTextEdit:focus, QPlainTextEdit:focus, QLineEdit:focus {
         border: 2px solid #667eea;
         background-color: #f8f9ff;
     }
@@ -435,7 +435,7 @@ DARK_STYLESHEET = """
     }
     
     /* ========== حقول الإدخال ========== */
-    QTextEdit, QLineEdit {
+    QTextEdit, QPlainTextEdit, QLineEdit {
         background-color: #1e2433;
         border: 2px solid #374151;
         padding: 8px 12px;
@@ -446,7 +446,7 @@ DARK_STYLESHEET = """
         selection-color: white;
     }
     
-    QTextEdit:focus, QLineEdit:focus {
+    QTextEdit:focus, QPlainTextEdit:focus, QLineEdit:focus {
         border: 2px solid #4c6ef5;
         background-color: #252a3d;
     }
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""نقطة دخول سطر الأوامر لوراق (انظر core.cli) - لا تحتاج إلى واجهة رسومية"""
+import sys
+import multiprocessing
+
+from core.cli import main
+
+
+if __name__ == "__main__":
+    # ضروري لعمل مجمع العمليات داخل النسخة المحزمة بـ PyInstaller
+    multiprocessing.freeze_support()
+    sys.exit(main())